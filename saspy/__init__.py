@@ -22,11 +22,23 @@ from saspy.version import __version__
 from saspy.sasbase import SASsession, SASconfig, list_configs
 from saspy.sasdata import SASdata
 from saspy.sasexceptions import SASIONotSupportedError, SASConfigNotFoundError, SASConfigNotValidError
-from saspy.sasproccommons import SASProcCommons
-from saspy.sastabulate import Tabulate
-from saspy.sasresults import SASresults
+from saspy.saspool import SASsessionPool
 
 import os, sys
+import importlib
+
+# these aren't needed until a procedure is run, so they're imported the first time they're used
+_lazy = {'SASProcCommons': 'saspy.sasproccommons',
+         'Tabulate':       'saspy.sastabulate',
+         'SASresults':     'saspy.sasresults'}
+
+def __getattr__(name):
+   if name in _lazy:
+      return getattr(importlib.import_module(_lazy[name]), name)
+   raise AttributeError("module 'saspy' has no attribute '"+name+"'")
+
+def __dir__():
+   return sorted(list(globals()) + list(_lazy))
 
 def isnotebook():
     try:
@@ -36,12 +36,6 @@
 # sas.[have_at_it]()
 #
 
-#so the doc will generate for df methods
-try:
-   import pandas
-except Exception as e:
-   pass
-
 import os
 import sys
 import datetime
@@ -49,32 +43,40 @@ import getpass
 import importlib
 import shutil
 import tempfile
+import tempfile as tf
+import gzip
+import zlib
+import json
+import hashlib
 
-from saspy.sasioiom      import SASsessionIOM
-from saspy.sasiocom      import SASSessionCOM
-from saspy.sasets        import SASets
 from saspy.sasexceptions import (SASIONotSupportedError, SASConfigNotValidError,
                                 SASConfigNotFoundError)
-from saspy.sasml         import SASml
-from saspy.sasqc         import SASqc
-from saspy.sasstat       import SASstat
-from saspy.sasutil       import SASutil
-from saspy.sasViyaML     import SASViyaML
-from saspy.sasdata       import SASdata
+from saspy.sasdata       import SASdata, ResultCache
+from saspy.saswait       import Backoff, WaitStats
+from saspy.saslazy       import LazyModule, available
+from saspy.sasdfio       import df2binary_columns, binary_upload_dtype, df2binary
 
-_cfgfile_cnt = 0
+# The IO modules, the analytic product classes, pandas and IPython are slow to import and most programs only need
+# some of them, so they're imported when first used, not here; see SASsession.__init__() and the sasstat() ... methods
 
-if os.name != 'nt':
-   from saspy.sasiostdio import SASsessionSTDIO
+pandas = LazyModule('pandas')
 
-from saspy.sasiohttp import SASsessionHTTP
+_cfgfile_cnt = 0
 
-try:
-   from IPython.display import HTML
-   from IPython.display import display as DISPLAY
-except ImportError:
-   def DISPLAY(x): print(x)
-   def HTML(x):    return "IPython didn't import. Can't render HTML"
+def DISPLAY(x):
+   try:
+      from IPython.display import display
+   except ImportError:
+      print(x)
+      return
+   display(x)
+
+def HTML(x):
+   try:
+      from IPython.display import HTML
+   except ImportError:
+      return "IPython didn't import. Can't render HTML"
+   return HTML(x)
 
 def zepDISPLAY(x):
    print(x)
@@ -121,11 +123,10 @@ class SASconfig(object):
         self.origin  = ''
         configs      = []
 
-        try:
-           import pandas
+        if available('pandas'):
            self.pandas  = None
-        except Exception as e:
-           self.pandas  = e
+        else:
+           self.pandas  = ModuleNotFoundError("No module named 'pandas'", name='pandas')
 
         SAScfg = self._find_config(cfg_override=kwargs.get('cfgfile'))
         self.SAScfg = SAScfg
@@ -173,6 +174,13 @@ class SASconfig(object):
         self.results  = cfg.get('results')
         self.autoexec = cfg.get('autoexec')
         self.m5dsbug  = cfg.get('m5dsbug')
+        self.compress = cfg.get('compress', False)
+        self.complevel= cfg.get('complevel', 6)
+        self.poll_min = cfg.get('poll_min', 0.005)
+        self.poll_max = cfg.get('poll_max', 0.5)
+        self.factcache= cfg.get('factcache', False)
+        self.resultcache = cfg.get('resultcache', 0)
+        self.waitstats= WaitStats()
 
         indisplay = kwargs.get('display', '')
         if len(indisplay) > 0:
@@ -208,6 +216,33 @@ class SASconfig(object):
         if inm5dsbug is not None:
            self.m5dsbug = inm5dsbug
 
+        incompress = kwargs.get('compress', None)
+        if incompress is not None:
+           self.compress = incompress
+
+        inpoll = kwargs.get('poll_min', None)
+        if inpoll is not None:
+           self.poll_min = inpoll
+
+        inpoll = kwargs.get('poll_max', None)
+        if inpoll is not None:
+           self.poll_max = inpoll
+
+        infacts = kwargs.get('factcache', None)
+        if infacts is not None:
+           self.factcache = infacts
+
+        incache = kwargs.get('resultcache', None)
+        if incache is not None:
+           self.resultcache = incache
+
+        # identifies this definition, as overridden, in the facts cache; so changing it doesn't use stale facts
+        ident = [repr(sorted(cfg.items()))]
+        for key in sorted(kwargs):
+           if isinstance(kwargs[key], (str, int, float, bool, list, tuple)):
+              ident.append(key+'='+repr(kwargs[key]))
+        self._factsig = hashlib.sha1('\n'.join(ident).encode()).hexdigest()
+
         inip = kwargs.get('ip', None)             
         if inip:
            if lock and len(ip):
@@ -256,6 +291,62 @@ class SASconfig(object):
         else:
             raise SASConfigNotValidError(cfgname)
 
+    def backoff(self, maximum: float = None) -> Backoff:
+        """
+        Return a Backoff for a loop that polls waiting on SAS, using the poll_min and poll_max of this
+        configuration, and recording into its waitstats. Setting poll_min equal to poll_max gives fixed waits.
+
+        :param maximum: use this for the longest wait instead of poll_max
+        """
+        return Backoff(self.poll_min, maximum if maximum is not None else self.poll_max, stats=self.waitstats)
+
+    def _factfile(self) -> str:
+        if not self.factcache:
+           return None
+        if self.factcache is True:
+           return os.path.expanduser(self.DOTCONFIG)+'serverfacts.json'
+        return os.path.expanduser(self.factcache)
+
+    def _getfacts(self) -> dict:
+        """
+        Return the cached facts about the SAS server for this configuration, or None if there aren't any, or the
+        facts cache isn't enabled with the factcache option.
+        """
+        fn = self._factfile()
+        if fn is None:
+           return None
+        try:
+           with open(fn) as f:
+              facts = json.load(f).get(self.name)
+        except Exception:
+           return None
+        if not facts or facts.get('sig') != self._factsig or facts.get('mode') != self.mode:
+           return None
+        return facts
+
+    def _putfacts(self, facts: dict):
+        """
+        Save the facts about the SAS server for this configuration in the facts cache, if it's enabled
+        """
+        fn = self._factfile()
+        if fn is None:
+           return
+        facts = dict(facts, sig=self._factsig, mode=self.mode)
+        try:
+           with open(fn) as f:
+              cache = json.load(f)
+        except Exception:
+           cache = {}
+        cache[self.name] = facts
+        try:
+           os.makedirs(os.path.dirname(fn) or '.', exist_ok=True)
+           fd, tmp = tempfile.mkstemp(dir=os.path.dirname(fn) or '.')
+           with os.fdopen(fd, 'w') as f:
+              json.dump(cache, f, indent=1)
+           os.replace(tmp, fn)
+        except Exception as e:
+           print("Failed to write the facts cache file "+fn+". Exception was: "+str(e))
+
     def _find_config(self, cfg_override: str=None):
         """
         Locate the user's preferred configuration file if possible, falling
@@ -365,6 +456,7 @@ class SASsession():
     :param results: Type of tabular results to return. default is 'Pandas', other options are 'HTML or 'TEXT'
     :param lrecl: An integer specifying the record length for transferring wide data sets from SAS to Data Frames.
     :param autoexec: A string of SAS code that will be submitted upon establishing a connection
+    :param resultcache: An integer; cache up to this many results of SASdata's read-only methods (head, tail, obs, contents, columnInfo, info, describe, means). Default is 0, no caching
     :param display: controls how to display html in differnet notebooks. default is jupyter.
            valid values are ['jupyter', 'zeppelin', 'databricks']
     :return: 'SASsession'
@@ -437,6 +529,7 @@ class SASsession():
     - results - Boolean for current value of the set_results() setting. 
     - sascei - string for the SAS Session Encoding this SAS server is using
     - SASpid - The SAS processes id, or None if no SAS session connected
+    - resultcache - the ResultCache that SASdata's read-only methods use, or None if the resultcache option isn't set
 
     """
     # SAS Epoch: 1960-01-01
@@ -467,55 +560,79 @@ class SASsession():
         self.DISPLAY           = self.sascfg.DISPLAY
         self.HTML              = self.sascfg.HTML
         self.logoffset         = 0
+        self._metacache        = {}
+        self._sysendian        = None
+        self.resultcache       = ResultCache(self.sascfg.resultcache) if self.sascfg.resultcache else None
 
         if not self.sascfg.valid:
             self._io = None
             return
 
+        # the startup handshake, which the io module submits from _startsas(); see _handshake()
+        self._facts            = self.sascfg._getfacts()
+        self._startcode        = self._handshake(self._facts)
+        self._startlog         = None
+
+        # only the IO module for this access method is imported
         if self.sascfg.mode in ['STDIO', 'SSH', '']:
             if os.name != 'nt':
+                from saspy.sasiostdio import SASsessionSTDIO
                 self._io = SASsessionSTDIO(sascfgname=self.sascfg.name, sb=self, **kwargs)
             else:
                 raise SASIONotSupportedError(self.sascfg.mode, alts=['IOM'])
         elif self.sascfg.mode == 'IOM':
+            from saspy.sasioiom import SASsessionIOM
             self._io = SASsessionIOM(sascfgname=self.sascfg.name, sb=self, **kwargs)
         elif self.sascfg.mode == 'COM':
+            from saspy.sasiocom import SASSessionCOM
             self._io = SASSessionCOM(sascfgname=self.sascfg.name, sb=self, **kwargs)
         elif self.sascfg.mode == 'HTTP':
+            from saspy.sasiohttp import SASsessionHTTP
             self._io = SASsessionHTTP(sascfgname=self.sascfg.name, sb=self, **kwargs)
 
-        # gather some session info
-        sysvars  = "data _null_; length x $ 4096;"
-        if self.sascfg.mode in ['STDIO', 'SSH', '']:
-           sysvars += " file STDERR;"
-        sysvars += """
-               x = resolve('%sysfunc(pathname(work))');  put 'WORKPATH=' x 'WORKPATHEND=';
-               x = resolve('&SYSENCODING');              put 'ENCODING=' x 'ENCODINGEND=';
-               x = resolve('&SYSVLONG4');                put 'SYSVLONG=' x 'SYSVLONGEND=';
-               x = resolve('&SYSJOBID');                 put 'SYSJOBID=' x 'SYSJOBIDEND=';
-               x = resolve('&SYSSCP');                     put 'SYSSCP=' x 'SYSSCPEND=';
-            run;
-        """
+        # gather some session info. The io module runs this along with its own startup options, when it has
+        # any, and leaves the LOG in _startlog, so getting all of it is one round trip to SAS
+        res = self._startlog
 
         # Validating encoding is done next, so handle it not being set for
         # this one call
         enc = self._io.sascfg.encoding
         if enc == '':
            self._io.sascfg.encoding = 'utf_8'
-        res = self.submit(sysvars, "text")['LOG']
+        if res is None:
+           res = self.submit(self._startcode, "text")['LOG']
+        if self._facts and self._hsvalue(res, 'SYSVLONG') != self._facts.get('sasver'):
+           # SAS has changed since the facts were cached; get them all again
+           self._facts = None
+           res = self.submit(self._handshake(), "text")['LOG']
         self._io.sascfg.encoding = enc
 
-        vlist         = res.rpartition('SYSSCP=')
-        self.hostsep  = vlist[2].partition(' SYSSCPEND=')[0]
-        vlist         = res.rpartition('SYSJOBID=')
-        self.SASpid   = vlist[2].partition(' SYSJOBIDEND=')[0]
-        vlist         = res.rpartition('SYSVLONG=')
-        self.sasver   = vlist[2].partition(' SYSVLONGEND=')[0]
-        vlist         = res.rpartition('ENCODING=')
-        self.sascei   = vlist[2].partition(' ENCODINGEND=')[0]
+        self.SASpid   = self._hsvalue(res, 'SYSJOBID')
+        self.sasver   = self._hsvalue(res, 'SYSVLONG')
         vlist         = res.rpartition('WORKPATH=')
         self.workpath = vlist[2].rpartition('WORKPATHEND=')[0].strip().replace('\n','') 
 
+        if self._facts:
+           self.hostsep   = self._facts['hostsep']
+           self.sascei    = self._facts['sascei']
+           self.logoffset = self._facts['logoffset']
+        else:
+           self.hostsep  = self._hsvalue(res, 'SYSSCP')
+           self.sascei   = self._hsvalue(res, 'ENCODING')
+
+           # this is to support parsing the log to fring log records w/ 'ERROR' when diagnostic logging is enabled.
+           # in thi scase the log can have prefix and/or suffix info so the 'regular' log data is in the middle, not left justified
+           if self.sascfg.mode in ['STDIO', 'SSH', '']:
+              regoff = len(res.rpartition('COL0REG=')[0].rpartition('\n')[2])
+              logoff = len(res.rpartition('COL0LOG=')[0].rpartition('\n')[2])
+
+              if regoff == 0 and logoff > 0:
+                 self.logoffset = logoff
+
+           if self.SASpid and self.sascei in sas_encoding_mapping:
+              self.sascfg._putfacts(dict(sasver=self.sasver, hostsep=self.hostsep, sascei=self.sascei,
+                                         logoffset=self.logoffset))
+
         # validate encoding
         pyenc = sas_encoding_mapping[self.sascei]
         if pyenc is not None:
@@ -561,18 +678,41 @@ class SASsession():
               self.m5dsbug = False
         else:
            self.m5dsbug = self.sascfg.m5dsbug
-                 
-        # this is to support parsing the log to fring log records w/ 'ERROR' when diagnostic logging is enabled.
-        # in thi scase the log can have prefix and/or suffix info so the 'regular' log data is in the middle, not left justified
-        if self.sascfg.mode in ['STDIO', 'SSH', '']:
-           ll = self.submit("""data _null_; file STDERR; put %upcase('col0REG='); 
-                               data _null_; put %upcase('col0LOG=');run;""", results='text')
-           regoff = len(ll['LOG'].rpartition('COL0REG=')[0].rpartition('\n')[2])
-           logoff = len(ll['LOG'].rpartition('COL0LOG=')[0].rpartition('\n')[2])
 
-           if regoff == 0 and logoff > 0:
-              self.logoffset = logoff
 
+    def _handshake(self, facts: dict = None) -> str:
+        """
+        Return the SAS code that gathers what SASsession needs to know about the SAS session when it starts,
+        all in one submit. Each value is written to the LOG as KEY=value KEYEND=; see _hsvalue().
+
+        :param facts: the cached facts about this SAS server, if any; those aren't gathered again
+        :return: str
+        """
+        stdio = self.sascfg.mode in ['STDIO', 'SSH', '']
+
+        code  = "data _null_; length x $ 4096;"
+        if stdio:
+           code += " file STDERR;"
+        code += """
+               x = resolve('%sysfunc(pathname(work))');  put 'WORKPATH=' x 'WORKPATHEND=';
+               x = resolve('&SYSVLONG4');                put 'SYSVLONG=' x 'SYSVLONGEND=';
+               x = resolve('&SYSJOBID');                 put 'SYSJOBID=' x 'SYSJOBIDEND=';
+        """
+        if not facts:
+           code += """
+               x = resolve('&SYSENCODING');              put 'ENCODING=' x 'ENCODINGEND=';
+               x = resolve('&SYSSCP');                   put 'SYSSCP=' x 'SYSSCPEND=';
+           """
+        code += "run;\n"
+
+        if not facts and stdio:
+           code += """data _null_; file STDERR; put %upcase('col0REG=');
+                      data _null_; put %upcase('col0LOG=');run;\n"""
+        return code
+
+    @staticmethod
+    def _hsvalue(log: str, key: str) -> str:
+        return log.rpartition(key+'=')[2].partition(' '+key+'END=')[0]
 
     def __repr__(self):
         """
@@ -698,12 +838,14 @@ class SASsession():
            else:
               print(ll['LOG']+"\n"+ll['LST'])
 
-    def submit(self, code: str, results: str = '', prompt: dict = None) -> dict:
+    def submit(self, code: str, results: str = '', prompt: dict = None, **kwargs) -> dict:
         '''
         This method is used to submit any SAS code. It returns the Log and Listing as a python dictionary.
 
         - code    - the SAS statements you want to execute
         - results - format of results. 'HTML' by default, alternatively 'TEXT'
+        - log_callback - HTTP access method only; a function called with each batch of new LOG lines (a list of str)
+                         while the code is running, so you can follow the LOG of long running steps
         - prompt  - dict of names:flags to prompt for; create macro variables (used in submitted code), then keep or delete
                     the keys which are the names of the macro variables. The boolean flag is to either hide what you type and delete the macros,
                     or show what you type and keep the macros (they will still be available later).
@@ -742,11 +884,37 @@ class SASsession():
             else:
                 results = self.results
 
-        ll = self._io.submit(code, results, prompt)
+        ll = self._io.submit(code, results, prompt, **kwargs)
 
         self._lastlog = ll['LOG']
         return ll
 
+    def submit_async(self, code: str, results: str = ''):
+        """
+        Submit SAS code without waiting for it to complete. Returns a job handle with done(), wait(timeout),
+        result(timeout), cancel() and add_done_callback(fn) methods; result() returns the same dict as submit().
+        To wait on several jobs at once, use saspy.sasiohttp.wait_jobs(). Only supported for the HTTP access method.
+
+        :param code: the SAS statements you want to execute
+        :param results: format of results. 'HTML' by default, alternatively 'TEXT'
+        :return: SASjobHTTP job handle, or None
+        """
+        if not hasattr(self._io, 'submit_async'):
+            print("submit_async is only supported with the HTTP access method.")
+            return None
+
+        if self.nosub:
+            print(code)
+            return None
+
+        if results == '':
+            if self.results.upper() == 'PANDAS':
+                results = 'HTML'
+            else:
+                results = self.results
+
+        return self._io.submit_async(code, results)
+
     def saslog(self) -> str:
         """
         This method is used to get the current, full contents of the SASLOG
@@ -823,6 +991,8 @@ class SASsession():
         if not self._loaded_macros:
             self._loadmacros()
             self._loaded_macros = True
+
+        from saspy.sasets import SASets
         return SASets(self)
 
     def sasstat(self) -> 'SASstat':
@@ -836,6 +1006,7 @@ class SASsession():
             self._loadmacros()
             self._loaded_macros = True
 
+        from saspy.sasstat import SASstat
         return SASstat(self)
 
     def sasml(self) -> 'SASml':
@@ -848,6 +1019,7 @@ class SASsession():
             self._loadmacros()
             self._loaded_macros = True
 
+        from saspy.sasml import SASml
         return SASml(self)
 
     def sasqc(self) -> 'SASqc':
@@ -860,6 +1032,7 @@ class SASsession():
             self._loadmacros()
             self._loaded_macros = True
 
+        from saspy.sasqc import SASqc
         return SASqc(self)
 
     def sasutil(self) -> 'SASutil':
@@ -873,6 +1046,7 @@ class SASsession():
             self._loadmacros()
             self._loaded_macros = True
 
+        from saspy.sasutil import SASutil
         return SASutil(self)
 
     def sasviyaml(self) -> 'SASViyaML':
@@ -886,6 +1060,7 @@ class SASsession():
             self._loadmacros()
             self._loaded_macros = True
 
+        from saspy.sasViyaML import SASViyaML
         return SASViyaML(self)
 
     def _loadmacros(self):
@@ -1083,11 +1258,15 @@ class SASsession():
         :param remotefile: path to remote file to create or overwrite
         :param overwrite: overwrite the output file if it exists?
         :param permission: permissions to set on the new file. See SAS Filename Statement Doc for syntax
+        :param compress: gzip the file for the transfer; defaults to the 'compress' setting of the configuration
         :return: SAS Log
         """
+        compress = kwargs.pop('compress', self.sascfg.compress)
         if self.nosub:
             print("too complicated to show the code, read the source :), sorry.")
             return None
+        elif compress:
+            log = self._upload_gz(localfile, remotefile, overwrite, permission, **kwargs)
         else:
             log = self._io.upload(localfile, remotefile, overwrite, permission, **kwargs)
      
@@ -1100,21 +1279,156 @@ class SASsession():
         :param localfile: path to the local file to create or overwrite
         :param remotefile: path to remote file
         :param overwrite: overwrite the output file if it exists?
+        :param compress: gzip the file for the transfer; defaults to the 'compress' setting of the configuration
         :return: SAS Log
         """
+        compress = kwargs.pop('compress', self.sascfg.compress)
         if self.nosub:
             print("too complicated to show the code, read the source :), sorry.")
             return None
+        elif compress:
+            log = self._download_gz(localfile, remotefile, overwrite, **kwargs)
         else:
             log = self._io.download(localfile, remotefile, overwrite, **kwargs)
      
         return log
+
+    def _df2sd_gz(self, cards, code: str, infile: str):
+        """
+        dataframe2sasdata(compress=True); gzip the cards locally, upload them to the WORK directory and run the
+        data step reading them through a ZIP GZIP fileref (SAS 9.4M5 or later) instead of from datalines
+
+        :param cards: the cards, as strings, from df2cards()
+        :param code: the data step, up to its infile statement
+        :param infile: the rest of the data step after 'infile <fileref> ', through its run statement
+        """
+        tmpdir = tempfile.TemporaryDirectory()
+        tmpgz  = tmpdir.name+os.sep+"saspy_df2sd.gz"
+        remgz  = self.workpath+"saspy_df2sd"+self._objcnt()+".gz"
+        with gzip.open(tmpgz, 'wb', compresslevel=self.sascfg.complevel) as gz:
+            for card in cards:
+                gz.write(card.encode(self._io.sascfg.encoding))
+
+        ll = self._io.upload(tmpgz, remgz)
+        tmpdir.cleanup()
+        if not ll['Success']:
+            print("Upload of the compressed data failed. Returning the SAS log:\n\n"+ll['LOG'])
+            return None
+
+        code  = "filename _spgz ZIP '"+remgz+"' GZIP lrecl="+str(self._io.sascfg.lrecl)+";\n"+code
+        code += "infile _spgz "+infile
+        code += "filename _spgz '"+remgz+"';\ndata _null_; rc = fdelete('_spgz'); run;\nfilename _spgz;\n"
+        self._io.submit(code, 'text')
+
+    def _upload_gz(self, localfile: str, remotefile: str, overwrite: bool = True, permission: str = '', **kwargs):
+        """
+        upload(compress=True); gzip the file locally, upload that to the WORK directory and have SAS expand
+        it into the remote file through a ZIP GZIP fileref (SAS 9.4M5 or later)
+        """
+        valid = self.file_info(remotefile, quiet = True)
+
+        if valid is None:
+            remf = remotefile
+        else:
+            if valid == {}:
+                remf = remotefile + self.hostsep + localfile.rpartition(os.sep)[2]
+            else:
+                remf = remotefile
+                if overwrite == False:
+                    return {'Success' : False,
+                            'LOG'     : "File "+str(remotefile)+" exists and overwrite was set to False. Upload was stopped."}
+
+        tmpdir = tempfile.TemporaryDirectory()
+        tmpgz  = tmpdir.name+os.sep+"saspy_up.gz"
+        try:
+            with open(localfile, 'rb') as fd, gzip.open(tmpgz, 'wb', compresslevel=self.sascfg.complevel) as gz:
+                shutil.copyfileobj(fd, gz, 1048576)
+        except OSError as e:
+            tmpdir.cleanup()
+            return {'Success' : False,
+                    'LOG'     : "File "+str(localfile)+" could not be compressed. Error was: "+str(e)}
+
+        remgz = self.workpath+"saspy_up"+self._objcnt()+".gz"
+        log   = self._io.upload(tmpgz, remgz, True, '', **kwargs)
+        tmpdir.cleanup()
+        if not log['Success']:
+            return log
+
+        code  = "filename _spgzin ZIP '"+remgz+"' GZIP;\n"
+        code += "filename _spout '"+remf+"' recfm=N permission='"+permission+"';\n"
+        code += "data _null_;\ninfile _spgzin lrecl=4096 recfm=F length=len eof=eof unbuf;\nfile _spout;\n"
+        code += "input;\nput _infile_ $varying4096. len;\nreturn;\neof: stop;\nrun;\n"
+        code += "filename _spgzin '"+remgz+"';\ndata _null_; rc = fdelete('_spgzin'); run;\n"
+        code += "filename _spgzin; filename _spout;\n"
+
+        ll = self._io.submit(code, 'text')
+        return {'Success' : 'ERROR' not in ll['LOG'],
+                'LOG'     : ll['LOG']}
+
+    def _download_gz(self, localfile: str, remotefile: str, overwrite: bool = True, **kwargs):
+        """
+        download(compress=True); have SAS gzip the remote file into the WORK directory through a ZIP GZIP
+        fileref (SAS 9.4M5 or later), download that and decompress it locally as it's written out
+        """
+        valid = self.file_info(remotefile, quiet = True)
+
+        if valid is None:
+            return {'Success' : False,
+                    'LOG'     : "File "+str(remotefile)+" does not exist."}
+
+        if valid == {}:
+            return {'Success' : False,
+                    'LOG'     : "File "+str(remotefile)+" is a directory."}
+
+        if os.path.isdir(localfile):
+            locf = localfile + os.sep + remotefile.rpartition(self.hostsep)[2]
+        else:
+            locf = localfile
+
+        remgz = self.workpath+"saspy_dn"+self._objcnt()+".gz"
+        code  = "filename _spin '"+remotefile+"' lrecl=4096 recfm=F;\n"
+        code += "filename _spgzout ZIP '"+remgz+"' GZIP;\n"
+        code += "data _null_;\ninfile _spin length=len eof=eof unbuf;\nfile _spgzout lrecl=4096 recfm=N;\n"
+        code += "input;\nput _infile_ $varying4096. len;\nreturn;\neof: stop;\nrun;\n"
+        code += "filename _spin; filename _spgzout;\n"
+
+        ll = self._io.submit(code, 'text')
+        if 'ERROR' in ll['LOG']:
+            return {'Success' : False,
+                    'LOG'     : ll['LOG']}
+
+        tmpdir = tempfile.TemporaryDirectory()
+        tmpgz  = tmpdir.name+os.sep+"saspy_dn.gz"
+        log    = self._io.download(tmpgz, remgz, True, **kwargs)
+
+        self._io.submit("filename _spgz '"+remgz+"';\ndata _null_; rc = fdelete('_spgz'); run;\nfilename _spgz;\n", 'text')
+
+        if not log['Success']:
+            tmpdir.cleanup()
+            return log
+
+        try:
+            dco = zlib.decompressobj(16 + zlib.MAX_WBITS)
+            with open(tmpgz, 'rb') as gz, open(locf, 'wb') as fd:
+                while True:
+                    buf = gz.read(1048576)
+                    if not len(buf):
+                        break
+                    fd.write(dco.decompress(buf))
+                fd.write(dco.flush())
+        except (OSError, zlib.error) as e:
+            tmpdir.cleanup()
+            return {'Success' : False,
+                    'LOG'     : "File "+str(locf)+" could not be written. Error was: "+str(e)}
+
+        tmpdir.cleanup()
+        return log
      
     def df2sd(self, df: 'pandas.DataFrame', table: str = '_df', libref: str = '',
               results: str = '', keep_outer_quotes: bool = False,
                                  embedded_newlines: bool = False, 
               LF: str = '\x01', CR: str = '\x02', colsep: str = '\x03',
-              datetimes: dict={}, outfmts: dict={}, labels: dict={}) -> 'SASdata':
+              datetimes: dict={}, outfmts: dict={}, labels: dict={}, method: str = 'MEMORY', **kwargs) -> 'SASdata':
         """
         This is an alias for 'dataframe2sasdata'. Why type all that?
 
@@ -1129,16 +1443,28 @@ class SASsession():
         :param colsep: the column seperator character used for streaming the delimmited data to SAS defaults to hex(3)
         :param datetimes: dict with column names as keys and values of 'date' or 'time' to create SAS date or times instead of datetimes
         :param outfmts: dict with column names and SAS formats to assign to the new SAS data set
+        :param labels: dict with column names and SAS Labels to assign to the new SAS data set
+        :param method: defaults to MEMORY:
+
+           - MEMORY streams the data to SAS as delimited text that a Data Step reads with infile datalines
+           - BINARY writes the data locally as fixed length records, numbers as 8 byte doubles and characters as
+                    fixed width fields in the SAS session encoding, uploads that file with upload(), and reads it with
+                    one Data Step using RB8. and $CHARw. informats; nothing is formatted or parsed as text. Works with
+                    every access method. keep_outer_quotes, embedded_newlines, LF, CR and colsep don't apply, since
+                    values are read exactly as they are
+
+        :param compress: gzip the data and upload it instead of streaming it; defaults to the 'compress' config option
         :return: SASdata object
         """
         return self.dataframe2sasdata(df, table, libref, results, keep_outer_quotes, embedded_newlines, 
-                                      LF, CR, colsep, datetimes, outfmts, labels)
+                                      LF, CR, colsep, datetimes, outfmts, labels, method, **kwargs)
 
     def dataframe2sasdata(self, df: 'pandas.DataFrame', table: str = '_df', libref: str = '', 
                           results: str = '', keep_outer_quotes: bool = False,
                                              embedded_newlines: bool = False, 
                           LF: str = '\x01', CR: str = '\x02', colsep: str = '\x03',
-                          datetimes: dict={}, outfmts: dict={}, labels: dict={}) -> 'SASdata':
+                          datetimes: dict={}, outfmts: dict={}, labels: dict={}, method: str = 'MEMORY',
+                          **kwargs) -> 'SASdata':
         """
         This method imports a Pandas Data Frame to a SAS Data Set, returning the SASdata object for the new Data Set.
 
@@ -1153,6 +1479,17 @@ class SASsession():
         :param colsep: the column seperator character used for streaming the delimmited data to SAS defaults to hex(3) 
         :param datetimes: dict with column names as keys and values of 'date' or 'time' to create SAS date or times instead of datetimes
         :param outfmts: dict with column names and SAS formats to assign to the new SAS data set
+        :param labels: dict with column names and SAS Labels to assign to the new SAS data set
+        :param method: defaults to MEMORY:
+
+           - MEMORY streams the data to SAS as delimited text that a Data Step reads with infile datalines
+           - BINARY writes the data locally as fixed length records, numbers as 8 byte doubles and characters as
+                    fixed width fields in the SAS session encoding, uploads that file with upload(), and reads it with
+                    one Data Step using RB8. and $CHARw. informats; nothing is formatted or parsed as text. Works with
+                    every access method. keep_outer_quotes, embedded_newlines, LF, CR and colsep don't apply, since
+                    values are read exactly as they are
+
+        :param compress: gzip the data and upload it instead of streaming it; defaults to the 'compress' config option
         :return: SASdata object
         """
         if self.sascfg.pandas:
@@ -1163,20 +1500,130 @@ class SASsession():
               print("The libref specified is not assigned in this SAS Session.")
               return None
 
+        if method.lower() not in ['memory', 'binary']:
+            print("The specified method is not valid. Supported methods are MEMORY and BINARY")
+            return None
+
         if results == '':
             results = self.results
         if self.nosub:
             print("too complicated to show the code, read the source :), sorry.")
             return None
+        elif method.lower() == 'binary':
+            self._df2sd_binary(df, table, libref, datetimes, outfmts, labels, **kwargs)
         else:
             self._io.dataframe2sasdata(df, table, libref, keep_outer_quotes, embedded_newlines, 
-                                       LF, CR, colsep, datetimes, outfmts, labels)
+                                       LF, CR, colsep, datetimes, outfmts, labels, **kwargs)
 
         if self.exist(table, libref):
             return SASdata(self, libref, table, results)
         else:
             return None
 
+    def _df2sd_binary(self, df: 'pandas.DataFrame', table: str, libref: str, datetimes: dict, outfmts: dict,
+                      labels: dict, **kwargs):
+        """
+        dataframe2sasdata(method='BINARY'); write the Data Frame locally as fixed length binary records, upload the
+        file to the WORK directory, and read it with a single Data Step. The columns get the same types, lengths and
+        formats as with the MEMORY method.
+        """
+        if self._sysendian is None:
+            ll = self._io.submit("%put SYSENDIAN=&sysendian SYSENDIAN_END=;", "text")
+            self._sysendian = ll['LOG'].rpartition('SYSENDIAN=')[2].partition(' SYSENDIAN_END=')[0].strip().upper()
+        byteorder = '>' if self._sysendian == 'BIG' else '<'
+
+        dts = []
+        for i in range(df.shape[1]):
+            kind = df.dtypes.iloc[i].kind
+            if kind in ('O', 'S', 'U', 'V'):
+                dts.append('C')
+            elif kind == 'M':
+                dts.append('D')
+            elif df.dtypes.iloc[i] == 'bool':
+                dts.append('B')
+            else:
+                dts.append('N')
+
+        try:
+            cols = df2binary_columns(df, dts, self.sascfg.encoding)
+        except UnicodeEncodeError as e:
+            print("Transcoding error encountered.")
+            print("DataFrame contains characters that can't be transcoded into the SAS session encoding.\n"+str(e))
+            return None
+        dtype = binary_upload_dtype(cols, dts, byteorder)
+
+        input  = ""
+        xlate  = ""
+        length = ""
+        format = ""
+        label  = ""
+        flags  = []
+        pos    = 1
+        for i in range(df.shape[1]):
+            colname = "'"+str(df.columns[i]).replace("'", "''")+"'n"
+            name    = str(df.columns[i])
+            if name in labels:
+                label += "label "+colname+" ="+labels[name]+";\n"
+            if dts[i] == 'C':
+                width   = cols[i].dtype.itemsize
+                length += " "+colname+" $"+str(width)
+                input  += "@"+str(pos)+" "+colname+" $char"+str(width)+". "
+                pos    += width
+                if name in outfmts:
+                    format += colname+" "+outfmts[name]+" "
+                continue
+
+            flag    = "_spm"+str(i)
+            flags.append(flag)
+            length += " "+colname+" 8"
+            input  += "@"+str(pos)+" "+flag+" $char1. @"+str(pos+1)+" "+colname+" rb8. "
+            xlate  += "if "+flag+" = '.' then "+colname+" = .;\n"
+            pos    += 9
+            fmt     = outfmts.get(name, '')
+            if dts[i] == 'D':
+                dtk = datetimes.get(name, '').lower()
+                if dtk == 'date':
+                    fmt    = fmt or 'E8601DA.'
+                    xlate += colname+" = datepart("+colname+");\n"
+                elif dtk == 'time':
+                    fmt    = fmt or 'E8601TM.'
+                    xlate += colname+" = timepart("+colname+");\n"
+                else:
+                    if dtk:
+                        print("invalid value for datetimes for column "+name+". Using default.")
+                    fmt = fmt or 'E8601DT26.6'
+            if fmt:
+                format += colname+" "+fmt+" "
+
+        remote = self.workpath+"saspy_df2sd"+self._objcnt()+".dat"
+        tmpdir = tf.TemporaryDirectory()
+        local  = tmpdir.name+os.sep+"saspy_df2sd.dat"
+        try:
+            with open(local, 'wb') as f:
+                for block in df2binary(cols, dts, dtype):
+                    f.write(block)
+            ll = self.upload(local, remote, compress=kwargs.get('compress', self.sascfg.compress))
+        finally:
+            tmpdir.cleanup()
+        if ll is None or not ll['Success']:
+            print("Upload of the data failed. Returning the SAS log:\n\n"+(ll['LOG'] if ll else ''))
+            return None
+
+        code  = "filename _spbin '"+remote+"' recfm=f lrecl="+str(dtype.itemsize)+";\n"
+        code += "data "+(libref+"." if len(libref) else "")+"'"+table.strip()+"'n;\n"
+        if len(length):
+            code += "length"+length+";\n"
+        if len(format):
+            code += "format "+format+";\n"
+        code += label
+        code += "infile _spbin;\ninput "+input+";\n"+xlate
+        if flags:
+            code += "drop "+" ".join(flags)+";\n"
+        code += "run;\n"
+        code += "data _null_; rc = fdelete('_spbin'); run;\nfilename _spbin;\n"
+        ll = self._io.submit(code, 'text')
+        return
+
     def sd2df(self, table: str, libref: str = '', dsopts: dict = None, 
               method: str = 'MEMORY', **kwargs) -> 'pandas.DataFrame':
         """
@@ -1209,12 +1656,19 @@ class SASsession():
            - DISK   uses the original (MEMORY) method, but persists to disk and uses pandas read to import.
                     this has better support than CSV for embedded delimiters (commas), nulls, CR/LF that CSV
                     has problems with 
+           - BINARY streams numeric variables as raw 8 byte doubles and character variables as fixed width fields
+                    and decodes them with numpy; no formatting or parsing of the values. Only for STDIO, SSH and IOM
+           - SAS7BDAT writes the table, with dsopts applied, to a data set in WORK and moves that file over whole,
+                    with download(), or reads it in place when SAS is on this host, then decodes it with pandas'
+                    sas7bdat reader. Cheapest for large tables; works with every access method
 
         :param kwargs: a dictionary. These vary per access method, and are generally NOT needed.
                        They are either access method specific parms or specific pandas parms.
                        See the specific sasdata2dataframe* method in the access method for valid possibilities.
                        These are generally here for diagnostics when researching issue, to override things or try
                        different options.  
+                       With MEMORY, these include categorical=, downcast= and dtype_backend=, and, on STDIO and SSH,
+                       parallel= and prows=; see sasdata2dataframe.
 
         :return: Pandas data frame
         """
@@ -1344,20 +1798,34 @@ class SASsession():
            - DISK   uses the original (MEMORY) method, but persists to disk and uses pandas read to import.
                     this has better support than CSV for embedded delimiters (commas), nulls, CR/LF that CSV
                     has problems with 
+           - BINARY streams numeric variables as raw 8 byte doubles and character variables as fixed width fields
+                    and decodes them with numpy; no formatting or parsing of the values. Only for STDIO, SSH and IOM
+           - SAS7BDAT writes the table, with dsopts applied, to a data set in WORK and moves that file over whole,
+                    with download(), or reads it in place when SAS is on this host, then decodes it with pandas'
+                    sas7bdat reader. Cheapest for large tables; works with every access method
 
         :param kwargs: a dictionary. These vary per access method, and are generally NOT needed.
                        They are either access method specific parms or specific pandas parms.
                        See the specific sasdata2dataframe* method in the access method for valid possibilities.
                        These are generally here for diagnostics when researching issue, to override things or try
                        different options.  
+                       With MEMORY, on STDIO, SSH and IOM, these include categorical=, downcast= and dtype_backend=,
+                       to type the columns as the Data Frame is put together: categorical='auto', or a list of
+                       column names, makes Categorical columns ('auto' is the character columns with no more distinct
+                       values than half the rows), downcast=True makes whole number numerics nullable integers and
+                       others float32 where that holds them exactly, and dtype_backend='numpy_nullable' or 'pyarrow'
+                       uses those column types.
+                       Also with MEMORY, on STDIO and SSH only, parallel= streams the rows over that many socket
+                       connections, each decoded in its own thread, dealing them out prows= rows (default 1000) at a
+                       time; the other access methods ignore these two.
 
         :return: Pandas data frame
         """
         if self.sascfg.pandas:
            raise type(self.sascfg.pandas)(self.sascfg.pandas.msg)
 
-        if method.lower() not in ['memory', 'csv', 'disk']:
-            print("The specified method is not valid. Supported methods are MEMORY, CSV and DISK")
+        if method.lower() not in ['memory', 'csv', 'disk', 'binary', 'sas7bdat']:
+            print("The specified method is not valid. Supported methods are MEMORY, CSV, DISK, BINARY and SAS7BDAT")
             return None
 
         dsopts = dsopts if dsopts is not None else {}
@@ -1368,9 +1836,271 @@ class SASsession():
         if self.nosub:
             print("too complicated to show the code, read the source :), sorry.")
             return None
+        elif method.lower() == 'sas7bdat':
+            return self._sd2df_sas7bdat(table, libref, dsopts, **kwargs)
         else:
             return self._io.sasdata2dataframe(table, libref, dsopts, method=method, **kwargs)
 
+    def sd2df_iter(self, table: str, libref: str = '', dsopts: dict = None, chunksize: int = 100000,
+                   **kwargs) -> 'generator':
+        """
+        This method exports the SAS Data Set to a series of Pandas Data Frames, returning a generator that yields
+        a Data Frame of up to chunksize rows at a time. Only one chunk is held in memory at a time, so this can be
+        used for tables that are larger than memory. If you stop iterating before the end, close() the generator
+        (or let it go out of scope) to end the transfer.
+
+        .. code-block:: python
+
+                         for df in sas.sd2df_iter('cars', 'sashelp', chunksize=100):
+                             do_something(df)
+
+        :param table: the name of the SAS Data Set you want to export to Pandas Data Frames
+        :param libref: the libref for the SAS Data Set.
+        :param dsopts: a dictionary containing any of the following SAS data set options(where, drop, keep, obs, firstobs):
+
+            - where is a string
+            - keep are strings or list of strings.
+            - drop are strings or list of strings.
+            - obs is a numbers - either string or int
+            - first obs is a numbers - either string or int
+            - format is a string or dictionary { var: format }
+
+        :param chunksize: the number of rows in each Data Frame; the last one may have fewer
+        :param kwargs: a dictionary. These vary per access method, and are generally NOT needed.
+                       See the specific sasdata2dataframe* method in the access method for valid possibilities.
+
+        :return: generator of Pandas data frames
+        """
+        if self.sascfg.pandas:
+           raise type(self.sascfg.pandas)(self.sascfg.pandas.msg)
+
+        dsopts = dsopts if dsopts is not None else {}
+        if self.exist(table, libref) == 0:
+            print('The SAS Data Set ' + libref + '.' + table + ' does not exist')
+            return None
+
+        if self.nosub:
+            print("too complicated to show the code, read the source :), sorry.")
+            return None
+
+        if hasattr(self._io, 'sasdata2dataframe_iter'):
+            return self._io.sasdata2dataframe_iter(table, libref, dsopts, chunksize=chunksize, **kwargs)
+        else:
+            return self._sd2df_pages(table, libref, dsopts, chunksize, **kwargs)
+
+    def _sd2df_pages(self, table: str, libref: str, dsopts: dict, chunksize: int, **kwargs) -> 'generator':
+        """
+        Generator used by sd2df_iter for access methods that can't stream chunks; each chunk is its own
+        sasdata2dataframe call over a firstobs=/obs= window of the table.
+        """
+        first = dsopts.get('firstobs', '')
+        first = int(first) if len(str(first)) else 1
+        last  = dsopts.get('obs', '')
+        last  = int(last) if len(str(last)) and str(last).lower() != 'max' else None
+
+        while last is None or first <= last:
+            end = first + chunksize - 1
+            if last is not None:
+                end = min(end, last)
+
+            topts             = dict(dsopts)
+            topts['firstobs'] = first
+            topts['obs']      = end
+
+            df = self._io.sasdata2dataframe(table, libref, topts, **kwargs)
+            if not isinstance(df, pandas.DataFrame):
+                print("sd2df_iter was interupted. Check the SAS log for errors.")
+                return
+
+            if len(df) > 0:
+                yield df
+            if len(df) < end - first + 1:
+                return
+            first = end + 1
+
+    def _sd2df_sas7bdat(self, table: str, libref: str, dsopts: dict, tempfile: str = None, tempkeep: bool = False,
+                        chunksize: int = 100000, **kwargs) -> 'pandas.DataFrame':
+        """
+        sasdata2dataframe(method='SAS7BDAT'); write the table, with dsopts applied, to a data set in WORK and decode
+        that file locally with pandas.read_sas(), chunksize rows at a time. For STDIO, where the WORK directory is on
+        this host, the file is read in place; otherwise it's moved over whole with download().
+        Date, time and datetime variables are converted the same as for the other methods; dtype= overrides that.
+
+        :param tempfile: an OS path for the local copy of the file; default is a temporary file that's cleaned up
+        :param tempkeep: if you specify your own file with tempfile=, this controls whether it's cleaned up after using it
+        :param chunksize: the number of rows to decode at a time
+        """
+        k_dts   = kwargs.pop('dtype', None)
+        tabname = (libref + "." if len(libref) else "") + "'" + table.strip() + "'n"
+        member  = '_sd2df' + self._objcnt()
+
+        varlist, vartype, varlen, varcat, nobs = self._sd2df_meta(tabname, dsopts)
+
+        code  = "data work." + member + "(compress=no); set " + tabname + " " + self._dsopts(dsopts) + "; run;\n"
+        ll    = self._io.submit(code, "text")
+        if not self.exist(member, 'WORK'):
+            print("sasdata2dataframe with method=SAS7BDAT failed to write the table. The SAS log was:\n" + ll['LOG'])
+            return None
+
+        remote = self.workpath + member + ".sas7bdat"
+        tmpdir = None
+        local  = None
+        try:
+            if self.sascfg.mode == 'STDIO' and os.path.isfile(remote):
+                src = remote
+            else:
+                if tempfile is None:
+                    tmpdir   = tf.TemporaryDirectory()
+                    tempfile = tmpdir.name + os.sep + member + ".sas7bdat"
+                local = tempfile
+                res   = self.download(local, remote)
+                if res is None or not res.get('Success'):
+                    print("sasdata2dataframe with method=SAS7BDAT failed to download the file. The SAS log was:\n" +
+                          (res['LOG'] if res else ''))
+                    return None
+                src = local
+
+            with pandas.read_sas(src, format='sas7bdat', chunksize=chunksize,
+                                 encoding=self.sascfg.encoding or None) as reader:
+                chunks = [chunk for chunk in reader]
+            df = pandas.concat(chunks, ignore_index=True) if chunks else pandas.DataFrame(columns=varlist)
+        finally:
+            if tmpdir:
+                tmpdir.cleanup()
+            elif local and not tempkeep and os.path.isfile(local):
+                os.remove(local)
+            self._io.submit("proc delete data=work." + member + "; run;", "text")
+
+        if k_dts is not None:
+            return df.astype(k_dts)
+
+        # read_sas converts the date and datetime formats it knows; the rest of ours are still numbers
+        today = pandas.Timestamp.today().normalize()
+        for col, fmt in zip(df.columns, varcat):
+            if df[col].dtype.kind != 'f':
+                continue
+            if fmt in self.sas_date_fmts:
+                df[col] = pandas.to_datetime(df[col], unit='D', origin='1960-01-01', errors='coerce')
+            elif fmt in self.sas_datetime_fmts:
+                df[col] = pandas.to_datetime(df[col], unit='s', origin='1960-01-01', errors='coerce')
+            elif fmt in self.sas_time_fmts:
+                df[col] = today + pandas.to_timedelta(df[col], unit='s')
+        return df
+
+    def _stampcode(self, tabname: str) -> str:
+        """
+        Data Step statements that write STAMP= and the table's modification date, creation date, number of observations
+        and variables to the LOG, or NONE if it can't be opened or is a view; and set nobs.
+        """
+        code  = "length stamp $200; d2 = open(\""+tabname.strip()+"\"); nobs = -1; stamp = 'NONE';\n"
+        code += "if d2 then do; nobs = attrn(d2, 'NLOBS'); if attrc(d2, 'MTYPE') = 'DATA' then\n"
+        code += "   stamp = catx(':', attrn(d2, 'MODTE'), attrn(d2, 'CRDTE'), nobs, attrn(d2, 'NVARS'));\n"
+        code += "rc = close(d2); end;\n"
+        code += "st='STAMP='; put st stamp;\n"
+        return code
+
+    def _tabstamp(self, tabname: str) -> str:
+        """
+        Return a string that changes whenever the table does, for validating what's been cached about it;
+        None if the table can't be opened or is a view, in which case nothing about it should be cached
+
+        :param tabname: the table, as libref.'table'n
+        """
+        out   = "file STDERR; " if self.sascfg.mode in ['STDIO', 'SSH', ''] else "file LOG; "
+        ll    = self._io.submit("data _null_; "+out+self._stampcode(tabname)+"run;", "text")
+        stamp = ll['LOG'].rpartition("STAMP= ")[2].partition("\n")[0]
+        return stamp if stamp not in ('', 'NONE') else None
+
+    def _sd2df_meta(self, tabname: str, dsopts: dict) -> tuple:
+        """
+        Get what sasdata2dataframe needs to know about the table it's exporting, in one submit: the variable names,
+        types, lengths and format names (as vformatn would return them), and the number of observations in the table,
+        before any where clause, or -1 if it's not known.
+
+        This is cached for the session by table and data set options. A cached entry is used as long as the table's
+        modification date, creation date, number of observations and variables haven't changed, which takes only a
+        short submit to check. Views aren't cached, since they can change without any of those changing.
+
+        :param tabname: the table, as libref.'table'n
+        :param dsopts: the data set options
+        :return: tuple of (varlist, vartype, varlen, varcat, nobs)
+        """
+        key  = tabname.strip()+self._dsopts(dsopts)
+        out  = "file STDERR; " if self.sascfg.mode in ['STDIO', 'SSH', ''] else "file LOG; "
+
+        cached = self._metacache.get(key)
+        if cached is not None:
+            if self._tabstamp(tabname) == cached[0]:
+                varlist, vartype, varlen, varcat, nobs = cached[1]
+                return list(varlist), list(vartype), list(varlen), list(varcat), nobs
+            del self._metacache[key]
+
+        code  = "data sasdata2dataframe / view=sasdata2dataframe; set "+tabname+self._dsopts(dsopts)+";run;\n"
+        code += "data _null_; "+out+"d = open('sasdata2dataframe');\n"
+        code += "length var $256;\n"
+        code += "lrecl = attrn(d, 'LRECL'); nvars = attrn(d, 'NVARS');\n"
+        code += self._stampcode(tabname)
+        code += "lr='LRECL='; vn='VARNUMS='; vl='VARLIST='; vt='VARTYPE='; vz='VARLEN='; no='NOBS='; vf='FMT_CATS=';\n"
+        code += "put no nobs; put lr lrecl; put vn nvars; put vl;\n"
+        code += "do i = 1 to nvars; var = compress(varname(d, i), '00'x); put var; end;\n"
+        code += "put vt;\n"
+        code += "do i = 1 to nvars; var = vartype(d, i); put var; end;\n"
+        code += "put vz;\n"
+        code += "do i = 1 to nvars; var = left(put(varlen(d, i), best12.)); put var; end;\n"
+        code += "put vf;\n"
+        code += "do i = 1 to nvars; var = upcase(strip(varfmt(d, i)));\n"
+        code += "   if var = '' then var = ifc(vartype(d, i) = 'N', 'BEST', '$');\n"
+        code += "   else var = prxchange('s/\\d*\\.\\d*$//', 1, strip(var)); put var; end;\n"
+        code += "rc = close(d);\n"
+        code += "run;"
+
+        ll = self._io.submit(code, "text")
+
+        l2 = ll['LOG'].rpartition("STAMP= ")
+        l2 = l2[2].partition("\n")
+        stamp = l2[0]
+
+        l2 = l2[2].partition("NOBS= ")
+        l2 = l2[2].partition("\n")
+        try:
+            nobs = int(l2[0])
+        except ValueError:
+            nobs = -1
+
+        l2 = l2[2].partition("LRECL= ")
+        l2 = l2[2].partition("\n")
+
+        l2 = l2[2].partition("VARNUMS= ")
+        l2 = l2[2].partition("\n")
+        nvars = int(l2[0])
+
+        l2 = l2[2].partition("\n")
+        varlist = l2[2].split("\n", nvars)
+        del varlist[nvars]
+
+        l2 = l2[2].partition("VARTYPE=")
+        l2 = l2[2].partition("\n")
+        vartype = l2[2].split("\n", nvars)
+        del vartype[nvars]
+
+        l2 = l2[2].partition("VARLEN=")
+        l2 = l2[2].partition("\n")
+        varlen = l2[2].split("\n", nvars)
+        del varlen[nvars]
+        varlen = [int(i) for i in varlen]
+
+        l2 = l2[2].partition("FMT_CATS=")
+        l2 = l2[2].partition("\n")
+        varcat = l2[2].split("\n", nvars)
+        del varcat[nvars]
+
+        meta = (varlist, vartype, varlen, varcat, nobs)
+        if stamp not in ('', 'NONE'):
+            if len(self._metacache) >= 64:
+                del self._metacache[next(iter(self._metacache))]
+            self._metacache[key] = (stamp, meta)
+        return meta
+
     def _dsopts(self, dsopts):
         """
         :param dsopts: a dictionary containing any of the following SAS data set options(where, drop, keep, obs, firstobs):
@@ -14,15 +14,225 @@
 #  limitations under the License.
 #
 
-#so the doc will generate for df methods
-try:
-   import pandas
-except Exception as e:
-   pass
-
 import logging
 import re
+import copy
+import datetime
+import decimal
+import hashlib
+import numbers
+import threading
+from collections import OrderedDict
+from functools import wraps
 import saspy as sp2
+from saspy.sasplan import _refs
+
+class ResultCache:
+    """
+    A least recently used cache of the results of SASdata's read-only methods, for a SASsession.
+    Turn it on with the resultcache option, which is the most results to keep.
+
+    Each result is kept with the table's stamp (its modification and creation dates, and number of observations and
+    variables) and is only used while the stamp is the same, so checking costs a short submit instead of rerunning
+    the method. Results are only cached when the method returns something: Pandas results, or batch mode.
+    Results for views aren't cached, since a view can change without its stamp changing.
+
+    :param size: the most results to keep
+    """
+    def __init__(self, size: int):
+        self.size    = int(size)
+        self.hits    = 0
+        self.misses  = 0
+        self._cache  = OrderedDict()
+        self._lock   = threading.Lock()
+
+    def __repr__(self):
+        return "ResultCache(size=%d, entries=%d, hits=%d, misses=%d)" % (self.size, len(self._cache), self.hits, self.misses)
+
+    def __len__(self):
+        return len(self._cache)
+
+    def get(self, key, stamp):
+        """
+        Return the cached result for key if it was cached with this stamp, else None
+        """
+        with self._lock:
+            hit = self._cache.get(key)
+            if hit is None or hit[0] != stamp:
+                self.misses += 1
+                return None
+            self._cache.move_to_end(key)
+            self.hits += 1
+        return copy.deepcopy(hit[1])
+
+    def put(self, key, stamp, result):
+        """
+        Cache result for key, with the stamp it is valid for, evicting the least recently used result if full
+        """
+        with self._lock:
+            self._cache[key] = (stamp, copy.deepcopy(result))
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.size:
+                self._cache.popitem(last=False)
+
+    def clear(self):
+        """
+        Remove all of the cached results
+        """
+        with self._lock:
+            self._cache.clear()
+            self.hits   = 0
+            self.misses = 0
+
+def _cached(method=None, displays: bool = True):
+    """
+    Decorator for the SASdata methods that only read the table, to use the session's ResultCache when there is one.
+    displays - whether the method displays its results, instead of returning them, when results isn't Pandas and
+               not in batch mode; those calls aren't cached, so skip checking the table's stamp for them
+    """
+    if method is None:
+        return lambda method: _cached(method, displays)
+
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        cache = self.sas.resultcache
+        if cache is None or self.sas.nosub:
+            return method(self, *args, **kwargs)
+        if displays and not self.sas.batch and self.results.upper() != 'PANDAS':
+            return method(self, *args, **kwargs)
+
+        tabname = self.libref + ".'" + self.table + "'n"
+        stamp   = self.sas._tabstamp(tabname)
+        if stamp is None:
+            return method(self, *args, **kwargs)
+
+        key = (method.__name__, tabname.upper(), self._dsopts(), self.results.upper(), self.HTML, self.sas.batch,
+               repr(args), repr(sorted(kwargs.items())))
+        res = cache.get(key, stamp)
+        if res is None:
+            res = method(self, *args, **kwargs)
+            if res is not None:
+                cache.put(key, stamp, res)
+        return res
+    return wrapper
+
+class SASwhere(str):
+    """
+    A SAS where expression built from SAScolumn comparisons, for filtering a SASdata object with sd[expr].
+    Combine them with & (and), | (or) and ~ (not).
+    """
+    def __and__(self, other):
+        return SASwhere('(' + self + ') and (' + str(other) + ')')
+
+    def __or__(self, other):
+        return SASwhere('(' + self + ') or (' + str(other) + ')')
+
+    def __invert__(self):
+        return SASwhere('not (' + self + ')')
+
+class SAScolumn:
+    """
+    A reference to a column of a SASdata object, gotten as sd.col('colname'). Comparing it to a value gives a SASwhere
+    expression, so sd[sd.col('msrp') > 30000] is sd with where=(msrp > 30000).
+
+    :param name: the name of the column
+    """
+    def __init__(self, name: str):
+        self.name = name
+
+    def __repr__(self):
+        return "SAScolumn(%r)" % self.name
+
+    def _ref(self) -> str:
+        if re.fullmatch(r"[A-Za-z_][A-Za-z0-9_]*", self.name):
+            return self.name
+        return "'" + self.name.replace("'", "''") + "'n"
+
+    _months = ['JAN', 'FEB', 'MAR', 'APR', 'MAY', 'JUN', 'JUL', 'AUG', 'SEP', 'OCT', 'NOV', 'DEC']
+
+    @classmethod
+    def _lit(cls, value) -> str:
+        """
+        Return the value as a SAS literal: strings single quoted, numbers as numbers, booleans as 1 or 0, dates and
+        datetimes as 'ddMONyyyy'd and 'ddMONyyyy:hh:mm:ss.ffffff'dt, and None, NaN and NaT as missing (.)
+        """
+        kind = getattr(getattr(value, 'dtype', None), 'kind', None)
+        if kind == 'M':
+            # numpy datetime64; NaT becomes None
+            value = value.astype('datetime64[us]').item()
+        elif kind == 'b':
+            value = bool(value)
+
+        if isinstance(value, SAScolumn):
+            return value._ref()
+        if isinstance(value, str):
+            # single quoted, so SAS doesn't resolve & or % in the value as macro triggers
+            return "'" + value.replace("'", "''") + "'"
+        if value is None or value != value:
+            return '.'
+        if isinstance(value, bool):
+            return '1' if value else '0'
+        if isinstance(value, numbers.Integral):
+            return str(int(value))
+        if isinstance(value, (numbers.Real, decimal.Decimal)):
+            return repr(float(value))
+        if isinstance(value, datetime.datetime):
+            return "'%02d%s%04d:%02d:%02d:%02d.%06d'dt" % (value.day, cls._months[value.month-1], value.year,
+                                                         value.hour, value.minute, value.second, value.microsecond)
+        if isinstance(value, datetime.date):
+            return "'%02d%s%04d'd" % (value.day, cls._months[value.month-1], value.year)
+        raise TypeError("Can't use a value of type "+type(value).__name__+" in a SAS where expression")
+
+    def _cmp(self, op: str, value) -> SASwhere:
+        return SASwhere(self._ref() + ' ' + op + ' ' + self._lit(value))
+
+    def __eq__(self, value):
+        if value is None:
+            return self.isnull()
+        return self._cmp('=', value)
+
+    def __ne__(self, value):
+        if value is None:
+            return self.notnull()
+        return self._cmp('ne', value)
+
+    def __lt__(self, value):
+        return self._cmp('<', value)
+
+    def __le__(self, value):
+        return self._cmp('<=', value)
+
+    def __gt__(self, value):
+        return self._cmp('>', value)
+
+    def __ge__(self, value):
+        return self._cmp('>=', value)
+
+    __hash__ = object.__hash__
+
+    def isin(self, values) -> SASwhere:
+        """
+        The column's value is one of values
+        """
+        return SASwhere(self._ref() + ' in (' + ', '.join(self._lit(v) for v in values) + ')')
+
+    def between(self, low, high) -> SASwhere:
+        """
+        The column's value is from low to high, inclusive
+        """
+        return SASwhere(self._ref() + ' between ' + self._lit(low) + ' and ' + self._lit(high))
+
+    def isnull(self) -> SASwhere:
+        """
+        The column's value is missing
+        """
+        return SASwhere(self._ref() + ' is missing')
+
+    def notnull(self) -> SASwhere:
+        """
+        The column's value is not missing
+        """
+        return SASwhere(self._ref() + ' is not missing')
 
 class SASdata:
     """
@@ -98,9 +308,64 @@ class SASdata:
         self.results  = results
         self.tabulate = sp2.Tabulate(sassession, self)
 
-    def __getitem__(self, key):
-        print(key)
-        print(type(key))
+    def col(self, name: str) -> SAScolumn:
+        """
+        Return a reference to a column, for building where expressions like sd[sd.col('msrp') > 30000]. Nothing is
+        submitted to SAS; a column that doesn't exist fails when the where is used.
+
+        :param name: the name of the column
+        :return: SAScolumn
+        """
+        return SAScolumn(name)
+
+    def __getitem__(self, key) -> 'SASdata':
+        """
+        Select columns or filter rows, returning a new SASdata object with keep= or where= data set options, so only
+        those columns and rows are read when it's used or downloaded. The original SASdata object is not affected.
+
+            - sd['col'] or sd[sd.col('col')] keeps one column
+            - sd[['a', 'b']] keeps those columns
+            - sd[sd.col('msrp') > 30000] filters rows; combine filters with &, | and ~
+
+        Keeping columns of a SASdata object that already has a where on other columns can't be done with data set
+        options, since keep= is applied first; that returns a SASdata object for a WORK view instead. The view is
+        named for what it selects, so selecting the same thing again reuses it.
+
+        :param key: a column name, list of column names, or SASwhere expression
+        :return: SAS data object
+        """
+        if isinstance(key, SAScolumn):
+            key = key.name
+
+        dsopts = dict(self.dsopts)
+        where  = dsopts.get('where', [])
+        where  = ([where] if where.strip() else []) if isinstance(where, str) else list(where)
+
+        if isinstance(key, SASwhere):
+            where = where + [str(key)]
+            dsopts['where'] = where if len(where) == 1 else ['(' + w + ')' for w in where]
+        elif isinstance(key, (str, list, tuple)):
+            keep = [key] if isinstance(key, str) else [k.name if isinstance(k, SAScolumn) else k for k in key]
+            need = set()
+            for w in where:
+                need |= _refs(w)
+            if need and not need <= {k.upper() for k in keep}:
+                base = SASdata(self.sas, self.libref, self.table, results=self.results,
+                               dsopts={k: v for k, v in self.dsopts.items() if k not in ('where', 'keep')})
+                plan = base.lazy()
+                for w in where:
+                    plan = plan.where(w)
+                name = hashlib.md5(repr((self.libref, self.table, sorted(self.dsopts.items(), key=str), keep)).encode())
+                return plan.keep(keep).collect('work._sdv' + name.hexdigest()[:16], view=True, results=self.results)
+            dsopts.pop('keep', None)
+            dsopts['keep'] = keep
+        else:
+            print("The key must be a column name, a list of column names, or a where expression like sd[sd.col('x') > 5]")
+            return None
+
+        sd = SASdata(self.sas, self.libref, self.table, results=self.results, dsopts=dsopts)
+        sd.HTML = self.HTML
+        return sd
 
     def __repr__(self):
         """
@@ -193,6 +458,18 @@ class SASdata:
         sd.dsopts['where'] = where
         return sd
 
+    def lazy(self) -> 'SASdataPlan':
+        """
+        This method returns a lazy query plan over this SASdata object. The plan's where, keep, drop, add_vars, impute,
+        partition and sort methods don't submit anything; they are compiled into one DATA step, that reads the table
+        once, when the plan is collected with its collect(), to_df() or head() methods.
+
+        :return: SASdataPlan object
+        """
+        from saspy.sasplan import SASdataPlan
+        return SASdataPlan(self)
+
+    @_cached
     def head(self, obs=5):
         """
         display the first n rows of a table
@@ -230,6 +507,7 @@ class SASdata:
                 else:
                     return ll
 
+    @_cached
     def tail(self, obs=5):
         """
         display the last n rows of a table
@@ -299,6 +577,7 @@ class SASdata:
                 else:
                     return ll
 
+    @_cached(displays=False)
     def obs(self, force: bool = False) -> int:
         """
         :param force: if nobs isn't availble, set to True to force it to be calculated; may take time
@@ -478,6 +757,7 @@ class SASdata:
             else:
                 return self
 
+    @_cached
     def contents(self):
         """
         display metadata about the table. size, number of rows, columns and their data type ...
@@ -516,6 +796,7 @@ class SASdata:
                 else:
                     return ll
 
+    @_cached
     def columnInfo(self):
         """
         display metadata about the table, size, number of rows, columns and their data type
@@ -549,6 +830,7 @@ class SASdata:
                 else:
                     return ll
 
+    @_cached
     def info(self) -> 'pandas.DataFrame':
         """
         Display the column info on a SAS data object
@@ -609,6 +891,7 @@ class SASdata:
         """
         return self.means()
 
+    @_cached
     def means(self):
         """
         display descriptive statistics for the table; summary statistics. This is an alias for 'describe'
@@ -1083,12 +1366,18 @@ class SASdata:
            - DISK   uses the original (MEMORY) method, but persists to disk and uses pandas read to import.
                     this has better support than CSV for embedded delimiters (commas), nulls, CR/LF that CSV
                     has problems with 
+           - BINARY streams numeric variables as raw 8 byte doubles and character variables as fixed width fields
+                    and decodes them with numpy; no formatting or parsing of the values. Only for STDIO, SSH and IOM
+           - SAS7BDAT writes the table to a data set in WORK and moves that file over whole, or reads it in place
+                    when SAS is on this host, then decodes it with pandas' sas7bdat reader. Cheapest for large tables
 
         :param kwargs: a dictionary. These vary per access method, and are generally NOT needed.
                        They are either access method specific parms or specific pandas parms.
                        See the specific sasdata2dataframe* method in the access method for valid possibilities.
                        These are generally here for diagnostics when researching issue, to override things or try
                        different options.  
+                       With MEMORY, these include categorical=, downcast= and dtype_backend=, and, on STDIO and SSH,
+                       parallel= and prows=; see SASsession.sasdata2dataframe.
 
         :return: Pandas data frame
         """
@@ -1147,6 +1436,23 @@ class SASdata:
         """
         return self.to_df(method='DISK', tempfile=tempfile, tempkeep=tempkeep, **kwargs)
 
+    def iter_chunks(self, chunksize: int = 100000, **kwargs) -> 'generator':
+        """
+        Export this SAS Data Set to a series of Pandas Data Frames, yielding up to chunksize rows at a time.
+        Only one chunk is held in memory at a time. See SASsession.sd2df_iter for details.
+
+        :param chunksize: the number of rows in each Data Frame; the last one may have fewer
+        :param kwargs: a dictionary. These vary per access method, and are generally NOT needed.
+
+        :return: generator of Pandas data frames
+        """
+        ll = self._is_valid()
+        if ll:
+            print(ll['LOG'])
+            return None
+        else:
+            return self.sas.sd2df_iter(self.table, self.libref, self.dsopts, chunksize=chunksize, **kwargs)
+
     def to_json(self, pretty: bool = False, sastag: bool = False, **kwargs) -> str:
         """
         Export this SAS Data Set to a JSON Object
@@ -0,0 +1,582 @@
+#
+# Copyright SAS Institute
+#
+#  Licensed under the Apache License, Version 2.0 (the License);
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#
+import csv
+import io
+import queue
+import threading
+
+from saspy.saslazy import LazyModule, available
+
+pd = LazyModule('pandas')
+np = LazyModule('numpy')
+
+def _card_column(col, dt, embedded_newlines=False, LF='\x01', CR='\x02'):
+   """
+   Format one column of a Data Frame, all at once, into the text SAS will read from datalines.
+   col - the pandas Series to format
+   dt  - 'N' numeric, 'B' boolean, 'D' datetime or 'C' character; same codes dataframe2sasdata uses
+   """
+   miss = col.isna().values
+
+   if   dt == 'B':
+      out = col.astype('int64').astype(str).values.astype(object)
+   elif dt == 'D':
+      out = np.datetime_as_string(col.values.astype('datetime64[us]'), unit='us').astype(object)
+   elif dt == 'C':
+      out = col.astype(str)
+      if embedded_newlines:
+         out = out.str.replace('\n', LF, regex=False).str.replace('\r', CR, regex=False)
+      out = out.values.astype(object)
+   else:
+      out = col.astype(str).values.astype(object)
+
+   if miss.any():
+      out[miss] = ' ' if dt == 'C' else '.'
+
+   return out
+
+def df2cards(df, dts: list, colsep: str = '\x03', embedded_newlines: bool = False,
+             LF: str = '\x01', CR: str = '\x02', blocksize: int = 4194304):
+   """
+   Generator returning the cards (datalines) for a Data Frame in blocks of roughly blocksize characters.
+   Each column is formatted once for the whole block, instead of cell by cell, and the rows are
+   joined into a single string, each line terminated by a newline.
+   df        - the Pandas Data Frame to convert
+   dts       - list of the type codes ('N', 'B', 'D', 'C') for each column, as built by dataframe2sasdata
+   colsep    - the column seperator character
+   blocksize - approximate number of characters per block returned
+   """
+   nrows = df.shape[0]
+   ncols = df.shape[1]
+   if nrows == 0 or ncols == 0:
+      return
+
+   start = 0
+   rows  = min(nrows, 1000)
+
+   while start < nrows:
+      blk  = df.iloc[start:start+rows]
+      cols = [_card_column(blk.iloc[:, i], dts[i], embedded_newlines, LF, CR) for i in range(ncols)]
+
+      if ncols == 1:
+         cards = '\n'.join(cols[0])
+      else:
+         cards = '\n'.join(map(colsep.join, zip(*cols)))
+      cards += '\n'
+
+      start += rows
+      # size the rest of the blocks off of what the first one came out to
+      rows   = max(int(blocksize / (len(cards) / len(blk))), 1)
+
+      yield cards
+
+def binary_dtype(vartype: list, varlen: list, byteorder: str = '<'):
+   """
+   Build the numpy structured dtype for one record of a method=BINARY transfer.
+   Numeric variables are RB8. doubles, character variables are $CHARw. fixed width fields.
+   vartype   - list of 'N' or 'C' for each variable
+   varlen    - list of the lengths, in bytes, of each variable
+   byteorder - '<' or '>'; the byte order the SAS session wrote the doubles in
+   """
+   fields = []
+   for i in range(len(vartype)):
+      if vartype[i] == 'N':
+         fields.append(('f'+str(i), byteorder+'f8'))
+      else:
+         fields.append(('f'+str(i), 'S'+str(varlen[i])))
+   return np.dtype(fields)
+
+def binary_byteorder(hdr: bytes) -> str:
+   """
+   Return the byte order of the SAS session given the first 8 bytes of a BINARY transfer, which are
+   the value 1 written out with RB8.
+   """
+   if hdr == np.array([1.0], dtype='<f8').tobytes():
+      return '<'
+   else:
+      return '>'
+
+# range of SAS datetime values (seconds from 1960) that fit in a pandas Timestamp
+_SAS_DT_MIN = -9223372036.854775 + 315619200
+_SAS_DT_MAX =  9223372036.854775 + 315619200
+
+def binary2df(buf: bytes, dtype, varlist: list, kinds: list, encoding: str, epoch) -> '<Pandas Data Frame object>':
+   """
+   Decode a block of complete method=BINARY records into a Data Frame.
+   buf      - the bytes of the records; any partial record at the end is ignored
+   dtype    - the record dtype from binary_dtype()
+   varlist  - the variable names, in order
+   kinds    - for each variable; 'N' numeric, 'D' date, 'T' time, 'DT' datetime or 'C' character
+   encoding - the python encoding of the SAS session, for decoding character variables
+   epoch    - the SAS epoch (1960-01-01) that dates and datetimes are offsets from; times are from midnight today
+   """
+   nrecs = len(buf) // dtype.itemsize
+   arr   = np.frombuffer(buf, dtype=dtype, count=nrecs)
+   org   = pd.Timestamp(epoch)
+   today = pd.Timestamp.today().normalize()
+   cols  = {}
+
+   for i in range(len(varlist)):
+      col  = arr['f'+str(i)]
+      kind = kinds[i]
+      if   kind == 'C':
+         col = pd.Series(col).str.decode(encoding, errors='replace').str.rstrip(' ')
+         col = col.where(col != '', np.nan)
+      elif kind == 'N':
+         col = pd.Series(col.astype('float64'))
+      else:
+         secs = col.astype('float64')
+         if kind == 'D':
+            secs = secs * 86400.0
+         secs = np.where((secs > _SAS_DT_MIN) & (secs < _SAS_DT_MAX), secs, np.nan)
+         # times are today at that time, the same as the other methods give
+         col  = pd.Series(pd.to_datetime(secs, unit='s', origin=today if kind == 'T' else org))
+      cols[varlist[i]] = col
+
+   return pd.DataFrame(cols, columns=varlist)
+
+def df2binary_columns(df, dts: list, encoding: str) -> list:
+   """
+   Convert each column of a Data Frame, all at once, to what a BINARY upload writes for it; the reverse of binary2df.
+   Numeric, boolean and datetime columns become float64 arrays, with NaN for missing and datetimes as SAS datetime
+   values (seconds from 1960). Character columns become blank padded 'S' arrays in the SAS session encoding,
+   as wide as the longest value, or 8 if they're all empty. Raises UnicodeEncodeError if a value can't be encoded.
+   df       - the Pandas Data Frame to convert
+   dts      - list of the type codes ('N', 'B', 'D', 'C') for each column, as built by dataframe2sasdata
+   encoding - the python encoding of the SAS session
+   """
+   cols = []
+   for i in range(df.shape[1]):
+      col = df.iloc[:, i]
+      dt  = dts[i]
+      if   dt == 'C':
+         # as object first, so a Categorical doesn't reject '' as a new category
+         enc = col.astype(object).where(col.notna(), '').astype(str).str.encode(encoding)
+         arr = enc.values.astype('S'+str(int(enc.str.len().max() if len(enc) else 0) or 8))
+         if len(arr):
+            raw = arr.view(np.uint8).reshape(len(arr), -1)
+            raw[raw == 0] = 32
+      elif dt == 'D':
+         miss = col.isna().values
+         arr  = (col.values.astype('datetime64[us]') - np.datetime64('1960-01-01', 'us')).astype('float64') / 1e6
+         arr[miss] = np.nan
+      elif dt == 'B':
+         arr = col.values.astype('float64')
+      else:
+         arr = pd.to_numeric(col, errors='coerce').to_numpy(dtype='float64', na_value=np.nan)
+      cols.append(arr)
+   return cols
+
+def binary_upload_dtype(cols: list, dts: list, byteorder: str = '<'):
+   """
+   Build the numpy structured dtype for one record of a BINARY upload. Each numeric variable is a one byte missing
+   flag, '.' or blank, then the RB8. double; each character variable is a $CHARw. fixed width field.
+   cols      - the arrays from df2binary_columns()
+   dts       - list of the type codes for each column
+   byteorder - '<' or '>'; the byte order of the SAS session
+   """
+   fields = []
+   for i in range(len(cols)):
+      if dts[i] == 'C':
+         fields.append(('f'+str(i), cols[i].dtype))
+      else:
+         fields.append(('m'+str(i), 'S1'))
+         fields.append(('f'+str(i), byteorder+'f8'))
+   return np.dtype(fields)
+
+def df2binary(cols: list, dts: list, dtype, blocksize: int = 4194304):
+   """
+   Generator returning the fixed length records of a BINARY upload in blocks of roughly blocksize bytes
+   cols      - the arrays from df2binary_columns()
+   dts       - list of the type codes for each column
+   dtype     - the record dtype from binary_upload_dtype()
+   blocksize - approximate number of bytes per block returned
+   """
+   nrows = len(cols[0]) if cols else 0
+   rows  = max(blocksize // dtype.itemsize, 1)
+
+   for start in range(0, nrows, rows):
+      end = min(start + rows, nrows)
+      rec = np.empty(end - start, dtype=dtype)
+      for i in range(len(cols)):
+         val = cols[i][start:end]
+         if dts[i] == 'C':
+            rec['f'+str(i)] = val
+         else:
+            miss = np.isnan(val)
+            rec['m'+str(i)] = np.where(miss, b'.', b' ')
+            rec['f'+str(i)] = np.where(miss, 0.0, val)
+      yield rec.tobytes()
+
+def sd_kinds(sb, vartype: list, varcat: list, numtype: str = 'N') -> list:
+   """
+   Classify each variable for decoding; 'N' numeric, 'D' date, 'T' time, 'DT' datetime or 'C' character
+   sb      - the SASsession, for its lists of date, time and datetime formats
+   vartype - the type of each variable
+   varcat  - the format (vformatn) of each variable
+   numtype - the value in vartype that means numeric; 'N' from the Data Step, 'FLOAT' from the Compute Service
+   """
+   kinds = []
+   for i in range(len(vartype)):
+      if vartype[i] == numtype:
+         if   varcat[i] in sb.sas_date_fmts:
+            kinds.append('D')
+         elif varcat[i] in sb.sas_time_fmts:
+            kinds.append('T')
+         elif varcat[i] in sb.sas_datetime_fmts:
+            kinds.append('DT')
+         else:
+            kinds.append('N')
+      else:
+         kinds.append('C')
+   return kinds
+
+class ColumnBuilder:
+   """
+   Accumulates the rows streamed over by sasdata2dataframe into one growable object array per column,
+   then converts each column to its type once and builds the Data Frame once at the end, instead of
+   building and appending a Data Frame for every batch of rows.
+   varlist - the variable names, in order
+   kinds   - from sd_kinds(); how to convert each column
+   nobs    - expected number of rows, if known, to size the arrays; they grow as needed
+   strip   - strip character values; all blank values are missing either way
+   """
+   def __init__(self, varlist: list, kinds: list, nobs: int = 0, strip: bool = False):
+      self.varlist = varlist
+      self.kinds   = kinds
+      self.strip   = strip
+      self.nrows   = 0
+      # don't trust a large estimate; a where clause can make it far too big
+      self.size    = min(nobs, 1048576) if nobs and nobs > 0 else 1024
+      self.cols    = [np.empty(self.size, dtype=object) for i in range(len(varlist))]
+
+   def _grow(self, need: int):
+      size = max(need, self.size * 2)
+      for i in range(len(self.cols)):
+         col             = np.empty(size, dtype=object)
+         col[:self.nrows] = self.cols[i][:self.nrows]
+         self.cols[i]    = col
+      self.size = size
+
+   def append(self, rows: list):
+      """
+      Add a batch of rows; each a sequence of the values for each variable
+      """
+      nrows = len(rows)
+      if nrows == 0:
+         return
+      if self.nrows + nrows > self.size:
+         self._grow(self.nrows + nrows)
+
+      end = self.nrows + nrows
+      i   = 0
+      for col in zip(*rows):
+         self.cols[i][self.nrows:end] = col
+         i += 1
+      self.nrows = end
+
+   def to_df(self) -> '<Pandas Data Frame object>':
+      """
+      Convert each column and return the Data Frame. The builder is emptied.
+      """
+      data = {}
+      for i in range(len(self.varlist)):
+         col  = pd.Series(self.cols[i][:self.nrows], dtype=object)
+         kind = self.kinds[i]
+         self.cols[i] = None
+
+         if   kind == 'N':
+            col = pd.to_numeric(col, errors='coerce')
+         elif kind in ('D', 'T', 'DT'):
+            col = pd.to_datetime(col, errors='coerce')
+         else:
+            if self.strip:
+               col = col.str.strip()
+            col = col.where(~col.isin([' ', '']), np.nan)
+         data[self.varlist[i]] = col
+
+      self.nrows = 0
+      self.cols  = [np.empty(self.size, dtype=object) for i in range(len(self.varlist))]
+      return pd.DataFrame(data, columns=self.varlist)
+
+# how a numeric, date, time or datetime missing value, including the special missings, is written
+_num_missing = ['', '.', '_'] + [chr(c) for c in range(ord('A'), ord('Z')+1)]
+
+def rows2df(block: bytes, rowsep: str, colsep: str, varlist: list, kinds: list, encoding: str,
+            cats: set = None, dtype_backend: str = None) -> '<Pandas Data Frame object>':
+   """
+   Decode a block of complete delimited rows, as streamed over by sasdata2dataframe, into a Data Frame with the
+   C parser of pandas' read_csv, instead of splitting each row and value in Python. Nothing is quoted, so values
+   can contain anything, newlines and quotes included, except the separators. The numerics are declared float64
+   and everything else is read as is; the date, time and datetime columns are converted afterward. The columns
+   in cats are read straight into a Categorical, and dtype_backend picks the types, as for frame_dtypes().
+   A multi-character row separator, which the parser can't split on, or a value it can't parse, falls back to
+   splitting the rows in Python; assemble() gives those the same types.
+   block    - the bytes of the rows, each ending with rowsep
+   rowsep   - the row separator
+   colsep   - the column separator
+   varlist  - the variable names, in order
+   kinds    - from sd_kinds(); how to convert each column
+   encoding - the SAS session encoding
+   cats     - names of the character columns to read as Categorical
+   dtype_backend - None, 'numpy_nullable' or 'pyarrow'
+   """
+   if len(rowsep) == 1 and len(colsep) == 1:
+      dtype = frame_dtypes(varlist, kinds, cats, dtype_backend)
+      nav   = {}
+      for i in range(len(varlist)):
+         if kinds[i] in ('D', 'T', 'DT'):
+            dtype[varlist[i]] = object
+         nav[varlist[i]] = _num_missing if kinds[i] != 'C' else ['', ' ']
+      try:
+         df = pd.read_csv(io.BytesIO(block), sep=colsep, lineterminator=rowsep, header=None, names=varlist,
+                          index_col=False, dtype=dtype, na_values=nav, keep_default_na=False,
+                          skip_blank_lines=False, quoting=csv.QUOTE_NONE, encoding=encoding,
+                          encoding_errors='replace')
+      except ValueError:
+         df = None
+      if df is not None:
+         for i in range(len(varlist)):
+            if kinds[i] in ('D', 'T', 'DT'):
+               df[varlist[i]] = pd.to_datetime(df[varlist[i]], errors='coerce')
+         return df
+
+   rows = block.decode(encoding, errors='replace')
+   cb   = ColumnBuilder(varlist, kinds, 0)
+   rows = rows.split(sep=rowsep)
+   if rows[-1] == '':
+      # only what follows the last separator; an empty row is a one column table's empty value
+      rows.pop()
+   cb.append([i.split(sep=colsep) for i in rows])
+   return cb.to_df()
+
+def frame_dtypes(varlist: list, kinds: list, cats: set = None, dtype_backend: str = None) -> dict:
+   """
+   Return the dtype of each column, by name, for the numerics and characters; the date, time and datetime
+   columns are left out, they're converted from text. Numerics are float64, characters are object, or, with
+   dtype_backend, the nullable or pyarrow equivalents. The character columns in cats are 'category'.
+   """
+   num  = {None: 'float64', 'numpy_nullable': 'Float64', 'pyarrow': 'double[pyarrow]'}[dtype_backend]
+   char = {None: object,    'numpy_nullable': 'string',  'pyarrow': 'string[pyarrow]'}[dtype_backend]
+   cats  = cats if cats else set()
+   dtype = {}
+   for i in range(len(varlist)):
+      if   kinds[i] == 'N':
+         dtype[varlist[i]] = num
+      elif kinds[i] == 'C':
+         dtype[varlist[i]] = 'category' if varlist[i] in cats else char
+   return dtype
+
+def sd_categories(varlist: list, kinds: list, categorical) -> set:
+   """
+   Return the names of the columns categorical= asks for. 'auto' is every character column, which assemble()
+   then only keeps as Categorical where there are few enough distinct values; otherwise it's a list of names,
+   matched regardless of case, as SAS does.
+   """
+   if categorical is None or categorical is False:
+      return set()
+   if isinstance(categorical, str) and categorical.lower() == 'auto':
+      return {varlist[i] for i in range(len(varlist)) if kinds[i] == 'C'}
+   if isinstance(categorical, str):
+      categorical = [categorical]
+   names = {str(name).upper() for name in categorical}
+   return {var for var in varlist if var.upper() in names}
+
+def _downcast(col, dtype_backend: str = None):
+   """
+   Return the numeric column as the smallest nullable integer that holds it, if all of its values are whole
+   numbers, else as float32 if that holds every value exactly, else as is.
+   """
+   vals = col.to_numpy(dtype='float64', na_value=np.nan)
+   vals = vals[~np.isnan(vals)]
+   if len(vals) == 0:
+      return col
+
+   if np.all(vals == np.trunc(vals)):
+      lo = vals.min()
+      hi = vals.max()
+      for bits in (8, 16, 32, 64):
+         info = np.iinfo('int'+str(bits))
+         if lo >= info.min and hi <= info.max:
+            return col.astype('int'+str(bits)+'[pyarrow]' if dtype_backend == 'pyarrow' else 'Int'+str(bits))
+
+   if np.array_equal(vals.astype('float32').astype('float64'), vals):
+      return col.astype({None: 'float32', 'numpy_nullable': 'Float32', 'pyarrow': 'float[pyarrow]'}[dtype_backend])
+   return col
+
+def assemble(chunks: list, varlist: list, kinds: list, categorical=None, downcast: bool = False,
+             dtype_backend: str = None) -> '<Pandas Data Frame object>':
+   """
+   Put the Data Frame chunks decoded by sasdata2dataframe together, one column at a time, giving each column its
+   final type as it's put together: Categorical columns have their categories merged across the chunks, and with
+   categorical='auto', a character column with more distinct values than half the number of rows goes back to
+   being a plain column; with downcast, whole number numerics become nullable integers and the others float32
+   where that holds them exactly; and dtype_backend picks nullable or pyarrow types, as for frame_dtypes().
+   Date, time and datetime columns are left as datetime64, or made timestamp[pyarrow].
+   chunks  - the Data Frames, in order, each with the columns in varlist
+   varlist - the variable names, in order
+   kinds   - from sd_kinds(); the kind of each column
+   """
+   cats  = sd_categories(varlist, kinds, categorical)
+   dtype = frame_dtypes(varlist, kinds, None, dtype_backend)
+   auto  = isinstance(categorical, str) and categorical.lower() == 'auto'
+   nrows = sum(len(chunk) for chunk in chunks)
+
+   data = {}
+   for i in range(len(varlist)):
+      var   = varlist[i]
+      parts = [chunk[var] for chunk in chunks]
+
+      if var in cats:
+         parts = [part if isinstance(part.dtype, pd.CategoricalDtype) else part.astype('category') for part in parts]
+         col   = pd.Series(pd.api.types.union_categoricals(parts) if len(parts) > 1 else parts[0].array, name=var)
+         if auto and len(col.cat.categories) > nrows / 2:
+            col = col.astype(dtype[var])
+      else:
+         col = pd.concat(parts, ignore_index=True) if len(parts) > 1 else parts[0].reset_index(drop=True)
+         if var in dtype:
+            if col.dtype != dtype[var]:
+               col = col.astype(dtype[var])
+            if downcast and kinds[i] == 'N':
+               col = _downcast(col, dtype_backend)
+         elif dtype_backend == 'pyarrow':
+            col = col.astype('timestamp[us][pyarrow]')
+      data[var] = col
+
+   return pd.DataFrame(data, columns=varlist)
+
+def dtype_options(kwargs: dict):
+   """
+   Take the categorical=, downcast= and dtype_backend= options out of the sasdata2dataframe kwargs.
+   returns a dict of them, for assemble(), or None after printing why if they aren't valid
+   """
+   opts = {'categorical'  : kwargs.pop('categorical',   None),
+           'downcast'     : kwargs.pop('downcast',      False),
+           'dtype_backend': kwargs.pop('dtype_backend', None)}
+
+   if opts['dtype_backend'] not in (None, 'numpy_nullable', 'pyarrow'):
+      print("dtype_backend= must be 'numpy_nullable' or 'pyarrow'.")
+      return None
+   if opts['dtype_backend'] == 'pyarrow' and not available('pyarrow'):
+      print("dtype_backend='pyarrow' requires the pyarrow package, which isn't installed.")
+      return None
+   return opts
+
+def stream2df(conn, rowsep: str, colsep: str, varlist: list, kinds: list, encoding: str, dco=None,
+              workers: int = 1, qdepth: int = 4, bufsize: int = 1048576, categorical=None, downcast: bool = False,
+              dtype_backend: str = None) -> '<Pandas Data Frame object>':
+   """
+   Receive the rows streamed over by sasdata2dataframe and decode them at the same time. A receiver thread reads
+   into a preallocated buffer with recv_into() and, each time it fills, hands the complete rows in it to a bounded
+   queue; the decoder workers each take a block off the queue and convert it into a Data Frame chunk with rows2df(),
+   and the chunks are put back in order at the end. The queue being bounded keeps the receiver from getting far
+   ahead of decoding.
+   conn     - the accepted connection; anything with recv(), and recv_into() unless dco is given
+   rowsep   - the row separator
+   colsep   - the column separator
+   varlist  - the variable names, in order
+   kinds    - from sd_kinds(); how to convert each column
+   encoding - the SAS session encoding
+   dco      - a zlib decompress object if the stream is compressed
+   workers  - number of decoder threads
+   qdepth   - number of row blocks that can be waiting to be decoded
+   bufsize  - size, in bytes, of the receive buffer; roughly the size of each row block
+   categorical, downcast, dtype_backend - how to type the columns; see assemble()
+   """
+   rsep    = rowsep.encode()
+   work    = queue.Queue(maxsize=max(int(qdepth), 1))
+   chunks  = {}
+   errors  = []
+   workers = max(int(workers), 1)
+   cats    = sd_categories(varlist, kinds, categorical)
+
+   def receive():
+      buf  = bytearray(max(int(bufsize), 65536))
+      mv   = memoryview(buf)
+      fill = 0
+      seq  = 0
+      try:
+         while True:
+            if dco is None:
+               n    = conn.recv_into(mv[fill:])
+               end  = n == 0
+            else:
+               data = conn.recv(65536)
+               end  = len(data) == 0
+               data = dco.decompress(data) if not end else dco.flush()
+               n    = len(data)
+               if fill + n > len(buf):
+                  mv.release()
+                  buf.extend(bytearray(fill + n - len(buf)))
+                  mv = memoryview(buf)
+               mv[fill:fill+n] = data
+            fill += n
+
+            if fill < len(buf) and not end:
+               continue
+
+            if end:
+               cut = fill
+            else:
+               # rfind's -1 (no separator yet) must not become len(rsep)-1 when rsep is more than one byte
+               cut = buf.rfind(rsep, 0, fill)
+               cut = cut + len(rsep) if cut >= 0 else 0
+            if cut > 0:
+               work.put((seq, bytes(mv[:cut])))
+               seq += 1
+               mv[:fill-cut] = bytes(mv[cut:fill])
+               fill -= cut
+            elif fill == len(buf):
+               # a single row bigger than the buffer
+               mv.release()
+               buf.extend(bytearray(len(buf)))
+               mv = memoryview(buf)
+
+            if end:
+               break
+      except Exception as e:
+         errors.append(e)
+      finally:
+         for i in range(workers):
+            work.put(None)
+
+   def decode():
+      while True:
+         item = work.get()
+         if item is None:
+            return
+         # keep taking blocks after an error, so the receiver never blocks on a full queue
+         if errors:
+            continue
+         try:
+            seq, block  = item
+            chunks[seq] = rows2df(block, rowsep, colsep, varlist, kinds, encoding, cats, dtype_backend)
+         except Exception as e:
+            errors.append(e)
+
+   threads  = [threading.Thread(target=receive, name='saspy-sd2df-recv', daemon=True)]
+   threads += [threading.Thread(target=decode, name='saspy-sd2df-decode', daemon=True) for i in range(workers)]
+   for t in threads:
+      t.start()
+   for t in threads:
+      t.join()
+
+   if errors:
+      raise errors[0]
+
+   if len(chunks) == 0:
+      chunks = {0: ColumnBuilder(varlist, kinds, 0).to_df()}
+   return assemble([chunks[i] for i in range(len(chunks))], varlist, kinds, categorical, downcast, dtype_backend)
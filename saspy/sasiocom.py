@@ -27,10 +27,9 @@ try:
 except ImportError:
     pass
 
-try:
-    import pandas as pd
-except ImportError:
-    pass
+from saspy.saslazy import LazyModule
+
+pd = LazyModule('pandas')
 
 
 class SASConfigCOM(object):
@@ -253,7 +252,8 @@ class SASSessionCOM(object):
         self.adodb.Open('Provider={}; Data Source=iom-id://{}'.format(
             self.sascfg.provider, self.workspace.UniqueIdentifier))
 
-        ll = self.submit("options svgtitle='svgtitle'; options validvarname=any validmemname=extend pagesize=max nosyntaxcheck; ods graphics on;", "text")
+        ll = self.submit("options svgtitle='svgtitle'; options validvarname=any validmemname=extend pagesize=max nosyntaxcheck; ods graphics on;\n"+self._sb._startcode, "text")
+        self._sb._startlog = ll['LOG']
         if self.sascfg.verbose:
             print("SAS Connection established. Workspace UniqueIdentifier is "+str(self.workspace.UniqueIdentifier)+"\n")
 
@@ -452,7 +452,7 @@ class SASSessionCOM(object):
         full_code = ods_open + code + ods_close
         self.workspace.LanguageService.Submit(full_code)
 
-    def submit(self, code: str, results: str='html', prompt: dict=None) -> dict:
+    def submit(self, code: str, results: str='html', prompt: dict=None, **kwargs) -> dict:
         """
         Submit any SAS code. Returns log and listing as dictionary with keys
         LOG and LST.
@@ -633,7 +633,7 @@ class SASSessionCOM(object):
                           libref: str ="", keep_outer_quotes: bool=False,
                                            embedded_newlines: bool=False,
                           LF: str = '\x01', CR: str = '\x02', colsep: str = '\x03',
-                          datetimes: dict={}, outfmts: dict={}, labels: dict={}):
+                          datetimes: dict={}, outfmts: dict={}, labels: dict={}, **kwargs):
         """
         Create a SAS dataset from a pandas data frame.
         :param df [pd.DataFrame]: Pandas data frame containing data to write.
@@ -649,6 +649,7 @@ class SASSessionCOM(object):
         datetimes - not implemented yet in this access method
         outfmts - not implemented yet in this access method
         labels - not implemented yet in this access method
+        compress - not used by this access method
         """
         DATETIME_NAME = 'DATETIME26.6'
         DATETIME_FMT = '%Y-%m-%dT%H:%M:%S.%f'
@@ -735,6 +736,14 @@ class SASSessionCOM(object):
                   print("'my_fmts=' is not supported in this access method. option ignored.")
                if k_dts is not None:
                   print("'dtype=' is only used with the CSV version of this method. option ignored.")
+            parallel = kwargs.pop('parallel', 1)
+            prows    = kwargs.pop('prows',    None)
+            if parallel > 1 or prows:
+               print("'parallel=' and 'prows=' are only used with the STDIO and SSH access methods. option ignored.")
+
+            for opt in ('categorical', 'downcast', 'dtype_backend'):
+               if kwargs.pop(opt, None):
+                  print("'"+opt+"=' is only used with the STDIO, SSH and IOM access methods. option ignored.")
 
             header, rows, meta = self.read_sasdata(table, libref, dsopts=dsopts)
             df = pd.DataFrame.from_records(rows, columns=header, **kwargs)
@@ -18,15 +18,147 @@ import base64
 import json
 import os
 import ssl
+import select
+import threading
 
 import tempfile as tf
+import time
 from time import sleep
 
-try:
-   import pandas as pd
-   import numpy  as np
-except ImportError:
-   pass
+from saspy.sasdfio import df2cards, sd_kinds, ColumnBuilder
+
+from saspy.saslazy import LazyModule
+
+pd = LazyModule('pandas')
+np = LazyModule('numpy')
+
+class HTTPpooledConn:
+   '''
+   A keep-alive HTTP(S)Connection handed out by HTTPpool. If the server dropped the connection while it sat
+   idle in the pool, the request is sent again once on a new connection. Everything else is passed through
+   to the http.client connection.
+   '''
+   def __init__(self, conn):
+      self.conn   = conn
+      self.reused = False
+      self.busy   = False
+      self.resp   = None
+      self._req   = None
+
+   def __getattr__(self, name):
+      return getattr(self.conn, name)
+
+   def _reconnect(self):
+      self.conn.close()
+      self.conn.connect()
+      self.reused = False
+
+   def dropped(self) -> bool:
+      '''
+      True if the socket is closed or the server closed its end while the connection was idle
+      '''
+      if self.conn.sock is None:
+         return True
+      try:
+         return bool(select.select([self.conn.sock], [], [], 0)[0])
+      except (OSError, ValueError):
+         return True
+
+   def request(self, method, url, body=None, headers={}):
+      self.busy = True
+      self._req = (method, url, body, headers)
+      try:
+         self.conn.request(method, url, body=body, headers=headers)
+      except (ConnectionError, hc.CannotSendRequest):
+         if not self.reused:
+            raise
+         self._reconnect()
+         self.conn.request(method, url, body=body, headers=headers)
+
+   def putrequest(self, method, url, **kwargs):
+      self.busy = True
+      self._req = None
+      self.conn.putrequest(method, url, **kwargs)
+
+   def getresponse(self):
+      try:
+         resp = self.conn.getresponse()
+      except (ConnectionError, hc.RemoteDisconnected):
+         if not self.reused or self._req is None:
+            raise
+         self._reconnect()
+         method, url, body, headers = self._req
+         self.conn.request(method, url, body=body, headers=headers)
+         resp = self.conn.getresponse()
+
+      self.reused = True
+      self.busy   = False
+      self._req   = None
+      self.resp   = resp
+      return resp
+
+   def idle(self) -> bool:
+      '''
+      True if there's no request in flight and the last response has been read, so the connection can be reused
+      '''
+      return not self.busy and (self.resp is None or self.resp.isclosed()) and self.conn.sock is not None
+
+class HTTPpool:
+   '''
+   Thread safe pool of keep-alive connections to the Viya server, so each request doesn't pay for a new
+   connection (and TLS handshake). getconn() returns an idle connection, or a new connected one; putconn()
+   gives it back for reuse, or closes it if it's not in a reusable state.
+   size    - the most idle connections to keep open
+   '''
+   def __init__(self, ip, port, ssl_context=None, https=True, size=4):
+      self.ip      = ip
+      self.port    = port
+      self.context = ssl_context
+      self.https   = https
+      self.size    = size
+      self._idle   = []
+      self._lock   = threading.Lock()
+
+   def _newconn(self) -> HTTPpooledConn:
+      if self.https:
+         if self.context:
+            conn = hc.HTTPSConnection(self.ip, self.port, context=self.context)
+         else:
+            conn = hc.HTTPSConnection(self.ip, self.port)
+      else:
+         conn = hc.HTTPConnection(self.ip, self.port)
+      conn.connect()
+      return HTTPpooledConn(conn)
+
+   def getconn(self) -> HTTPpooledConn:
+      while True:
+         with self._lock:
+            if not self._idle:
+               break
+            conn = self._idle.pop()
+         if conn.dropped():
+            conn.conn.close()
+         else:
+            return conn
+      return self._newconn()
+
+   def putconn(self, conn: HTTPpooledConn):
+      if conn.idle():
+         with self._lock:
+            if len(self._idle) < self.size:
+               self._idle.append(conn)
+               return
+      conn.conn.close()
+
+   def close(self):
+      '''
+      Close all of the idle connections. The pool can still be used; it will open new ones.
+      '''
+      with self._lock:
+         idle       = self._idle
+         self._idle = []
+      for conn in idle:
+         conn.conn.close()
 
 class SASconfigHTTP:
    '''
@@ -53,6 +185,8 @@ class SASconfigHTTP:
       self.authkey   = cfg.get('authkey', '')
       self._prompt   = session._sb.sascfg._prompt
       self.lrecl     = cfg.get('lrecl', None)
+      self.poolsize  = cfg.get('poolsize', 4)
+      self.long_poll = cfg.get('long_poll', 10)
 
       try:
          self.outopts = getattr(SAScfg, "SAS_output_options")
@@ -210,18 +344,18 @@ class SASconfigHTTP:
          if self.verify:
             # handle having self signed certificate default on Viya w/out copies on client; still ssl, just not verifyable
             try:
-               self.HTTPConn = hc.HTTPSConnection(self.ip, self.port)
+               self.HTTPpool = HTTPpool(self.ip, self.port, size=self.poolsize)
                self._token = self._authenticate(user, pw)
             except ssl.SSLError as e:
                print("SSL connection failed, creating an unverified ssl connection. Error was:"+str(e))
-               self.HTTPConn = hc.HTTPSConnection(self.ip, self.port, context=ssl._create_unverified_context())
+               self.HTTPpool = HTTPpool(self.ip, self.port, ssl._create_unverified_context(), size=self.poolsize)
                print("You can set 'verify=False' to get rid of this message ")
                self._token   = self._authenticate(user, pw)
          else:
-            self.HTTPConn = hc.HTTPSConnection(self.ip, self.port, context=ssl._create_unverified_context())
+            self.HTTPpool = HTTPpool(self.ip, self.port, ssl._create_unverified_context(), size=self.poolsize)
             self._token = self._authenticate(user, pw)
       else:
-         self.HTTPConn = hc.HTTPConnection(self.ip, self.port)
+         self.HTTPpool = HTTPpool(self.ip, self.port, https=False, size=self.poolsize)
          self._token   = self._authenticate(user, pw)
 
       # get AuthToken
@@ -288,7 +422,7 @@ class SASconfigHTTP:
       #import pdb; pdb.set_trace()
 
       # POST AuthToken
-      conn = self.HTTPConn; conn.connect()
+      conn = self.HTTPpool.getconn()
       d1 = ("grant_type=password&username="+user+"&password="+pw).encode(self.encoding)
       basic = base64.encodebytes("sas.tkmtrb:".encode(self.encoding))
       authheader = '%s' % basic.splitlines()[0].decode(self.encoding)
@@ -304,7 +438,7 @@ class SASconfigHTTP:
 
       status = req.status
       resp = req.read()
-      conn.close()
+      self.HTTPpool.putconn(conn)
 
       if status > 299:
          print("Failure in GET AuthToken. Status="+str(status)+"\nResponse="+resp.decode(self.encoding))
@@ -318,7 +452,7 @@ class SASconfigHTTP:
       #import pdb; pdb.set_trace()
 
       # GET Contexts 
-      conn = self.HTTPConn; conn.connect()
+      conn = self.HTTPpool.getconn()
       headers={"Accept":"application/vnd.sas.collection+json",
                "Accept-Item":"application/vnd.sas.compute.context.summary+json",
                "Authorization":"Bearer "+self._token}
@@ -326,7 +460,7 @@ class SASconfigHTTP:
       req = conn.getresponse()
       status = req.status
       resp = req.read()
-      conn.close()
+      self.HTTPpool.putconn(conn)
 
       if status > 299:
          print("Failure in GET Contexts. Status="+str(status)+"\nResponse="+resp.decode(self.encoding))
@@ -339,7 +473,7 @@ class SASconfigHTTP:
 
    def _create_context(self, user):
       # GET Contexts 
-      conn = self.HTTPConn; conn.connect()
+      conn = self.HTTPpool.getconn()
       d1  = '{"name": "SASPy","version": 1,"description": "SASPy Context","attributes": {"sessionInactiveTimeout": 60 },'
       d1 += '"launchContext": {"contextName": "'+self.ctxname+'"},"launchType": "service","authorizedUsers": ["'+user+'"]}'
 
@@ -350,7 +484,7 @@ class SASconfigHTTP:
       req = conn.getresponse()
       status = req.status
       resp = req.read()
-      conn.close()
+      self.HTTPpool.putconn(conn)
 
       if status > 299:
          print("Failure in POST Context. Status="+str(status)+"\nResponse="+resp.decode(self.encoding))
@@ -360,6 +494,165 @@ class SASconfigHTTP:
       return contexts
 
                    
+class SASjobHTTP:
+   '''
+   Handle for a job submitted with SASsessionHTTP.submit_async(). Not intended to be created directly.
+   done()               - True if the job has finished; checks the state once, doesn't wait
+   wait(timeout)        - wait up to timeout seconds (forever if None) for the job to finish; returns done()
+   result(timeout)      - wait for the job and return the dict of LOG and LST, like submit(); None if it didn't finish in time
+   cancel()             - cancel the job if it hasn't finished; returns True if the cancel was sent
+   add_done_callback(f) - call f(job) once the job has finished, from a background thread if it's still running
+   state                - the last known state of the job
+   '''
+   def __init__(self, session, jobid, ods: bool):
+      self._session   = session
+      self.jobid      = jobid
+      self.state      = jobid.get('state', 'pending')
+      self._ods       = ods
+      self._uri       = session._joburi(jobid, 'state')
+      self._result    = None
+      self._callbacks = []
+      self._watcher   = None
+      self._lock      = threading.Lock()
+
+   def __repr__(self):
+      return "SASjobHTTP(id="+str(self.jobid.get('id'))+", state="+str(self.state)+")"
+
+   def _poll(self, conn=None, wait: int = 0) -> bool:
+      if self.state not in ['running', 'pending']:
+         return True
+
+      pool = self._session.sascfg.HTTPpool
+      c    = conn if conn else pool.getconn()
+      self.state = self._session._jobstate(self._uri, c, wait)
+      if not conn:
+         pool.putconn(c)
+
+      if self.state not in ['running', 'pending']:
+         self._fire()
+         return True
+      return False
+
+   def _fire(self):
+      with self._lock:
+         callbacks       = self._callbacks
+         self._callbacks = []
+      for fn in callbacks:
+         try:
+            fn(self)
+         except Exception as e:
+            print("Exception in done callback for job "+str(self.jobid.get('id'))+": "+str(e))
+
+   def done(self) -> bool:
+      return self._poll()
+
+   def wait(self, timeout: float = None) -> bool:
+      done = wait_jobs([self], timeout)[0]
+      return len(done) > 0
+
+   def result(self, timeout: float = None) -> dict:
+      if not self.wait(timeout):
+         return None
+      with self._lock:
+         if self._result is None:
+            self._result = self._session._jobresults(self.jobid, self._ods)
+      return self._result
+
+   def cancel(self) -> bool:
+      if self.done():
+         return False
+
+      # the job's own cancel link; the session's would cancel whichever job is running, which may not be this one
+      uri = self._session._joburi(self.jobid, 'cancel', 'PUT')
+      if uri is None:
+         print("Job "+str(self.jobid.get('id'))+" has no cancel link, so it can't be canceled.")
+         return False
+
+      conn = self._session.sascfg.HTTPpool.getconn()
+      headers={"Accept":"application/json","Authorization":"Bearer "+self._session.sascfg._token}
+      conn.request('PUT', uri, headers=headers)
+      req = conn.getresponse()
+      status = req.status
+      resp = req.read()
+      self._session.sascfg.HTTPpool.putconn(conn)
+
+      if status > 299:
+         print("Failure in PUT cancel. Status="+str(status)+"\nResponse="+resp.decode(self._session.sascfg.encoding))
+         return False
+      return True
+
+   def add_done_callback(self, fn):
+      with self._lock:
+         if self.state in ['running', 'pending']:
+            self._callbacks.append(fn)
+            if self._watcher is None:
+               self._watcher = threading.Thread(target=self.wait, daemon=True)
+               self._watcher.start()
+            return
+      fn(self)
+
+ALL_COMPLETED   = 'ALL_COMPLETED'
+FIRST_COMPLETED = 'FIRST_COMPLETED'
+
+def wait_jobs(jobs: list, timeout: float = None, return_when: str = ALL_COMPLETED) -> tuple:
+   '''
+   Wait on several SASjobHTTP handles at once, polling all of their states over one connection, backing off
+   between polls. While only one job is left to wait on, its state is long polled (the 'long_poll' config key).
+   Returns a tuple of two lists; the jobs that are done and the jobs that are not.
+   jobs        - list of the SASjobHTTP handles from submit_async()
+   timeout     - seconds to wait; None waits until return_when is satisfied
+   return_when - ALL_COMPLETED (default) or FIRST_COMPLETED
+   '''
+   start = time.monotonic()
+   conns = {}
+   poll  = None
+   lpoll = 0
+   ndone = 0
+
+   try:
+      while True:
+         done   = []
+         todo   = []
+         states = [job.state for job in jobs]
+         began  = time.monotonic()
+         for job in jobs:
+            pool = job._session.sascfg.HTTPpool
+            if job.state in ['running', 'pending'] and id(pool) not in conns:
+               conns[id(pool)] = (pool, pool.getconn())
+            if poll is None:
+               poll = job._session._sb.sascfg.backoff()
+            if job._poll(conns[id(pool)][1] if id(pool) in conns else None, lpoll):
+               done.append(job)
+            else:
+               todo.append(job)
+
+         if len(done) > ndone or states != [job.state for job in jobs]:
+            poll.reset()
+            ndone = len(done)
+         # a long poll the server held needs no wait after it; one it came right back from, ignoring wait=, does
+         held = lpoll and time.monotonic() - began >= lpoll / 2
+         if not todo or (done and return_when == FIRST_COMPLETED):
+            break
+
+         left = None
+         if timeout is not None:
+            left = timeout - (time.monotonic() - start)
+            if left <= 0:
+               break
+
+         lpoll = 0
+         if len(todo) == 1:
+            lpoll = todo[0]._session.sascfg.long_poll
+            if left is not None:
+               lpoll = min(lpoll, int(left))
+         if not held:
+            poll.sleep(left)
+   finally:
+      for pool, conn in conns.values():
+         pool.putconn(conn)
+
+   return (done, todo)
+
 class SASsessionHTTP():
    '''
    The SASsession object is the main object to instantiate and provides access to the rest of the functionality.
@@ -379,6 +672,8 @@ class SASsessionHTTP():
       self.pid        = None
       self._session   = None
       self._sb        = kwargs.get('sb', None)
+      self._slog      = ''
+      self._logoff    = 0
       self.sascfg     = SASconfigHTTP(self, **kwargs)
 
       if self.sascfg._token:
@@ -410,14 +705,14 @@ class SASsessionHTTP():
             uri = ld.get('uri')
             break
 
-      conn = self.sascfg.HTTPConn; conn.connect()
+      conn = self.sascfg.HTTPpool.getconn()
       d1 = '{"name":"'+self.sascfg.ctxname+'", "description":"saspy session", "version":1, "environment":{"options":'+options+'}}'
       headers={"Accept":"application/vnd.sas.compute.session+json","Content-Type":"application/vnd.sas.compute.session.request+json","Authorization":"Bearer "+self.sascfg._token}
       conn.request('POST', uri, body=d1, headers=headers)
       req = conn.getresponse()
       status = req.status
       resp = req.read()
-      conn.close()
+      self.sascfg.HTTPpool.putconn(conn)
 
       if status > 299:
          print("Failure in POST Session \n"+resp.decode(self.sascfg.encoding))
@@ -454,7 +749,7 @@ class SASsessionHTTP():
       self._log = self._getlog()
 
       # POST Job - Lets see if the server really came up, cuz you can't tell from what happend so far
-      conn = self.sascfg.HTTPConn; conn.connect()
+      conn = self.sascfg.HTTPpool.getconn()
       jcode = json.dumps('\n')
       d1 = '{"code":['+jcode+']}'
       headers={"Accept":"application/json","Content-Type":"application/vnd.sas.compute.job.request+json",
@@ -463,7 +758,7 @@ class SASsessionHTTP():
       req = conn.getresponse()
       status = req.status
       resp = req.read()
-      conn.close()
+      self.sascfg.HTTPpool.putconn(conn)
 
       jobid = json.loads(resp.decode(self.sascfg.encoding))
       if not jobid or status > 299:
@@ -472,7 +767,8 @@ class SASsessionHTTP():
             print(key+"="+str(jobid.get(key)))
          return None
 
-      ll = self.submit("options svgtitle='svgtitle'; options validvarname=any validmemname=extend pagesize=max nosyntaxcheck; ods graphics on;", "text")
+      ll = self.submit("options svgtitle='svgtitle'; options validvarname=any validmemname=extend pagesize=max nosyntaxcheck; ods graphics on;\n"+self._sb._startcode, "text")
+      self._sb._startlog = ll['LOG']
       if self.sascfg.verbose:
          print("SAS server started using Context "+self.sascfg.ctxname+" with SESSION_ID="+self.pid)       
 
@@ -482,12 +778,13 @@ class SASsessionHTTP():
       rc = 0
       if self._session:
          # DELETE Session
-         conn = self.sascfg.HTTPConn; conn.connect()
+         conn = self.sascfg.HTTPpool.getconn()
          headers={"Accept":"application/json","Authorization":"Bearer "+self.sascfg._token}
          conn.request('DELETE', self._uri_del, headers=headers)
          req = conn.getresponse()
          resp = req.read()
-         conn.close()
+         self.sascfg.HTTPpool.putconn(conn)
+         self.sascfg.HTTPpool.close()
 
          if self.sascfg.verbose:
             print("SAS server terminated for SESSION_ID="+self._session.get('id'))       
@@ -497,48 +794,79 @@ class SASsessionHTTP():
       return rc
 
 
-   def _getlog(self, jobid=None):
-      start = 0
-      logr = ''
+   def _getlines(self, uri: str, start: int = 0, callback=None, pagesize: int = 10000) -> tuple:
+      '''
+      GET the lines of a LOG or LST past start, a page of at most pagesize lines at a time, stopping at the line count
+      the Compute Service reports for it (or at a short page if it doesn't). Returns a tuple of the list of lines and
+      the line to start from next time.
+      callback - called with each page of lines (a list of str) as it's read
+      '''
+      lines = []
+      count = None
 
-      # GET Log
-      if jobid:
-         lines = 9999999 #jobid.get('logInfo').get('lineCount')
-         for ld in jobid.get('links'):
-            if ld.get('method') == 'GET' and ld.get('rel') == 'log':
-               uri = ld.get('uri')
-               break
-      else:
-         lines = 9999999 #self._session.get('logStatistics').get('lineCount')
-         uri   = self._uri_log
+      # one connection for all of the pages
+      conn = self.sascfg.HTTPpool.getconn()
+      headers={"Accept":"application/vnd.sas.collection+json", "Authorization":"Bearer "+self.sascfg._token}
+
+      while count is None or start < count:
+         limit = pagesize if count is None else min(pagesize, count - start)
 
-      while True:
          # GET Log
-         conn = self.sascfg.HTTPConn; conn.connect()
-         headers={"Accept":"application/vnd.sas.collection+json", "Authorization":"Bearer "+self.sascfg._token}
-         conn.request('GET', uri+"?start="+str(start)+"&limit="+str(lines+1), headers=headers)
+         conn.request('GET', uri+"?start="+str(start)+"&limit="+str(limit), headers=headers)
          req = conn.getresponse()
          status = req.status
          resp = req.read()
-         conn.close()
 
-         js  = json.loads(resp.decode(self.sascfg.encoding))
-         log = js.get('items')
+         if status > 299:
+            break
 
-         lines = len(log)
+         js    = json.loads(resp.decode(self.sascfg.encoding))
+         log   = js.get('items')
+         count = js.get('count', None)
+         if count is not None and count < 0:
+            count = None
 
-         if not lines:
+         if not log:
             break
-         start += lines
 
-         for i in range(len(log)):
-             line = dict(log[i]).get('line')
-             logr += line+'\n'
+         page   = [log[i].get('line') for i in range(len(log))]
+         start += len(page)
+         lines += page
+
+         if callback:
+            callback(page)
+
+         if count is None and len(page) < limit:
+            break
+
+      self.sascfg.HTTPpool.putconn(conn)
+      return (lines, start)
+
+   def _getlog(self, jobid=None, start: int = 0, callback=None, prior: list = None) -> str:
+      '''
+      GET the LOG of a job, from line start on, adding it to the session's LOG. Without a jobid, GET the lines of the
+      session's LOG past those already read, and return all of it.
+      callback - called with each page of lines (a list of str) as it's read
+      prior    - the lines of the job's LOG before start, already read
+      '''
+      if jobid:
+         uri = self._joburi(jobid, 'log')
+      else:
+         uri   = self._uri_log
+         start = self._logoff
+
+      lines, start = self._getlines(uri, start, callback)
+      if prior:
+         lines = prior + lines
+      logr = '\n'.join(lines)+'\n' if lines else ''
 
       if jobid != None:   
          self._log += logr
+         return logr
 
-      return logr
+      self._logoff = start
+      self._slog  += logr
+      return self._slog
 
    def _getlst(self, jobid=None):
       htm = ''
@@ -553,18 +881,18 @@ class SASsessionHTTP():
       else:
          uri = self._uri_lst
 
-      conn = self.sascfg.HTTPConn; conn.connect()
+      conn = self.sascfg.HTTPpool.getconn()
       headers={"Accept":"application/vnd.sas.collection+json", "Authorization":"Bearer "+self.sascfg._token}
       conn.request('GET', uri, headers=headers)
       req = conn.getresponse()
       status = req.status
       resp = req.read()
-      conn.close()
+      self.sascfg.HTTPpool.putconn(conn)
 
       js = json.loads(resp.decode(self.sascfg.encoding))
       results = js.get('items')
 
-      conn = self.sascfg.HTTPConn; conn.connect()
+      conn = self.sascfg.HTTPpool.getconn()
       headers={"Accept":"application/vnd.sas.collection+json", "Authorization":"Bearer "+self.sascfg._token}
       while i < len(results):
          # GET an ODS Result
@@ -575,7 +903,7 @@ class SASsessionHTTP():
             resp = req.read()
             htm += resp.decode(self.sascfg.encoding)
          i += 1
-      conn.close()
+      self.sascfg.HTTPpool.putconn(conn)
 
       lstd = htm.replace(chr(12), chr(10)).replace('<body class="c body">',
                                                    '<body class="l body">').replace("font-size: x-small;",
@@ -583,43 +911,14 @@ class SASsessionHTTP():
       return lstd
    
    def _getlsttxt(self, jobid=None):
-      start = 0
-      lstr = ''
-   
-      # GET Log
+      # GET Listing
       if jobid:
-         for ld in jobid.get('links'):
-            if ld.get('method') == 'GET' and ld.get('rel') == 'listing':
-               uri = ld.get('uri')
-               break
-         lines = 9999999 #jobid.get('listInfo').get('lineCount')
+         uri = self._joburi(jobid, 'listing')
       else:
-         lines = 9999999 #self._session.get('listingStatistics').get('lineCount')
-         uri   = self._uri_lst
-
-      while True:
-         conn = self.sascfg.HTTPConn; conn.connect()
-         headers={"Accept":"application/vnd.sas.collection+json", "Authorization":"Bearer "+self.sascfg._token}
-         conn.request('GET', uri+"?start="+str(start)+"&limit="+str(lines+1), headers=headers)
-         req = conn.getresponse()
-         status = req.status
-         resp = req.read()
-         conn.close()
-
-         js  = json.loads(resp.decode(self.sascfg.encoding))
-         lst = js.get('items')
-
-         lines = len(lst)
-
-         if not lines:
-            break
-         start += lines
-
-         for i in range(len(lst)):
-             line = dict(lst[i]).get('line')
-             lstr += line+'\n'
+         uri = self._uri_lst
 
-      return lstr
+      lines = self._getlines(uri)[0]
+      return '\n'.join(lines)+'\n' if lines else ''
 
    def _asubmit(self, code, results="html"):
       #odsopen  = json.dumps("ods listing close;ods html5 (id=saspy_internal) options(bitmap_mode='inline') device=png; ods graphics on / outputfmt=png;\n")
@@ -635,7 +934,7 @@ class SASsessionHTTP():
          odsclose = '""'
    
       # POST Job
-      conn = self.sascfg.HTTPConn; conn.connect()
+      conn = self.sascfg.HTTPpool.getconn()
       jcode = json.dumps(code)
       d1 = '{"code":['+odsopen+','+jcode+','+odsclose+']}'
       headers={"Accept":"application/json","Content-Type":"application/vnd.sas.compute.job.request+json",
@@ -643,16 +942,17 @@ class SASsessionHTTP():
       conn.request('POST', self._uri_exe, body=d1, headers=headers)
       req = conn.getresponse()
       resp = req.read()
-      conn.close()
+      self.sascfg.HTTPpool.putconn(conn)
 
       jobid = json.loads(resp.decode(self.sascfg.encoding))
 
       return jobid
 
-   def submit(self, code: str, results: str ="html", prompt: dict = []) -> dict:
+   def submit(self, code: str, results: str ="html", prompt: dict = [], **kwargs) -> dict:
       '''
       code    - the SAS statements you want to execute 
       results - format of results, HTML is default, TEXT is the alternative
+      log_callback - function to call with each batch of new LOG lines (a list of str) while the job runs
       prompt  - dict of names:flags to prompt for; create marco variables (used in submitted code), then keep or delete
                 The keys are the names of the macro variables and the boolean flag is to either hide what you type and delete
                 the macros, or show what you type and keep the macros (they will still be available later)
@@ -713,7 +1013,7 @@ class SASsessionHTTP():
          pcodeo += 'options source notes;\n'
 
       # POST Job
-      conn = self.sascfg.HTTPConn; conn.connect()
+      conn = self.sascfg.HTTPpool.getconn()
       jcode = json.dumps(pcodei+pcodeiv+code+'\n'+pcodeo)
       d1 = '{"code":['+odsopen+','+jcode+','+odsclose+']}'
       headers={"Accept":"application/json","Content-Type":"application/vnd.sas.compute.job.request+json",
@@ -722,48 +1022,89 @@ class SASsessionHTTP():
       req = conn.getresponse()
       status = req.status
       resp = req.read()
-      conn.close()
+      self.sascfg.HTTPpool.putconn(conn)
 
       jobid = json.loads(resp.decode(self.sascfg.encoding))
       if not jobid or status > 299:
          print("Problem submitting job to Compute Service.\n   Status code="+str(jobid.get('httpStatusCode'))+"\n   Message="+jobid.get('message'))
          return dict(LOG=str(jobid), LST='')
 
-      for ld in jobid.get('links'):
-         if ld.get('method') == 'GET' and ld.get('rel') == 'state':
-            uri = ld.get('uri')
-            break
-
-      conn    = self.sascfg.HTTPConn; conn.connect()
-      headers = {"Accept":"text/plain", "Authorization":"Bearer "+self.sascfg._token}
+      uri     = self._joburi(jobid, 'state')
+      conn    = self.sascfg.HTTPpool.getconn()
+      poll    = self._sb.sascfg.backoff()
       done    = False
+      lpoll   = self.sascfg.long_poll
+      logcb   = kwargs.get('log_callback', None)
+      loguri  = self._joburi(jobid, 'log')
+      logl    = []
+      logs    = 0
+
+      # don't hold the state request so long that the LOG isn't streamed
+      if logcb:
+         lpoll = min(lpoll, 1)
 
+      state   = None
       while not done:
          try:
             while True:
-               # GET Status for JOB
-               conn.request('GET', uri, headers=headers)
-               req = conn.getresponse()
-               resp = req.read()
-               if resp not in [b'running', 'pending']:
+               # GET Status for JOB; long poll, and back off in case the server doesn't support that
+               start = time.monotonic()
+               st    = self._jobstate(uri, conn, lpoll)
+               if st not in ['running', 'pending']:
+                  poll.reset()
                   done = True
                   break
-               sleep(.5)
+               if logcb:
+                  lines, logs = self._getlines(loguri, logs, logcb)
+                  logl       += lines
+               if st != state:
+                  # pending to running; that's what ended the long poll, so start over with the short waits
+                  poll.reset()
+                  state = st
+               elif not lpoll or time.monotonic() - start < lpoll / 2:
+                  # the server came right back instead of holding the request, so it ignored wait=
+                  poll.sleep()
          except (KeyboardInterrupt, SystemExit):
             print('Exception caught!')
             response = self.sascfg._prompt(
                       "SAS attention handling not yet supported over HTTP. Please enter (Q) to Quit waiting for results or (C) to continue waiting.")
             while True:
                if response.upper() == 'Q':
-                  conn.close()
+                  self.sascfg.HTTPpool.putconn(conn)
                   return dict(LOG='', LST='', BC=True)
                if response.upper() == 'C':
                   break
                response = self.sascfg._prompt("Please enter (Q) to Quit waiting for results or (C) to continue waiting.")
 
-      conn.close()
+      self.sascfg.HTTPpool.putconn(conn)
+
+      return self._jobresults(jobid, ods, logs, logcb, logl)
+
+   def _joburi(self, jobid, rel: str, method: str = 'GET') -> str:
+      for ld in jobid.get('links'):
+         if ld.get('method') == method and ld.get('rel') == rel:
+            return ld.get('uri')
+      return None
 
-      logd = self._getlog(jobid)
+   def _jobstate(self, uri: str, conn, wait: int = 0) -> str:
+      '''
+      GET the state of a job; pending, running, completed, warning, error, canceled ...
+      wait - seconds for the Compute Service to hold the request until the state changes
+      '''
+      headers = {"Accept":"text/plain", "Authorization":"Bearer "+self.sascfg._token}
+      if wait:
+         uri += "?wait="+str(wait)
+      conn.request('GET', uri, headers=headers)
+      req = conn.getresponse()
+      resp = req.read()
+      return resp.decode(self.sascfg.encoding)
+
+   def _jobresults(self, jobid, ods: bool, logstart: int = 0, logcb=None, loglines: list = None) -> dict:
+      '''
+      GET the LOG and LST of a finished job. If the first lines of the LOG were already streamed, they're passed in
+      loglines, and only the rest of it, from logstart, is read.
+      '''
+      logd = self._getlog(jobid, logstart, logcb, loglines)
 
       if ods:
          lstd = self._getlst(jobid)
@@ -777,6 +1118,24 @@ class SASsessionHTTP():
       self._sb._lastlog = logd
       return dict(LOG=logd, LST=lstd)
 
+   def submit_async(self, code: str, results: str ="html") -> 'SASjobHTTP':
+      '''
+      Submit code without waiting for it to finish. Returns a SASjobHTTP handle for the job; see that class for
+      checking on it, waiting for it and getting the LOG and LST when it's done. Use wait_jobs() to wait on more than one.
+      code    - the SAS statements you want to execute
+      results - format of results, HTML is default, TEXT is the alternative
+      '''
+      if self._session == None:
+         print("No SAS process attached. SAS process has terminated unexpectedly.")
+         return None
+
+      jobid = self._asubmit(code, results)
+      if not jobid or not jobid.get('links'):
+         print("Problem submitting job to Compute Service.\n   Status code="+str(jobid.get('httpStatusCode'))+"\n   Message="+str(jobid.get('message')))
+         return None
+
+      return SASjobHTTP(self, jobid, results.upper() == "HTML")
+
    def saslog(self):
       '''
       this method is used to get the current, full contents of the SASLOG
@@ -793,12 +1152,12 @@ class SASsessionHTTP():
       #can't have an empty libref, so check for user or work
       if not libref:
          # HEAD Libref USER
-         conn = self.sascfg.HTTPConn; conn.connect()
+         conn = self.sascfg.HTTPpool.getconn()
          headers={"Accept":"*/*", "Authorization":"Bearer "+self.sascfg._token}
          conn.request('HEAD', "/compute/sessions/"+self.pid+"/data/USER", headers=headers)
          req = conn.getresponse()
          status = req.status
-         conn.close()
+         self.sascfg.HTTPpool.putconn(conn)
     
          if status == 200:
             libref = 'USER'
@@ -823,12 +1182,12 @@ class SASsessionHTTP():
    
       """
       # HEAD Data Table
-      conn = self.sascfg.HTTPConn; conn.connect()
+      conn = self.sascfg.HTTPpool.getconn()
       headers={"Accept":"*/*", "Authorization":"Bearer "+self.sascfg._token}
       conn.request('HEAD', "/compute/sessions/"+self.pid+"/data/"+libref+"/"+table, headers=headers)
       req = conn.getresponse()
       status = req.status
-      conn.close()
+      self.sascfg.HTTPpool.putconn(conn)
 
       if status == 200:
          exists = True
@@ -922,24 +1281,19 @@ class SASsessionHTTP():
          logf = ll['LOG']
 
          # GET Etag
-         conn = self.sascfg.HTTPConn; conn.connect()
+         conn = self.sascfg.HTTPpool.getconn()
          headers={"Accept":"application/vnd.sas.compute.fileref+json;application/json",
                   "Authorization":"Bearer "+self.sascfg._token}
          conn.request('GET', self._uri_files+"/_sp_updn", headers=headers)
          req = conn.getresponse()
          status = req.status
          resp = req.read()
-         conn.close()
+         self.sascfg.HTTPpool.putconn(conn)
 
          Etag = req.getheader("Etag")
 
          # PUT data
-         conn = self.sascfg.HTTPConn; conn.connect()
-         headers={"Accept":"*/*","Content-Type":"application/octet-stream",
-                  "Transfer-Encoding" : "chunked",
-                  "Authorization":"Bearer "+self.sascfg._token}
-
-         conn.connect()
+         conn = self.sascfg.HTTPpool.getconn()
          conn.putrequest('PUT', self._uri_files+"/_sp_updn/content")
          conn.putheader("Accept","*/*")
          conn.putheader("Content-Type","application/octet-stream")
@@ -962,7 +1316,7 @@ class SASsessionHTTP():
          req    = conn.getresponse()
          status = req.status
          resp   = req.read()
-         conn.close()
+         self.sascfg.HTTPpool.putconn(conn)
 
          code = "filename _sp_updn;"
       else:
@@ -1021,7 +1375,7 @@ class SASsessionHTTP():
       logf  = ll['LOG']
 
       # GET data
-      conn = self.sascfg.HTTPConn; conn.connect()
+      conn = self.sascfg.HTTPpool.getconn()
       headers={"Accept":"*/*","Content-Type":"application/octet-stream",
                "Authorization":"Bearer "+self.sascfg._token}
       conn.request('GET', self._uri_files+"/_sp_updn/content", headers=headers)
@@ -1031,7 +1385,7 @@ class SASsessionHTTP():
       fd.write(req.read())
       fd.flush()
       fd.close()
-      conn.close()
+      self.sascfg.HTTPpool.putconn(conn)
 
       ll = self.submit("filename _sp_updn;", 'text')
       logf += ll['LOG']
@@ -1046,7 +1400,7 @@ class SASsessionHTTP():
                          libref: str ="", keep_outer_quotes: bool=False,
                                           embedded_newlines: bool=False,
                          LF: str = '\x01', CR: str = '\x02', colsep: str = '\x03',
-                         datetimes: dict={}, outfmts: dict={}, labels: dict={}):
+                         datetimes: dict={}, outfmts: dict={}, labels: dict={}, **kwargs):
       '''
       This method imports a Pandas Data Frame to a SAS Data Set, returning the SASdata object for the new Data Set.
       df      - Pandas Data Frame to import to a SAS Data Set
@@ -1060,6 +1414,7 @@ class SASsessionHTTP():
       datetimes - dict with column names as keys and values of 'date' or 'time' to create SAS date or times instead of datetimes
       outfmts - dict with column names and SAS formats to assign to the new SAS data set
       labels  - dict with column names and SAS Labels to assign to the new SAS data set
+      compress - gzip the data and upload it, instead of streaming it in; defaults to the config's 'compress'
       '''
       input   = ""
       xlate   = ""
@@ -1147,40 +1502,19 @@ class SASsessionHTTP():
       if len(format):
          code += "format "+format+";\n"
       code += label
+
+      if kwargs.get('compress', self._sb.sascfg.compress):
+         self._sb._df2sd_gz(df2cards(df, dts, colsep, embedded_newlines, LF, CR), code,
+                            "delimiter="+delim+" DSD STOPOVER;\ninput @;\nif _infile_ = '' then delete;\ninput "+input+";\n"+xlate+";\nrun;\n")
+         return
+
       code += "infile datalines delimiter="+delim+" DSD STOPOVER;\ninput @;\nif _infile_ = '' then delete;\ninput "+input+";\n"+xlate+";\ndatalines4;"
       self._asubmit(code, "text")
 
-      code = ""
-      for row in df.itertuples(index=False):
-         card  = ""
-         for col in range(ncols):
-            var = str(row[col])
-
-            if   dts[col] == 'N' and var == 'nan':
-               var = '.'
-            elif dts[col] == 'C':
-               if var == 'nan':
-                  var = ' '
-               else:
-                  if embedded_newlines:
-                     var = var.replace('\n', LF).replace('\r', CR)
-            elif dts[col] == 'B':
-               var = str(int(row[col]))
-            elif dts[col] == 'D':
-               if var in ['nan', 'NaT', 'NaN']:
-                  var = '.'
-               else:
-                  var = str(row[col].to_datetime64())[:26]
-
-            card += var
-            if col < (ncols-1):
-               card += colsep
-         code += card+"\n"
-         if len(code) > 4000:
-            self._asubmit(code, "text")
-            code = ""
+      for cards in df2cards(df, dts, colsep, embedded_newlines, LF, CR, blocksize=32768):
+         self._asubmit(cards, "text")
 
-      self._asubmit(code+";;;;", "text")
+      self._asubmit(";;;;", "text")
       ll = self.submit("run;", 'text')
       return
 
@@ -1197,6 +1531,8 @@ class SASsessionHTTP():
          return self.sasdata2dataframeCSV(table, libref, dsopts, **kwargs)
       elif method and method.lower() == 'disk':
          return self.sasdata2dataframeDISK(table, libref, dsopts, **kwargs)
+      elif method and method.lower() == 'binary':
+         print("method=BINARY is not supported with this access method. Using method=MEMORY instead.")
 
       my_fmts = kwargs.pop('my_fmts', False)
       k_dts   = kwargs.pop('dtype',   None)
@@ -1206,55 +1542,23 @@ class SASsessionHTTP():
          if k_dts is not None:
             print("'dtype=' is only used with the CSV or DISK version of this method. option ignored.")
 
+      parallel = kwargs.pop('parallel', 1)
+      prows    = kwargs.pop('prows',    None)
+      if parallel > 1 or prows:
+         print("'parallel=' and 'prows=' are only used with the STDIO and SSH access methods. option ignored.")
+
+      for opt in ('categorical', 'downcast', 'dtype_backend'):
+         if kwargs.pop(opt, None):
+            print("'"+opt+"=' is only used with the STDIO, SSH and IOM access methods. option ignored.")
+
       if libref:
          tabname = libref+".'"+table.strip()+"'n "
       else:
          tabname = "'"+table.strip()+"'n "
 
-      code  = "data sasdata2dataframe / view=sasdata2dataframe; set "+tabname+self._sb._dsopts(dsopts)+";run;\n"
-
-      ll = self.submit(code, "text")
-
-      ##GET Data Table Info
-      #conn = self.sascfg.HTTPConn; conn.connect()
-      #headers={"Accept":"application/vnd.sas.compute.data.table+json", "Authorization":"Bearer "+self.sascfg._token}
-      #conn.request('GET', "/compute/sessions/"+self.pid+"/data/work/sasdata2dataframe", headers=headers)
-      #req = conn.getresponse()
-      #status = req.status
-      #conn.close()
-
-      #resp = req.read()
-      #js = json.loads(resp.decode(self.sascfg.encoding))
-
-      conn = self.sascfg.HTTPConn; conn.connect()
-      headers={"Accept":"application/vnd.sas.collection+json", "Authorization":"Bearer "+self.sascfg._token}
-      conn.request('GET', "/compute/sessions/"+self.pid+"/data/work/sasdata2dataframe/columns?start=0&limit=9999999", headers=headers)
-      req = conn.getresponse()
-      status = req.status
-      resp = req.read()
-      conn.close()
-
-      js = json.loads(resp.decode(self.sascfg.encoding))
-
-      varlist = []
-      vartype = []
-      nvars = js.get('count')
-      lst = js.get('items')
-      for i in range(len(lst)):
-         varlist.append(lst[i].get('name'))
-         vartype.append(lst[i].get('type'))
-
-      code  = "data _null_; set work.sasdata2dataframe(obs=1);put 'FMT_CATS=';\n"
-      for i in range(nvars):
-         code += "_tom = vformatn('"+varlist[i]+"'n);put _tom;\n"
-      code += "run;\n"
-   
-      ll = self.submit(code, "text")
-
-      l2 = ll['LOG'].rpartition("FMT_CATS=")
-      l2 = l2[2].partition("\n")              
-      varcat = l2[2].split("\n", nvars)
-      del varcat[nvars]
+      varlist, vartype, varlen, varcat, nobs = self._sb._sd2df_meta(tabname, dsopts)
+      nvars   = len(varlist)
+      vartype = ['FLOAT' if vtype == 'N' else 'CHAR' for vtype in vartype]
 
       code  = "data work.saspy_ds2df / view=work.saspy_ds2df; set "+tabname+self._sb._dsopts(dsopts)+";\n"
       for i in range(nvars):
@@ -1276,53 +1580,30 @@ class SASsessionHTTP():
       code += ";run;\n"
       ll = self.submit(code, "text")
 
-      conn = self.sascfg.HTTPConn; conn.connect()
+      conn = self.sascfg.HTTPpool.getconn()
       headers={"Accept":"application/vnd.sas.collection+json", "Authorization":"Bearer "+self.sascfg._token}
       uri = "/compute/sessions/"+self.pid+"/data/work/saspy_ds2df/rows"
 
-      r     = []
-      df    = None
-      trows = kwargs.get('trows', None)
-      if not trows:
-         trows = 100000
+      cb = None
 
       while True:
          conn.request('GET', uri, headers=headers)
          req    = conn.getresponse()
          status = req.status
          resp   = req.read()
-         conn.close()
    
          js = json.loads(resp.decode(self.sascfg.encoding))
+
+         if cb is None:
+            nobs = js.get('count', -1)
+            cb   = ColumnBuilder(varlist, sd_kinds(self._sb, vartype, varcat, 'FLOAT'), nobs, strip=True)
    
          lst = js.get('items')
 
          if not lst:
             break
 
-         for i in range(len(lst)):
-            r.append(lst[i]['cells'])
-
-         if len(r) > trows:   
-            tdf = pd.DataFrame.from_records(r, columns=varlist)
-                       
-            for i in range(nvars):
-               if vartype[i] == 'FLOAT':
-                  if varcat[i] not in self._sb.sas_date_fmts + self._sb.sas_time_fmts + self._sb.sas_datetime_fmts:
-                     if tdf.dtypes[tdf.columns[i]].kind not in ('f','u','i','b','B','c','?'):
-                        tdf[varlist[i]] = pd.to_numeric(tdf[varlist[i]], errors='coerce') 
-                  else:
-                     if tdf.dtypes[tdf.columns[i]].kind not in ('M'):
-                        tdf[varlist[i]] = pd.to_datetime(tdf[varlist[i]], errors='coerce') 
-               else:
-                  tdf[varlist[i]] = tdf[varlist[i]].apply(str.strip)
-                  tdf[varlist[i]].replace('', np.NaN, True)
-                                          
-            if df is not None:
-               df = df.append(tdf, ignore_index=True)
-            else:
-               df = tdf
-            r = []
+         cb.append([lst[i]['cells'] for i in range(len(lst))])
                
          uri = None
          for ld in js.get('links'):
@@ -1333,25 +1614,8 @@ class SASsessionHTTP():
          if not uri:
             break
 
-      if len(r) > 0:   
-         tdf = pd.DataFrame.from_records(r, columns=varlist)
-
-         for i in range(nvars):
-            if vartype[i] == 'FLOAT':
-               if varcat[i] not in self._sb.sas_date_fmts + self._sb.sas_time_fmts + self._sb.sas_datetime_fmts:
-                  tdf[varlist[i]] = pd.to_numeric(tdf[varlist[i]], errors='coerce') 
-               else:
-                  tdf[varlist[i]] = pd.to_datetime(tdf[varlist[i]], errors='coerce') 
-            else:
-               tdf[varlist[i]] = tdf[varlist[i]].apply(str.strip)
-               tdf[varlist[i]].replace('', np.NaN, True)
-
-         if df is not None:
-            df = df.append(tdf, ignore_index=True)
-         else:
-            df = tdf
-
-      return df
+      self.sascfg.HTTPpool.putconn(conn)
+      return cb.to_df()
 
 
    def sasdata2dataframeCSV(self, table: str, libref: str ='', dsopts: dict ={}, tempfile: str=None, tempkeep: bool=False, **kwargs) -> '<Pandas Data Frame object>':
@@ -1400,13 +1664,13 @@ class SASsessionHTTP():
       #resp = req.read()
       #js = json.loads(resp.decode(self.sascfg.encoding))
 
-      conn = self.sascfg.HTTPConn; conn.connect()
+      conn = self.sascfg.HTTPpool.getconn()
       headers={"Accept":"application/vnd.sas.collection+json", "Authorization":"Bearer "+self.sascfg._token}
       conn.request('GET', "/compute/sessions/"+self.pid+"/data/work/sasdata2dataframe/columns?start=0&limit=9999999", headers=headers)
       req = conn.getresponse()
       status = req.status
       resp = req.read()
-      conn.close()
+      self.sascfg.HTTPpool.putconn(conn)
 
       js = json.loads(resp.decode(self.sascfg.encoding))
 
@@ -1542,13 +1806,13 @@ class SASsessionHTTP():
       #resp = req.read()
       #js = json.loads(resp.decode(self.sascfg.encoding))
 
-      conn = self.sascfg.HTTPConn; conn.connect()
+      conn = self.sascfg.HTTPpool.getconn()
       headers={"Accept":"application/vnd.sas.collection+json", "Authorization":"Bearer "+self.sascfg._token}
       conn.request('GET', "/compute/sessions/"+self.pid+"/data/work/sasdata2dataframe/columns?start=0&limit=9999999", headers=headers)
       req = conn.getresponse()
       status = req.status
       resp = req.read()
-      conn.close()
+      self.sascfg.HTTPpool.putconn(conn)
 
       js = json.loads(resp.decode(self.sascfg.encoding))
 
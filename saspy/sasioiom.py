@@ -16,16 +16,19 @@
 
 import os
 import subprocess
+import time
 from time import sleep
 import socket as socks
 import tempfile as tf
 import codecs
 
-try:
-   import pandas as pd
-   import numpy  as np
-except ImportError:
-   pass
+from saspy.sasdfio import df2cards, binary_dtype, binary_byteorder, binary2df, sd_kinds
+from saspy.sasdfio import assemble, dtype_options, rows2df, sd_categories
+
+from saspy.saslazy import LazyModule
+
+pd = LazyModule('pandas')
+np = LazyModule('numpy')
 
 try:
    import fcntl
@@ -482,7 +485,7 @@ Will use HTML5 for this SASsession.""")
       enc = self.sascfg.encoding #validating encoding is done next, so handle it not being set for this one call
       if enc == '':
          self.sascfg.encoding = 'utf-8'
-      ll = self.submit("options svgtitle='svgtitle'; options validvarname=any validmemname=extend pagesize=max nosyntaxcheck; ods graphics on;", "text")
+      ll = self.submit("options svgtitle='svgtitle'; options validvarname=any validmemname=extend pagesize=max nosyntaxcheck; ods graphics on;\n"+self._sb._startcode, "text")
       self.sascfg.encoding = enc
 
       if self.pid is None:
@@ -492,6 +495,7 @@ Will use HTML5 for this SASsession.""")
          if zero:
             print("Be sure the path to sspiauth.dll is in your System PATH"+"\n")
          return None
+      self._sb._startlog = ll['LOG']
 
       if self.sascfg.verbose:
          print("SAS Connection established. Subprocess id is "+str(pid)+"\n")
@@ -552,7 +556,8 @@ Will use HTML5 for this SASsession.""")
    """
    def _getlog(self, wait=5, jobid=None):
       logf   = b''
-      quit   = wait * 2
+      poll   = self._sb.sascfg.backoff()
+      end    = time.monotonic() + wait
       logn   = self._logcnt(False)
       code1  = "%put E3969440A681A24088859985"+logn+";\nE3969440A681A24088859985"+logn
 
@@ -563,12 +568,13 @@ Will use HTML5 for this SASsession.""")
             log = b''
 
          if len(log) > 0:
+            poll.reset()
             logf += log
          else:
-            quit -= 1
-            if quit < 0 or len(logf) > 0:
+            left = end - time.monotonic()
+            if left <= 0 or len(logf) > 0:
                break
-            sleep(0.5)
+            poll.sleep(left)
 
       x = logf.decode(errors='replace').replace(code1, " ")
       self._log += x
@@ -592,7 +598,8 @@ Will use HTML5 for this SASsession.""")
 
    def _getlst(self, wait=5, jobid=None):
       lstf = b''
-      quit = wait * 2
+      poll = self._sb.sascfg.backoff()
+      end  = time.monotonic() + wait
       eof = 0
       bof = False
       lenf = 0
@@ -604,6 +611,7 @@ Will use HTML5 for this SASsession.""")
             lst = b''
 
          if len(lst) > 0:
+            poll.reset()
             lstf += lst
 
             if ((not bof) and lst.count(b"<!DOCTYPE html>", 0, 20) > 0):
@@ -618,10 +626,10 @@ Will use HTML5 for this SASsession.""")
                   break
 
             if not bof:
-               quit -= 1
-               if quit < 0:
+               left = end - time.monotonic()
+               if left <= 0:
                   break
-               sleep(0.5)
+               poll.sleep(left)
 
       if os.name == 'nt':
          try:
@@ -643,7 +651,7 @@ Will use HTML5 for this SASsession.""")
    def _getlsttxt(self, wait=5, jobid=None):
       f2 = [None]
       lstf = b''
-      quit = wait * 2
+      poll = self._sb.sascfg.backoff()
       eof = 0
       self._asubmit("data _null_;file print;put 'Tom was here';run;", "text")
 
@@ -654,6 +662,7 @@ Will use HTML5 for this SASsession.""")
             lst = b''
 
          if len(lst) > 0:
+            poll.reset()
             lstf += lst
 
             lenf = len(lstf)
@@ -663,6 +672,8 @@ Will use HTML5 for this SASsession.""")
                final = lstf.partition(b"Tom was here")
                f2 = final[0].decode(errors='replace').rpartition(chr(12))
                break
+         else:
+            poll.sleep()
 
       lst = f2[0]
 
@@ -715,7 +726,7 @@ Will use HTML5 for this SASsession.""")
 
       return
 
-   def submit(self, code: str, results: str ="html", prompt: dict = None) -> dict:
+   def submit(self, code: str, results: str ="html", prompt: dict = None, **kwargs) -> dict:
       '''
       This method is used to submit any SAS code. It returns the Log and Listing as a python dictionary.
       code    - the SAS statements you want to execute
@@ -829,6 +840,7 @@ Will use HTML5 for this SASsession.""")
       pgm += b'\n'+logcodei.encode()+b'\n'
       self.stdin[0].send(pgm+b'tom says EOL='+logcodeo+b'\n')
 
+      poll = self._sb.sascfg.backoff()
       while not done:
          try:
              while True:
@@ -865,10 +877,11 @@ Will use HTML5 for this SASsession.""")
                     lst = b''
 
                  if len(lst) > 0:
+                    poll.reset()
                     #print("LIST = \n"+lst)
                     lstf += lst
                  else:
-                    sleep(0.1)
+                    poll.sleep()
                     try:
                        log = self.stderr[0].recv(4096)
                     except (BlockingIOError):
@@ -1333,6 +1346,7 @@ Will use HTML5 for this SASsession.""")
       datar = b''
       bail  = False
 
+      poll = self._sb.sascfg.backoff()
       while not done:
          while True:
              if os.name == 'nt':
@@ -1361,12 +1375,13 @@ Will use HTML5 for this SASsession.""")
                 data = b''
 
              if len(data) > 0:
+                poll.reset()
                 datar += data
                 if len(datar) > 8300:
                    fd.write(datar[:8192])
                    datar = datar[8192:]
              else:
-                sleep(0.1)
+                poll.sleep()
                 try:
                    log = self.stderr[0].recv(4096).decode(self.sascfg.encoding, errors='replace')
                 except (BlockingIOError):
@@ -1402,7 +1417,7 @@ Will use HTML5 for this SASsession.""")
                          libref: str ="", keep_outer_quotes: bool=False,
                                           embedded_newlines: bool=False,
                          LF: str = '\x01', CR: str = '\x02', colsep: str = '\x03',
-                         datetimes: dict={}, outfmts: dict={}, labels: dict={}):
+                         datetimes: dict={}, outfmts: dict={}, labels: dict={}, **kwargs):
       """
       This method imports a Pandas Data Frame to a SAS Data Set, returning the SASdata object for the new Data Set.
       df      - Pandas Data Frame to import to a SAS Data Set
@@ -1416,6 +1431,7 @@ Will use HTML5 for this SASsession.""")
       datetimes - dict with column names as keys and values of 'date' or 'time' to create SAS date or times instead of datetimes
       outfmts - dict with column names and SAS formats to assign to the new SAS data set
       labels  - dict with column names and SAS Labels to assign to the new SAS data set
+      compress - gzip the data and upload it, instead of streaming it in; defaults to the config's 'compress'
       """
       input   = ""
       xlate   = ""
@@ -1503,40 +1519,19 @@ Will use HTML5 for this SASsession.""")
       if len(format):
          code += "format "+format+";\n"
       code += label
+
+      if kwargs.get('compress', self._sb.sascfg.compress):
+         self._sb._df2sd_gz(df2cards(df, dts, colsep, embedded_newlines, LF, CR), code,
+                            "delimiter="+delim+" DSD STOPOVER;\ninput @;\nif _infile_ = '' then delete;\ninput "+input+";\n"+xlate+";\nrun;\n")
+         return
+
       code += "infile datalines delimiter="+delim+" DSD STOPOVER;\ninput @;\nif _infile_ = '' then delete;\ninput "+input+";\n"+xlate+";\ndatalines4;"
       self._asubmit(code, "text")
 
-      code = ""
-      for row in df.itertuples(index=False):
-         card  = ""
-         for col in range(ncols):
-            var = str(row[col])
-
-            if   dts[col] == 'N' and var == 'nan':
-               var = '.'
-            elif dts[col] == 'C':
-               if var == 'nan':
-                  var = ' '
-               else:
-                  if embedded_newlines:
-                     var = var.replace('\n', LF).replace('\r', CR)
-            elif dts[col] == 'B':
-               var = str(int(row[col]))
-            elif dts[col] == 'D':
-               if var in ['nan', 'NaT', 'NaN']:
-                  var = '.'
-               else:
-                  var = str(row[col].to_datetime64())[:26]
+      for cards in df2cards(df, dts, colsep, embedded_newlines, LF, CR, blocksize=1048576):
+         self._asubmit(cards, "text")
 
-            card += var
-            if col < (ncols-1):
-               card += colsep
-         code += card+"\n"
-         if len(code) > 4000:
-            self._asubmit(code, "text")
-            code = ""
-
-      self._asubmit(code+";;;;", "text")
+      self._asubmit(";;;;", "text")
       ll = self.submit("run;", 'text')
       return
 
@@ -1548,6 +1543,11 @@ Will use HTML5 for this SASsession.""")
       libref  - the libref for the SAS Data Set.
       rowsep  - the row seperator character to use; defaults to '\x01'
       colsep  - the column seperator character to use; defaults to '\x02'
+      categorical - 'auto', for character columns with few enough distinct values, or a list of column names,
+                    to make Categorical columns; defaults to None
+      downcast - make whole number numerics nullable integers, and other numerics float32 where that holds them
+                 exactly; defaults to False
+      dtype_backend - 'numpy_nullable' or 'pyarrow', for nullable or pyarrow column types; defaults to None
       """
       dsopts = dsopts if dsopts is not None else {}
 
@@ -1556,6 +1556,8 @@ Will use HTML5 for this SASsession.""")
          return self.sasdata2dataframeCSV(table, libref, dsopts, **kwargs)
       elif method and method.lower() == 'disk':
          return self.sasdata2dataframeDISK(table, libref, dsopts, **kwargs)
+      elif method and method.lower() == 'binary':
+         return self.sasdata2dataframeBINARY(table, libref, dsopts, **kwargs)
 
       my_fmts = kwargs.pop('my_fmts', False)
       k_dts   = kwargs.pop('dtype',   None)
@@ -1565,6 +1567,15 @@ Will use HTML5 for this SASsession.""")
          if k_dts is not None:
             print("'dtype=' is only used with the CSV or DISK version of this method. option ignored.")
 
+      parallel = kwargs.pop('parallel', 1)
+      prows    = kwargs.pop('prows',    None)
+      if parallel > 1 or prows:
+         print("'parallel=' and 'prows=' are only used with the STDIO and SSH access methods. option ignored.")
+
+      dtopts = dtype_options(kwargs)
+      if dtopts is None:
+         return None
+
       logf     = ''
       logn     = self._logcnt()
       logcodei = "%put E3969440A681A24088859985" + logn + ";"
@@ -1576,53 +1587,8 @@ Will use HTML5 for this SASsession.""")
       else:
          tabname = "'"+table.strip()+"'n "
 
-      code  = "data sasdata2dataframe / view=sasdata2dataframe; set "+tabname+self._sb._dsopts(dsopts)+";run;\n"
-      code += "data _null_; file LOG; d = open('sasdata2dataframe');\n"
-      code += "length var $256;\n"
-      code += "lrecl = attrn(d, 'LRECL'); nvars = attrn(d, 'NVARS');\n"
-      code += "lr='LRECL='; vn='VARNUMS='; vl='VARLIST='; vt='VARTYPE=';\n"
-      code += "put lr lrecl; put vn nvars; put vl;\n"
-      code += "do i = 1 to nvars; var = compress(varname(d, i), '00'x); put var; end;\n"
-      code += "put vt;\n"
-      code += "do i = 1 to nvars; var = vartype(d, i); put var; end;\n"
-      code += "run;"
-
-      ll = self.submit(code, "text")
-
-      l2 = ll['LOG'].rpartition("LRECL= ")
-      l2 = l2[2].partition("\n")
-      lrecl = int(l2[0])
-
-      l2 = l2[2].partition("VARNUMS= ")
-      l2 = l2[2].partition("\n")
-      nvars = int(l2[0])
-
-      l2 = l2[2].partition("\n")
-      varlist = l2[2].split("\n", nvars)
-      del varlist[nvars]
-
-      l2 = l2[2].partition("VARTYPE=")
-      l2 = l2[2].partition("\n")
-      vartype = l2[2].split("\n", nvars)
-      del vartype[nvars]
-
-      topts             = dict(dsopts)
-      topts['obs']      = 0
-      topts['firstobs'] = ''
-   
-      code  = "data work._n_u_l_l_;output;run;\n"
-      code += "data _null_; set work._n_u_l_l_ "+tabname+self._sb._dsopts(topts)+";put 'FMT_CATS=';\n"
-   
-      for i in range(nvars):
-         code += "_tom = vformatn('"+varlist[i]+"'n);put _tom;\n"
-      code += "run;\nproc delete data=work._n_u_l_l_;run;"
-   
-      ll = self.submit(code, "text")
-   
-      l2 = ll['LOG'].rpartition("FMT_CATS=")
-      l2 = l2[2].partition("\n")
-      varcat = l2[2].split("\n", nvars)
-      del varcat[nvars]
+      varlist, vartype, varlen, varcat, nobs = self._sb._sd2df_meta(tabname, dsopts)
+      nvars = len(varlist)
 
       rdelim = "'"+'%02x' % ord(rowsep.encode(self.sascfg.encoding))+"'x"
       cdelim = "'"+'%02x' % ord(colsep.encode(self.sascfg.encoding))+"'x "
@@ -1675,12 +1641,12 @@ Will use HTML5 for this SASsession.""")
       first = True
       datar = b''
       bail  = False
-      r     = []
-      df    = None
-      trows = kwargs.get('trows', None)
-      if not trows:
-         trows = 100000
+      kinds  = sd_kinds(self._sb, vartype, varcat)
+      cats   = sd_categories(varlist, kinds, dtopts['categorical'])
+      chunks = []
+      pend   = bytearray()
 
+      poll = self._sb.sascfg.backoff()
       while not done:
          while True:
              if os.name == 'nt':
@@ -1709,6 +1675,7 @@ Will use HTML5 for this SASsession.""")
                 data = b''
 
              if len(data) > 0:
+                poll.reset()
                 if first:
                    if data[0:3] == BOM:
                       data = data[3:len(data)]
@@ -1716,35 +1683,16 @@ Will use HTML5 for this SASsession.""")
 
                 datar += data
                 data   = datar.rpartition(rsep.encode())
-                datap  = data[0]+data[1]
+                pend  += data[0]+data[1]
                 datar  = data[2]
 
-                datap = datap.decode(self.sascfg.encoding, errors='replace')
-                for i in datap.split(sep=rsep):
-                   if i != '':
-                      r.append(tuple(i.split(sep=colsep)))
-
-                if len(r) > trows:
-                   tdf = pd.DataFrame.from_records(r, columns=varlist)
-
-                   for i in range(nvars):
-                      if vartype[i] == 'N':
-                         if varcat[i] not in self._sb.sas_date_fmts + self._sb.sas_time_fmts + self._sb.sas_datetime_fmts:
-                            if tdf.dtypes[tdf.columns[i]].kind not in ('f','u','i','b','B','c','?'):
-                               tdf[varlist[i]] = pd.to_numeric(tdf[varlist[i]], errors='coerce')
-                         else:
-                            if tdf.dtypes[tdf.columns[i]].kind not in ('M'):
-                               tdf[varlist[i]] = pd.to_datetime(tdf[varlist[i]], errors='coerce')
-                      else:
-                         tdf[varlist[i]].replace(' ', np.NaN, True)
-
-                   if df is not None:
-                      df = df.append(tdf, ignore_index=True)
-                   else:
-                      df = tdf
-                   r = []
+                # decode and type the rows a block at a time as they come, rather than all of them at the end
+                if len(pend) >= 1048576:
+                   chunks.append(rows2df(pend, rsep, colsep, varlist, kinds, self.sascfg.encoding, cats,
+                                         dtopts['dtype_backend']))
+                   pend = bytearray()
              else:
-                sleep(0.1)
+                poll.sleep()
                 try:
                    log = self.stderr[0].recv(4096).decode(self.sascfg.encoding, errors='replace')
                 except (BlockingIOError):
@@ -1756,26 +1704,139 @@ Will use HTML5 for this SASsession.""")
                       bail = True
          done = True
 
-      if len(r) > 0 or df is None:
-         tdf = pd.DataFrame.from_records(r, columns=varlist)
+      if len(pend) or not chunks:
+         chunks.append(rows2df(pend, rsep, colsep, varlist, kinds, self.sascfg.encoding, cats, dtopts['dtype_backend']))
+      return assemble(chunks, varlist, kinds, **dtopts)
 
-         for i in range(nvars):
-            if vartype[i] == 'N':
-               if varcat[i] not in self._sb.sas_date_fmts + self._sb.sas_time_fmts + self._sb.sas_datetime_fmts:
-                  if tdf.dtypes[tdf.columns[i]].kind not in ('f','u','i','b','B','c','?'):
-                     tdf[varlist[i]] = pd.to_numeric(tdf[varlist[i]], errors='coerce')
-               else:
-                  if tdf.dtypes[tdf.columns[i]].kind not in ('M'):
-                     tdf[varlist[i]] = pd.to_datetime(tdf[varlist[i]], errors='coerce')
-            else:
-               tdf[varlist[i]].replace(' ', np.NaN, True)
+   def sasdata2dataframeBINARY(self, table: str, libref: str ='', dsopts: dict = None, **kwargs) -> '<Pandas Data Frame object>':
+      """
+      This method exports the SAS Data Set to a Pandas Data Frame, returning the Data Frame object.
+      Numeric variables are transferred as raw RB8. doubles and character variables as fixed width $CHARw.
+      fields, which are decoded with numpy.frombuffer instead of being formatted and parsed as text.
+      table   - the name of the SAS Data Set you want to export to a Pandas Data Frame
+      libref  - the libref for the SAS Data Set.
+      dsopts  - data set options for the input SAS Data Set
+      trows   - number of records to decode at a time; defaults to 100000
+      """
+      dsopts = dsopts if dsopts is not None else {}
+
+      if self._sb.m5dsbug:
+         print("method=BINARY can't be used when m5dsbug is set. Using method=MEMORY instead.")
+         return self.sasdata2dataframe(table, libref, dsopts, **kwargs)
 
-         if df is not None:
-            df = df.append(tdf, ignore_index=True)
+      logf     = ''
+      logn     = self._logcnt()
+      logcodei = "%put E3969440A681A24088859985" + logn + ";"
+      logcodeo = "\nE3969440A681A24088859985" + logn
+      logcodeb =  logcodeo.encode()
+
+      if libref:
+         tabname = libref+".'"+table.strip()+"'n "
+      else:
+         tabname = "'"+table.strip()+"'n "
+
+      varlist, vartype, varlen, varcat, nobs = self._sb._sd2df_meta(tabname, dsopts)
+      nvars = len(varlist)
+
+      kinds = sd_kinds(self._sb, vartype, varcat)
+
+      code  = "data _null_; file "+self._tomods1.decode()+" lrecl=1 recfm=f encoding=binary;\n"
+      code += "if _n_ = 1 then do; _tombo = 1; put _tombo RB8.; end;\n"
+      code += "set "+tabname+self._sb._dsopts(dsopts)+";\nput "
+      for i in range(nvars):
+         if vartype[i] == 'N':
+            code += "'"+varlist[i]+"'n RB8. "
          else:
-            df = tdf
+            code += "'"+varlist[i]+"'n $CHAR"+str(varlen[i])+". "
+         if i % 10 == 0:
+            code +='\n'
+      code += ";\nrun;"
 
-      return df
+      ll = self._asubmit(code, 'text')
+      self.stdin[0].send(b'\n'+logcodei.encode()+b'\n'+b'tom says EOL='+logcodeb+b'\n')
+
+      BOM   = "\ufeff".encode()
+      first = True
+      datar = bytearray()
+      bail  = False
+      dfs   = []
+      dtype = None
+      trows = kwargs.get('trows', None)
+      if not trows:
+         trows = 100000
+
+      poll = self._sb.sascfg.backoff()
+      while True:
+         if os.name == 'nt':
+            try:
+               rc = self.pid.wait(0)
+               self.pid = None
+               self._sb.SASpid = None
+               print('\nSAS process has terminated unexpectedly. RC from wait was: '+str(rc))
+               return None
+            except:
+               pass
+         else:
+            rc = os.waitpid(self.pid, os.WNOHANG)
+            if rc[1]:
+                self.pid = None
+                self._sb.SASpid = None
+                print('\nSAS process has terminated unexpectedly. RC from wait was: '+str(rc))
+                return None
+
+         if bail:
+            if datar.count(logcodeb) >= 1:
+               break
+         try:
+            data = self.stdout[0].recv(65536)
+         except (BlockingIOError):
+            data = b''
+
+         if len(data) > 0:
+            poll.reset()
+            if first:
+               if data[0:3] == BOM:
+                  data = data[3:len(data)]
+               first = False
+
+            datar += data
+
+            if dtype is None:
+               if len(datar) < 8:
+                  continue
+               dtype = binary_dtype(vartype, varlen, binary_byteorder(bytes(datar[:8])))
+               del datar[:8]
+               blksz = dtype.itemsize * trows
+
+            # hold back enough for the end marker so it's never decoded as data
+            avail = len(datar) - len(logcodeb)
+            if avail >= blksz:
+               end = avail - avail % dtype.itemsize
+               dfs.append(binary2df(bytes(datar[:end]), dtype, varlist, kinds, self.sascfg.encoding, self._sb.SAS_EPOCH))
+               del datar[:end]
+         else:
+            poll.sleep()
+            try:
+               log = self.stderr[0].recv(4096).decode(self.sascfg.encoding, errors='replace')
+            except (BlockingIOError):
+               log = b''
+
+            if len(log) > 0:
+               logf += log
+               if logf.count(logcodeo) >= 1:
+                  bail = True
+
+      datar = datar[:datar.find(logcodeb)]
+      if dtype is None:
+         dtype = binary_dtype(vartype, varlen)
+      else:
+         dfs.append(binary2df(bytes(datar), dtype, varlist, kinds, self.sascfg.encoding, self._sb.SAS_EPOCH))
+
+      if len(dfs) == 0:
+         return binary2df(b'', dtype, varlist, kinds, self.sascfg.encoding, self._sb.SAS_EPOCH)
+      if len(dfs) == 1:
+         return dfs[0]
+      return pd.concat(dfs, ignore_index=True)
 
    def sasdata2dataframeCSV(self, table: str, libref: str ='', dsopts: dict = None, tempfile: str=None, tempkeep: bool=False, **kwargs) -> '<Pandas Data Frame object>':
       """
@@ -1926,6 +1987,7 @@ Will use HTML5 for this SASsession.""")
 
       if not local:
          csv = open(tmpcsv, mode='wb')
+         poll = self._sb.sascfg.backoff()
          while not done:
                 while True:
                     if os.name == 'nt':
@@ -1951,6 +2013,7 @@ Will use HTML5 for this SASsession.""")
                        data = b''
 
                     if len(data) > 0:
+                       poll.reset()
                        datar += data
                        data   = datar.rpartition(b'\n')
                        datap  = data[0]+data[1]
@@ -1969,7 +2032,7 @@ Will use HTML5 for this SASsession.""")
                           done = True
                        if bail and done:
                           break
-                       sleep(0.1)
+                       poll.sleep()
                        try:
                           log = self.stderr[0].recv(4096).decode(errors='replace')
                        except (BlockingIOError):
@@ -1985,6 +2048,7 @@ Will use HTML5 for this SASsession.""")
          csv.close()
          df = pd.read_csv(tmpcsv, index_col=False, engine='c', dtype=dts, **kwargs)
       else:
+         poll = self._sb.sascfg.backoff()
          while True:
             try:
                lst = self.stdout[0].recv(4096).decode(errors='replace')
@@ -1992,6 +2056,7 @@ Will use HTML5 for this SASsession.""")
                lst = b''
 
             if len(lst) > 0:
+               poll.reset()
                lstf += lst
                if lstf.count(lstcodeo) >= 1:
                   done = True;
@@ -1999,7 +2064,7 @@ Will use HTML5 for this SASsession.""")
             try:
                log = self.stderr[0].recv(4096).decode(errors='replace')
             except (BlockingIOError):
-               sleep(0.1)
+               poll.sleep()
                log = b''
 
             if len(log) > 0:
@@ -2191,6 +2256,7 @@ Will use HTML5 for this SASsession.""")
 
       if not local:
          csv = open(tmpcsv, mode='w')
+         poll = self._sb.sascfg.backoff()
          while not done:
                 while True:
                     if os.name == 'nt':
@@ -2216,6 +2282,7 @@ Will use HTML5 for this SASsession.""")
                        data = b''
 
                     if len(data) > 0:
+                       poll.reset()
                        datar += data
                        data   = datar.rpartition(rsep.encode())
                        datap  = data[0]+data[1]
@@ -2237,7 +2304,7 @@ Will use HTML5 for this SASsession.""")
                           done = True
                        if bail and done:
                           break
-                       sleep(0.1)
+                       poll.sleep()
                        try:
                           log = self.stderr[0].recv(4096).decode(errors='replace')
                        except (BlockingIOError):
@@ -2252,6 +2319,7 @@ Will use HTML5 for this SASsession.""")
 
          csv.close()
       else:
+         poll = self._sb.sascfg.backoff()
          while True:
             try:
                lst = self.stdout[0].recv(4096).decode(errors='replace')
@@ -2259,6 +2327,7 @@ Will use HTML5 for this SASsession.""")
                lst = b''
 
             if len(lst) > 0:
+               poll.reset()
                lstf += lst
                if lstf.count(lstcodeo) >= 1:
                   done = True;
@@ -2266,7 +2335,7 @@ Will use HTML5 for this SASsession.""")
             try:
                log = self.stderr[0].recv(4096).decode(errors='replace')
             except (BlockingIOError):
-               sleep(0.1)
+               poll.sleep()
                log = b''
 
             if len(log) > 0:
@@ -18,16 +18,22 @@ import os
 import signal
 import subprocess
 import tempfile as tf
+import time
 from   time import sleep
 import socket as socks
 import codecs
 import select as sel
+import selectors
+import threading
+import zlib
 
-try:
-   import pandas as pd
-   import numpy  as np
-except ImportError:
-   pass
+from saspy.sasdfio import df2cards, binary_dtype, binary_byteorder, binary2df, sd_kinds, ColumnBuilder, stream2df
+from saspy.sasdfio import assemble, dtype_options
+
+from saspy.saslazy import LazyModule
+
+pd = LazyModule('pandas')
+np = LazyModule('numpy')
 
 class SASconfigSTDIO:
    """
@@ -175,6 +181,78 @@ class SASconfigSTDIO:
 
       return
 
+class _FifoChannel:
+   """
+   A named pipe (FIFO) in a private temporary directory, for moving data between saspy and a SAS session on this host
+   without going through TCP: no port to allocate, no firewall, no network stack. It stands in for the listening
+   socket in the transfer methods. SAS opens the path with a plain filename statement; opening our end blocks until
+   it does, so that's done in a thread, and accept() returns once both ends are open. The 'connection' it returns
+   is itself, with recv, send, shutdown and close.
+   mode - 'r' when saspy reads what SAS writes, 'w' when saspy writes what SAS reads
+   """
+   def __init__(self, mode: str = 'r'):
+      self.mode    = mode
+      self.fd      = None
+      self.tmpdir  = tf.TemporaryDirectory()
+      self.path    = self.tmpdir.name+os.sep+"saspy.fifo"
+      os.mkfifo(self.path, 0o600)
+      self.opened  = threading.Event()
+      self.thread  = threading.Thread(target=self._open, name='saspy-fifo', daemon=True)
+      self.thread.start()
+
+   def _open(self):
+      try:
+         self.fd = os.open(self.path, os.O_RDONLY if self.mode == 'r' else os.O_WRONLY)
+      except OSError:
+         pass
+      self.opened.set()
+
+   def getsockname(self):
+      return (self.path, 0)
+
+   def listen(self, backlog: int = 1):
+      pass
+
+   def wait(self, timeout: float = None) -> bool:
+      """
+      Wait for SAS to open its end; returns False if it didn't within timeout seconds
+      """
+      return self.opened.wait(timeout)
+
+   def accept(self):
+      self.opened.wait()
+      if self.fd is None:
+         raise OSError("The FIFO "+self.path+" could not be opened")
+      return (self, self.path)
+
+   def recv(self, size: int) -> bytes:
+      return os.read(self.fd, size)
+
+   def recv_into(self, buf) -> int:
+      return os.readv(self.fd, [buf])
+
+   def send(self, data: bytes) -> int:
+      return os.write(self.fd, data)
+
+   def shutdown(self, how: int = 0):
+      pass
+
+   def close(self):
+      if not self.opened.is_set():
+         # SAS never opened its end; open it here so the thread's open returns
+         try:
+            fd = os.open(self.path, (os.O_WRONLY if self.mode == 'r' else os.O_RDONLY) | os.O_NONBLOCK)
+            self.thread.join(5)
+            os.close(fd)
+         except OSError:
+            pass
+      if self.fd is not None:
+         os.close(self.fd)
+         self.fd = None
+      if self.tmpdir is not None:
+         self.tmpdir.cleanup()
+         self.tmpdir = None
+
 class SASsessionSTDIO():
    """
    The SASsession object is the main object to instantiate and provides access to the rest of the functionality.
@@ -196,6 +274,7 @@ class SASsessionSTDIO():
       self.stdin  = None
       self.stderr = None
       self.stdout = None
+      self._sel   = None
 
       self._sb      = kwargs.get('sb', None)
       self.sascfg   = SASconfigSTDIO(self, **kwargs)
@@ -340,6 +419,11 @@ Will use HTML5 for this SASsession.""")
       fcntl.fcntl(self.stdout, fcntl.F_SETFL, os.O_NONBLOCK)
       fcntl.fcntl(self.stderr, fcntl.F_SETFL, os.O_NONBLOCK)
 
+      # to wait for output from SAS instead of spinning on the non blocking reads
+      self._sel = selectors.DefaultSelector()
+      self._sel.register(self.stdout, selectors.EVENT_READ)
+      self._sel.register(self.stderr, selectors.EVENT_READ)
+
       rc = os.waitid(os.P_PID, self.pid, os.WEXITED | os.WNOHANG)
       if rc != None:
          self.pid = None
@@ -356,13 +440,14 @@ Will use HTML5 for this SASsession.""")
          enc = self.sascfg.encoding #validating encoding is done next, so handle it not being set for this one call
          if enc == '':
             self.sascfg.encoding = 'utf-8'
-         ll = self.submit("options svgtitle='svgtitle'; options validvarname=any validmemname=extend; ods graphics on;", "text")
+         ll = self.submit("options svgtitle='svgtitle'; options validvarname=any validmemname=extend; ods graphics on;\n"+self._sb._startcode, "text")
          self.sascfg.encoding = enc
          if self.pid is None:
             print("SAS Connection failed. No connection established. Double check your settings in sascfg_personal.py file.\n")
             print("Attempted to run program "+pgm+" with the following parameters:"+str(parms)+"\n")
             print("Try running the following command (where saspy is running) manually to see if you can get more information on what went wrong:\n"+s+"\n")
             return None
+         self._sb._startlog = ll['LOG']
 
       if self.sascfg.verbose:
          print("SAS Connection established. Subprocess id is "+str(self.pid)+"\n")
@@ -391,11 +476,15 @@ Will use HTML5 for this SASsession.""")
             print("SAS Connection terminated. Subprocess id was "+str(self.pid))
          self.pid        = None
          self._sb.SASpid = None
+         if self._sel:
+            self._sel.close()
+            self._sel    = None
       return ret
 
    def _getlog(self, wait=5, jobid=None):
-      logf   = b''
-      quit   = wait * 2
+      logf   = bytearray()
+      poll   = self._sb.sascfg.backoff()
+      end    = time.monotonic() + wait
       logn   = self._logcnt(False)
       code1  = "%put E3969440A681A24088859985"+logn+";\nE3969440A681A24088859985"+logn
 
@@ -406,14 +495,15 @@ Will use HTML5 for this SASsession.""")
          return 'SAS process has terminated unexpectedly. Pid State= '+str(rc)
 
       while True:
-         log = self.stderr.read1(4096)
+         log = self.stderr.read1(65536)
          if len(log) > 0:
+            poll.reset()
             logf += log
          else:
-            quit -= 1
-            if quit < 0 or len(logf) > 0:
+            left = end - time.monotonic()
+            if left <= 0 or len(logf) > 0:
                break
-            sleep(0.5)
+            poll.sleep(left)
 
       x = logf.decode(self.sascfg.encoding, errors='replace').replace(code1, " ")
       self._log += x
@@ -430,15 +520,17 @@ Will use HTML5 for this SASsession.""")
       return x
 
    def _getlst(self, wait=5, jobid=None):
-      lstf = b''
-      quit = wait * 2
+      lstf = bytearray()
+      poll = self._sb.sascfg.backoff()
+      end  = time.monotonic() + wait
       eof = 0
       bof = False
       lenf = 0
 
       while True:
-         lst = self.stdout.read1(4096)
+         lst = self.stdout.read1(65536)
          if len(lst) > 0:
+            poll.reset()
             lstf += lst
 
             if ((not bof) and lst.count(b"<!DOCTYPE html>", 0, 20) > 0):
@@ -453,10 +545,12 @@ Will use HTML5 for this SASsession.""")
                   break
 
             if not bof:
-               quit -= 1
-               if quit < 0:
+               left = end - time.monotonic()
+               if left <= 0:
                   break
-               sleep(0.5)
+               poll.sleep(left)
+            else:
+               poll.sleep()
 
       if self.pid == None:
          self._sb.SASpid = None
@@ -474,14 +568,15 @@ Will use HTML5 for this SASsession.""")
 
    def _getlsttxt(self, wait=5, jobid=None):
       f2 = [None]
-      lstf = b''
-      quit = wait * 2
+      lstf = bytearray()
+      poll = self._sb.sascfg.backoff()
       eof = 0
       self._asubmit("data _null_;file print;put 'Tom was here';run;", "text")
 
       while True:
-         lst = self.stdout.read1(4096)
+         lst = self.stdout.read1(65536)
          if len(lst) > 0:
+            poll.reset()
             lstf += lst
 
             lenf = len(lstf)
@@ -491,6 +586,8 @@ Will use HTML5 for this SASsession.""")
                final = lstf.partition(b"Tom was here")
                f2 = final[0].decode(self.sascfg.encoding, errors='replace').rpartition(chr(12))
                break
+         else:
+            poll.sleep()
 
       lst = f2[0]
 
@@ -533,7 +630,7 @@ Will use HTML5 for this SASsession.""")
 
       return str(out)
 
-   def submit(self, code: str, results: str ="html", prompt: dict = None) -> dict:
+   def submit(self, code: str, results: str ="html", prompt: dict = None, **kwargs) -> dict:
       '''
       This method is used to submit any SAS code. It returns the Log and Listing as a python dictionary.
       code    - the SAS statements you want to execute
@@ -566,8 +663,9 @@ Will use HTML5 for this SASsession.""")
       odsclose = b"ods "+self.sascfg.output.encode()+b" (id=saspy_internal) close;ods listing;\n"
       ods      = True;
       mj       = b";*\';*\";*/;"
-      lstf     = b''
-      logf     = b''
+      lstf     = bytearray()
+      logf     = bytearray()
+      scan     = 0
       bail     = False
       eof      = 5
       bc       = False
@@ -655,22 +753,24 @@ Will use HTML5 for this SASsession.""")
                      eof -= 1
                  if eof < 0:
                      break
-                 if ods:
-                    lst = self.stdout.read1(4096)
-                 else:
-                    lst = self.stdout.read1(4096)
+                 lst = self.stdout.read1(65536)
                  if len(lst) > 0:
                      lstf += lst
                  else:
-                     log = self.stderr.read1(4096)
+                     log = self.stderr.read1(65536)
                      if len(log) > 0:
                          logf += log
-                         if logf.count(logcodeo) >= 1:
+                         # only look for the end marker in what's new (and what could be the start of it)
+                         if logf.find(logcodeo, scan) >= 0:
                              bail = True
+                         scan = max(len(logf) - len(logcodeo) + 1, 0)
                          if not bail and bc:
                              self.stdin.write(odsclose+logcodei.encode(self.sascfg.encoding)+b'\n')
                              self.stdin.flush()
                              bc = False
+                     elif not bail:
+                         # nothing to read; wait for SAS to write something (or check on it every second)
+                         self._sel.select(1.0)
              done = True
 
          except (ConnectionResetError):
@@ -1176,38 +1276,22 @@ Will use HTML5 for this SASsession.""")
          # we are using a tunnel; default to that port
          port = self.sascfg.tunnel
 
-      if self.sascfg.ssh:
-         if not self.sascfg.tunnel:
-            host = self.sascfg.hostip #socks.gethostname()
-         else:
-            host = 'localhost'
-      else:
-         host = ''
-
-      try:
-         sock = socks.socket()
-         if self.sascfg.tunnel:
-            sock.bind(('localhost', port))
-         else:
-            sock.bind(('', port))
-         port = sock.getsockname()[1]
-      except OSError:
+      sock = self._sd2df_socket(port, mode='w', method='upload')
+      if sock is None:
+         fd.close()
          return {'Success' : False, 
                  'LOG'     : "Error try to open a socket in the upload method. Call failed."}
+      sock, host = sock
+      port       = sock.getsockname()[1]
 
-      code = """
-         filename saspydir '"""+remf+"""' recfm=F encoding=binary lrecl=1 permission='"""+permission+"""';
-         filename sock socket '"""+host+""":"""+str(port)+"""' recfm=S encoding=binary lrecl=4096;
-
-         data _null_; nb = -1;
-         infile sock nbyte=nb; 
-         file saspydir;
-         input;
-         put _infile_;
-         run;
-
-         filename saspydir;
-         filename sock;\n"""
+      code  = "filename saspydir '"+remf+"' recfm=F encoding=binary lrecl=1 permission='"+permission+"';\n"
+      if isinstance(sock, _FifoChannel):
+         code += self._sockfile(sock, host, port, "recfm=F encoding=binary lrecl=4096")
+         code += "data _null_;\ninfile sock length=len unbuf;\nfile saspydir;\ninput;\nput _infile_ $varying4096. len;\nrun;\n"
+      else:
+         code += self._sockfile(sock, host, port, "recfm=S encoding=binary lrecl=4096")
+         code += "data _null_; nb = -1;\ninfile sock nbyte=nb;\nfile saspydir;\ninput;\nput _infile_;\nrun;\n"
+      code += "filename saspydir;\nfilename sock;\n"
 
       sock.listen(1)
       self._asubmit(code, 'text')
@@ -1285,34 +1369,17 @@ Will use HTML5 for this SASsession.""")
          # we are using a tunnel; default to that port
          port = self.sascfg.tunnel
 
-      try:
-         sock = socks.socket()
-         if self.sascfg.tunnel:
-            sock.bind(('localhost', port))
-         else:
-            sock.bind(('', port))
-         port = sock.getsockname()[1]
-      except OSError:
+      sock = self._sd2df_socket(port, method='download')
+      if sock is None:
+         fd.close()
          return {'Success' : False, 
                  'LOG'     : "Error try to open a socket in the download method. Call failed."}
+      sock, host = sock
+      port       = sock.getsockname()[1]
 
-      if self.sascfg.ssh:
-         if not self.sascfg.tunnel:
-            host = self.sascfg.hostip #socks.gethostname()
-         else:
-            host = 'localhost'
-      else:
-         host = ''
-
-      code = """
-         filename saspydir '"""+remotefile+"""' recfm=F encoding=binary lrecl=4096;
-         filename sock socket '"""+host+""":"""+str(port)+"""' recfm=S encoding=binary;
-         data _null_;
-         file sock;
-         infile saspydir;
-         input;
-         put _infile_;
-         run;\n"""
+      code  = "filename saspydir '"+remotefile+"' recfm=F encoding=binary lrecl=4096;\n"
+      code += self._sockfile(sock, host, port, "recfm=S encoding=binary")
+      code += "data _null_;\nfile sock;\ninfile saspydir;\ninput;\nput _infile_;\nrun;\n"
 
       sock.listen(1)
       self._asubmit(code, 'text')
@@ -1362,7 +1429,7 @@ Will use HTML5 for this SASsession.""")
                          libref: str ="", keep_outer_quotes: bool=False,
                                           embedded_newlines: bool=False,
                          LF: str = '\x01', CR: str = '\x02', colsep: str = '\x03',
-                         datetimes: dict={}, outfmts: dict={}, labels: dict={}):
+                         datetimes: dict={}, outfmts: dict={}, labels: dict={}, **kwargs):
       """
       This method imports a Pandas Data Frame to a SAS Data Set, returning the SASdata object for the new Data Set.
       df      - Pandas Data Frame to import to a SAS Data Set
@@ -1376,6 +1443,7 @@ Will use HTML5 for this SASsession.""")
       datetimes - dict with column names as keys and values of 'date' or 'time' to create SAS date or times instead of datetimes
       outfmts - dict with column names and SAS formats to assign to the new SAS data set
       labels  - dict with column names and SAS Labels to assign to the new SAS data set
+      compress - gzip the data and upload it, instead of streaming it in; defaults to the config's 'compress'
       """
       input   = ""
       xlate   = ""
@@ -1463,130 +1531,78 @@ Will use HTML5 for this SASsession.""")
       if len(format):
          code += "format "+format+";\n"
       code += label
-      code += "infile datalines delimiter="+delim+" DSD STOPOVER;\n input "+input+";\n"+xlate+";\n datalines4;"
-      self._asubmit(code, "text")
 
-      for row in df.itertuples(index=False):
-      #for row in df.iterrows():
-         card  = ""
-         for col in range(ncols):
-            var = str(row[col])
-
-            if   dts[col] == 'N' and var == 'nan':
-               var = '.'
-            elif dts[col] == 'C':
-               if var == 'nan':
-                  var = ' '
-               else:
-                  if embedded_newlines:
-                     var = var.replace('\n', LF).replace('\r', CR)
-            elif dts[col] == 'B':
-               var = str(int(row[col]))
-            elif dts[col] == 'D':
-               if var in ['nan', 'NaT', 'NaN']:
-                  var = '.'
-               else:
-                  var = str(row[col].to_datetime64())[:26]
+      if kwargs.get('compress', self._sb.sascfg.compress):
+         self._sb._df2sd_gz(df2cards(df, dts, colsep, embedded_newlines, LF, CR), code,
+                            "delimiter="+delim+" DSD STOPOVER;\n input "+input+";\n"+xlate+";\nrun;\n")
+         return
 
-            card += var
-            if col < (ncols-1):
-               card += colsep
-         self.stdin.write(card.encode(self.sascfg.encoding)+b'\n')
+      code += "infile datalines delimiter="+delim+" DSD STOPOVER;\n input "+input+";\n"+xlate+";\n datalines4;"
+      self._asubmit(code, "text")
 
-         log = self.stderr.read1(4096)
-         if len(log) > 0:
-            self._log += log.decode(self.sascfg.encoding, errors='replace')
+      # SAS can write to the LOG while it reads the cards; if that pipe fills, SAS stops reading and so would we
+      drained = self._logdrain()
+      try:
+         for cards in df2cards(df, dts, colsep, embedded_newlines, LF, CR):
+            self.stdin.write(cards.encode(self.sascfg.encoding))
+      finally:
+         drained()
 
       self._asubmit(";;;;", "text")
       ll = self.submit("run;", 'text')
       return
 
-   def sasdata2dataframe(self, table: str, libref: str ='', dsopts: dict = None, rowsep: str = '\x01',
-                         colsep: str = '\x02', wait: int=10, **kwargs) -> '<Pandas Data Frame object>':
+   def _logdrain(self):
       """
-      This method exports the SAS Data Set to a Pandas Data Frame, returning the Data Frame object.
-      table   - the name of the SAS Data Set you want to export to a Pandas Data Frame
-      libref  - the libref for the SAS Data Set.
-      rowsep  - the row seperator character to use; defaults to '\x01'
-      colsep  - the column seperator character to use; defaults to '\x02'
-      port    - port to use for socket. Defaults to 0 which uses a random available ephemeral port
-      wait    - seconds to wait for socket connection from SAS; catches hang if an error in SAS. 0 = no timeout
+      Start a thread that reads the SAS LOG into self._log as it's written, for while we're busy writing to SAS's
+      stdin, so SAS never blocks on a full LOG pipe. The LOG is decoded incrementally, so a character split across
+      reads isn't garbled.
+      returns a function to call to stop the thread, once the writing is done
       """
-      dsopts = dsopts if dsopts is not None else {}
-
-      method = kwargs.pop('method', None)
-      if   method and method.lower() == 'csv':
-         return self.sasdata2dataframeCSV(table, libref, dsopts, wait=wait, **kwargs)
-      elif method and method.lower() == 'disk':
-         return self.sasdata2dataframeDISK(table, libref, dsopts, rowsep, colsep, wait=wait, **kwargs)
-
-      my_fmts = kwargs.pop('my_fmts', False)
-      k_dts   = kwargs.pop('dtype',   None)
-      if self.sascfg.verbose:
-         if my_fmts != False:
-            print("'my_fmts=' is only used with the CSV or DISK version of this method. option ignored.")
-         if k_dts is not None:
-            print("'dtype=' is only used with the CSV or DISK version of this method. option ignored.")
-
-      port =  kwargs.get('port', 0)
-
-      if port==0 and self.sascfg.tunnel:
-         # we are using a tunnel; default to that port
-         port = self.sascfg.tunnel
-
-      datar = ""
-
-      if libref:
-         tabname = libref+".'"+table.strip()+"'n "
-      else:
-         tabname = "'"+table.strip()+"'n "
-
-      code  = "data sasdata2dataframe / view=sasdata2dataframe; set "+tabname+self._sb._dsopts(dsopts)+";run;\n"
-      code += "data _null_; file STDERR;d = open('sasdata2dataframe');\n"
-      code += "lrecl = attrn(d, 'LRECL'); nvars = attrn(d, 'NVARS');\n"
-      code += "lr='LRECL='; vn='VARNUMS='; vl='VARLIST='; vt='VARTYPE=';\n"
-      code += "put lr lrecl; put vn nvars; put vl;\n"
-      code += "do i = 1 to nvars; var = varname(d, i); put var; end;\n"
-      code += "put vt;\n"
-      code += "do i = 1 to nvars; var = vartype(d, i); put var; end;\n"
-      code += "run;"
-
-      ll = self.submit(code, "text")
-
-      l2 = ll['LOG'].rpartition("LRECL= ")
-      l2 = l2[2].partition("\n")
-      lrecl = int(l2[0])
-
-      l2 = l2[2].partition("VARNUMS= ")
-      l2 = l2[2].partition("\n")
-      nvars = int(l2[0])
+      stop = threading.Event()
+      dec  = codecs.getincrementaldecoder(self.sascfg.encoding)(errors='replace')
+      sel  = selectors.DefaultSelector()
+      sel.register(self.stderr, selectors.EVENT_READ)
+
+      def drain():
+         while not stop.is_set():
+            if not sel.select(0.1):
+               continue
+            log = self.stderr.read1(65536)
+            if log:
+               self._log += dec.decode(log)
+            else:
+               stop.wait(0.1)
 
-      l2 = l2[2].partition("\n")
-      varlist = l2[2].split("\n", nvars)
-      del varlist[nvars]
+      thread = threading.Thread(target=drain, name='saspy-logdrain', daemon=True)
+      thread.start()
 
-      l2 = l2[2].partition("VARTYPE=")
-      l2 = l2[2].partition("\n")
-      vartype = l2[2].split("\n", nvars)
-      del vartype[nvars]
+      def done():
+         stop.set()
+         thread.join()
+         sel.close()
+         while True:
+            log = self.stderr.read1(65536)
+            if not log:
+               break
+            self._log += dec.decode(log)
+         self._log += dec.decode(b'', final=True)
 
-      topts             = dict(dsopts)
-      topts['obs']      = 0
-      topts['firstobs'] = ''
-      
-      code  = "data work._n_u_l_l_;output;run;\n"
-      code += "data _null_; file STDERR; set work._n_u_l_l_ "+tabname+self._sb._dsopts(topts)+";put 'FMT_CATS=';\n"
+      return done
 
-      for i in range(nvars):
-         code += "_tom = vformatn('"+varlist[i]+"'n);put _tom;\n"
-      code += "run;\nproc delete data=work._n_u_l_l_;run;"
-      
-      ll = self.submit(code, "text")
-      
-      l2 = ll['LOG'].rpartition("FMT_CATS=")
-      l2 = l2[2].partition("\n")
-      varcat = l2[2].split("\n", nvars)
-      del varcat[nvars]
+   def _sd2df_socket(self, port: int, fifo: bool = True, mode: str = 'r', method: str = 'sasdata2dataframe') -> tuple:
+      """
+      Open the listening socket SAS will stream the data to. When SAS is on this host (no ssh) and no port was
+      asked for, a FIFO is used instead; see _FifoChannel.
+      fifo - allow a FIFO; the parallel transfer needs more than one connection, which a FIFO can't give
+      mode - for a FIFO, 'r' if we read what SAS writes, 'w' if SAS reads what we write
+      returns a tuple of (socket, host for SAS to connect to) or None if the socket couldn't be opened
+      """
+      if fifo and port == 0 and not self.sascfg.ssh and hasattr(os, 'mkfifo'):
+         try:
+            return _FifoChannel(mode), None
+         except OSError:
+            pass
 
       try:
          sock = socks.socket()
@@ -1594,9 +1610,8 @@ Will use HTML5 for this SASsession.""")
             sock.bind(('localhost', port))
          else:
             sock.bind(('', port))
-         port = sock.getsockname()[1]
       except OSError:
-         print('Error try to open a socket in the sasdata2dataframe method. Call failed.')
+         print('Error try to open a socket in the '+method+' method. Call failed.')
          return None
 
       if self.sascfg.ssh:
@@ -1607,16 +1622,31 @@ Will use HTML5 for this SASsession.""")
       else:
          host = ''
 
-      rdelim = "'"+'%02x' % ord(rowsep.encode(self.sascfg.encoding))+"'x"
-      cdelim = "'"+'%02x' % ord(colsep.encode(self.sascfg.encoding))+"'x"
+      return sock, host
 
-      if self._sb.m5dsbug:
-         code = "filename sock socket '"+host+":"+str(port)+"' lrecl="+str(self.sascfg.lrecl)+" recfm=v termstr=LF;\n"
-      else:
-         code = "filename sock socket '"+host+":"+str(port)+"' lrecl=1 recfm=f encoding=binary;\n"
+   def _sockfile(self, sock, host: str, port: int, opts: str, fileref: str = 'sock') -> str:
+      """
+      Generate the filename statement for SAS's end of the channel from _sd2df_socket(); opts are the options for a
+      socket, recfm=S being changed to recfm=N, binary stream, for a FIFO
+      """
+      if isinstance(sock, _FifoChannel):
+         return "filename "+fileref+" '"+sock.path+"' "+opts.replace('recfm=S', 'recfm=N')+";\n"
+      return "filename "+fileref+" socket '"+host+":"+str(port)+"' "+opts+";\n"
 
-      code += "data _null_; set "+tabname+self._sb._dsopts(dsopts)+";\n"
-      for i in range(nvars):
+   def _sockwait(self, sock, wait: int) -> bool:
+      """
+      Wait up to wait seconds for SAS to connect to (or open) the channel; returns False if it didn't
+      """
+      if isinstance(sock, _FifoChannel):
+         return sock.wait(wait)
+      return sel.select([sock],[],[],wait)[0] != []
+
+   def _sd2df_fmts(self, varlist: list, vartype: list, varcat: list) -> str:
+      """
+      Generate the format statements so numerics, dates, times and datetimes are written in a form we can parse
+      """
+      code = ''
+      for i in range(len(varlist)):
          if vartype[i] == 'N':
             code += "format '"+varlist[i]+"'n "
             if varcat[i] in self._sb.sas_date_fmts:
@@ -1632,6 +1662,42 @@ Will use HTML5 for this SASsession.""")
             code += '; '
             if i % 10 == 0:
                code +='\n'
+      return code
+
+   def _sd2df_puts(self, varlist: list, cdelim: str, rdelim: str) -> str:
+      """
+      Generate the put statements writing one row, delimited, to a lrecl=1 recfm=f socket fileref
+      """
+      code  = ''
+      last  = len(varlist)-1
+      for i in range(len(varlist)):
+         code += "put '"+varlist[i]+"'n "
+         if i != last:
+            code += cdelim+'; '
+         else:
+            code += rdelim+'; '
+         if i % 10 == 0:
+            code +='\n'
+      return code
+
+   def _sd2df_code(self, tabname: str, dsopts: dict, varlist: list, vartype: list, varcat: list,
+                   sock, host: str, port: int, rowsep: str, colsep: str, gzf: str = None) -> tuple:
+      """
+      Generate the data step that writes the table to the socket, delimited, for the MEMORY method
+      With gzf, the gzip file _sd2df_gzcode() wrote the table to is copied to the socket instead.
+      returns a tuple of (code, row seperator to split the stream on)
+      """
+      nvars  = len(varlist)
+      rdelim = "'"+'%02x' % ord(rowsep.encode(self.sascfg.encoding))+"'x"
+      cdelim = "'"+'%02x' % ord(colsep.encode(self.sascfg.encoding))+"'x"
+
+      if self._sb.m5dsbug:
+         code = self._sockfile(sock, host, port, "lrecl="+str(self.sascfg.lrecl)+" recfm=v termstr=LF")
+      else:
+         code = self._sockfile(sock, host, port, "lrecl=1 recfm=f encoding=binary")
+
+      code += "data _null_; set "+tabname+self._sb._dsopts(dsopts)+";\n"
+      code += self._sd2df_fmts(varlist, vartype, varcat)
 
       if self._sb.m5dsbug:
          rsep = colsep+rowsep+'\n'
@@ -1641,41 +1707,350 @@ Will use HTML5 for this SASsession.""")
             if i % 10 == 0:
                code +='\n'
          code += rdelim+";\nrun;"
+      elif gzf:
+         rsep  = rowsep
+         code  = self._sockfile(sock, host, port, "recfm=S encoding=binary")
+         code += "filename _spgzr '"+gzf+"' lrecl=4096 recfm=F;\n"
+         code += "data _null_;\nfile sock;\ninfile _spgzr length=len eof=eof unbuf;\n"
+         code += "input;\nput _infile_ $varying4096. len;\nreturn;\neof: stop;\nrun;\n"
+         code += "data _null_; rc = fdelete('_spgzr'); run;\nfilename _spgzr;"
       else:
          rsep = rowsep
          code += "file sock; "
-         last  = len(varlist)-1
-         for i in range(nvars):
-            code += "put '"+varlist[i]+"'n "
-            if i != last:
-               code += cdelim+'; '
-            else:
-               code += rdelim+'; '
-            if i % 10 == 0:
-               code +='\n'
+         code += self._sd2df_puts(varlist, cdelim, rdelim)
          code += "run;"
 
+      return code, rsep
+
+   def _sd2df_gzcode(self, tabname: str, dsopts: dict, varlist: list, vartype: list, varcat: list,
+                     rowsep: str, colsep: str, gzf: str) -> str:
+      """
+      Generate the data step that writes the table, delimited, to the gzip file gzf in WORK (ZIP access method,
+      SAS 9.4M5 and later), for the MEMORY method with compress
+      """
+      rdelim = "'"+'%02x' % ord(rowsep.encode(self.sascfg.encoding))+"'x"
+      cdelim = "'"+'%02x' % ord(colsep.encode(self.sascfg.encoding))+"'x"
+
+      code  = "filename _spgz ZIP '"+gzf+"' GZIP;\n"
+      code += "data _null_; set "+tabname+self._sb._dsopts(dsopts)+";\n"
+      code += self._sd2df_fmts(varlist, vartype, varcat)
+      code += "file _spgz recfm=N; "
+      code += self._sd2df_puts(varlist, cdelim, rdelim)
+      code += "run;\nfilename _spgz;"
+      return code
+
+   def _sd2df_tdf(self, r: list, varlist: list, vartype: list, varcat: list) -> '<Pandas Data Frame object>':
+      """
+      Build a typed Data Frame from the list of row tuples streamed over by the MEMORY method
+      """
+      cb = ColumnBuilder(varlist, sd_kinds(self._sb, vartype, varcat), len(r))
+      cb.append(r)
+      return cb.to_df()
+
+   def sasdata2dataframe(self, table: str, libref: str ='', dsopts: dict = None, rowsep: str = '\x01',
+                         colsep: str = '\x02', wait: int=10, **kwargs) -> '<Pandas Data Frame object>':
+      """
+      This method exports the SAS Data Set to a Pandas Data Frame, returning the Data Frame object.
+      table   - the name of the SAS Data Set you want to export to a Pandas Data Frame
+      libref  - the libref for the SAS Data Set.
+      rowsep  - the row seperator character to use; defaults to '\x01'
+      colsep  - the column seperator character to use; defaults to '\x02'
+      port    - port to use for socket. Defaults to 0 which uses a random available ephemeral port,
+                or, when SAS is on this host (no ssh), a FIFO instead of a socket
+      wait    - seconds to wait for socket connection from SAS; catches hang if an error in SAS. 0 = no timeout
+      compress - gzip the data on the SAS side and decompress it as it streams in; defaults to the config's 'compress'
+      parallel - number of socket connections to stream the data over, each decoded in its own thread; defaults to 1
+      prows   - with parallel, the number of rows in each block dealt out to the connections; defaults to 1000
+      workers - number of threads decoding the rows while they're still being received; defaults to 1
+      qdepth  - number of received row blocks that can be waiting to be decoded; defaults to 4
+      bufsize - size, in bytes, of the receive buffer, which is roughly the size of each row block; defaults to 1MB
+      categorical - 'auto', for character columns with few enough distinct values, or a list of column names,
+                    to make Categorical columns; defaults to None
+      downcast - make whole number numerics nullable integers, and other numerics float32 where that holds them
+                 exactly; defaults to False
+      dtype_backend - 'numpy_nullable' or 'pyarrow', for nullable or pyarrow column types; defaults to None
+      """
+      dsopts = dsopts if dsopts is not None else {}
+
+      method = kwargs.pop('method', None)
+      if   method and method.lower() == 'csv':
+         return self.sasdata2dataframeCSV(table, libref, dsopts, wait=wait, **kwargs)
+      elif method and method.lower() == 'disk':
+         return self.sasdata2dataframeDISK(table, libref, dsopts, rowsep, colsep, wait=wait, **kwargs)
+      elif method and method.lower() == 'binary':
+         return self.sasdata2dataframeBINARY(table, libref, dsopts, wait=wait, **kwargs)
+
+      my_fmts = kwargs.pop('my_fmts', False)
+      k_dts   = kwargs.pop('dtype',   None)
+      if self.sascfg.verbose:
+         if my_fmts != False:
+            print("'my_fmts=' is only used with the CSV or DISK version of this method. option ignored.")
+         if k_dts is not None:
+            print("'dtype=' is only used with the CSV or DISK version of this method. option ignored.")
+
+      dtopts = dtype_options(kwargs)
+      if dtopts is None:
+         return None
+
+      port =  kwargs.get('port', 0)
+
+      if port==0 and self.sascfg.tunnel:
+         # we are using a tunnel; default to that port
+         port = self.sascfg.tunnel
+
+      parallel = kwargs.get('parallel', 1)
+      if parallel > 1 and self._sb.m5dsbug:
+         print("'parallel=' can't be used when m5dsbug is set. option ignored.")
+         parallel = 1
+
+      compress = kwargs.get('compress', self._sb.sascfg.compress)
+      if compress and (self._sb.m5dsbug or parallel > 1):
+         print("'compress=' can't be used with 'parallel=' or when m5dsbug is set. option ignored.")
+         compress = False
+
+      if libref:
+         tabname = libref+".'"+table.strip()+"'n "
+      else:
+         tabname = "'"+table.strip()+"'n "
+
+      varlist, vartype, varlen, varcat, nobs = self._sb._sd2df_meta(tabname, dsopts)
+
+      if parallel > 1:
+         prows = kwargs.get('prows', None)
+         if not prows:
+            prows = 1000
+         df = self._sd2df_parallel(tabname, dsopts, varlist, vartype, varcat, parallel, port, rowsep, colsep, wait, prows)
+         if not isinstance(df, pd.DataFrame):
+            return df
+         return assemble([df], varlist, sd_kinds(self._sb, vartype, varcat), **dtopts)
+
+      sock = self._sd2df_socket(port)
+      if sock is None:
+         return None
+      sock, host = sock
+      port       = sock.getsockname()[1]
+
+      dco   = None
+      gzf   = None
+      if compress:
+         # the whole table is compressed before SAS connects, so there's no telling how long that will be; write
+         # the gzip file first and wait for that, so a failure shows up in its log instead of as a hung accept
+         gzf = self._sb.workpath+"saspy_sd2df"+self._sb._objcnt()+".gz"
+         ll  = self.submit(self._sd2df_gzcode(tabname, dsopts, varlist, vartype, varcat, rowsep, colsep, gzf), 'text')
+         if 'ERROR' in ll['LOG']:
+            print("error occured in SAS during sasdata2dataframe. Trying to return the saslog instead of a data frame.")
+            sock.close()
+            return ll['LOG']
+         dco = zlib.decompressobj(16 + zlib.MAX_WBITS)
+
+      code, rsep = self._sd2df_code(tabname, dsopts, varlist, vartype, varcat, sock, host, port, rowsep, colsep, gzf)
+
       sock.listen(1)
       self._asubmit(code, 'text')
 
-      r     = []
-      df    = None
-      datar = b''
-      trows = kwargs.get('trows', None)
-      if not trows:
-         trows = 100000
-
-      if wait > 0 and sel.select([sock],[],[],wait)[0] == []:
+      if wait > 0 and not self._sockwait(sock, wait):
          print("error occured in SAS during sasdata2dataframe. Trying to return the saslog instead of a data frame.")
          sock.close()
          ll = self.submit("", 'text')
          return ll['LOG']
          
+      newsock = (0,0)
+      try:
+         newsock = sock.accept()
+         df = stream2df(newsock[0], rsep, colsep, varlist, sd_kinds(self._sb, vartype, varcat), self.sascfg.encoding,
+                        dco, kwargs.get('workers', 1), kwargs.get('qdepth', 4), kwargs.get('bufsize', 1048576), **dtopts)
+      except:
+         print("sasdata2dataframe was interupted. Trying to return the saslog instead of a data frame.")
+         if newsock[0]:
+            newsock[0].shutdown(socks.SHUT_RDWR)
+            newsock[0].close()
+         sock.close()
+         ll = self.submit("", 'text')
+         return ll['LOG']
+
+      newsock[0].shutdown(socks.SHUT_RDWR)
+      newsock[0].close()
+      sock.close()
+
+      ll = self.submit("", 'text')
+
+      return df
+
+   def _sd2df_parallel(self, tabname: str, dsopts: dict, varlist: list, vartype: list, varcat: list,
+                       parallel: int, port: int, rowsep: str, colsep: str, wait: int, prows: int) -> '<Pandas Data Frame object>':
+      """
+      MEMORY method streaming the table over parallel socket connections. The rows are dealt out to the
+      connections in blocks of prows, each connection is decoded in its own thread, and the partitions are
+      put back in order at the end. Each connection starts with its partition number, so they can all be
+      accepted on the one listening socket (which also works through a tunnel).
+      """
+      sock = self._sd2df_socket(port, fifo=False)
+      if sock is None:
+         return None
+      sock, host = sock
+      port       = sock.getsockname()[1]
+
+      rdelim = "'"+'%02x' % ord(rowsep.encode(self.sascfg.encoding))+"'x"
+      cdelim = "'"+'%02x' % ord(colsep.encode(self.sascfg.encoding))+"'x"
+
+      code = ''
+      for k in range(parallel):
+         code += "filename sock"+str(k)+" socket '"+host+":"+str(port)+"' lrecl=1 recfm=f encoding=binary;\n"
+      code += "data _null_;\nif _n_ = 1 then do;\n"
+      for k in range(parallel):
+         code += "file sock"+str(k)+"; put '"+str(k)+"' "+rdelim+";\n"
+      code += "end;\nset "+tabname+self._sb._dsopts(dsopts)+";\n"
+      code += self._sd2df_fmts(varlist, vartype, varcat)
+      code += "\n_tomp = mod(int((_n_-1)/"+str(prows)+"), "+str(parallel)+");\nselect (_tomp);\n"
+      for k in range(parallel):
+         code += "when ("+str(k)+") file sock"+str(k)+";\n"
+      code += "end;\n"
+      code += self._sd2df_puts(varlist, cdelim, rdelim)
+      code += "run;"
+
+      sock.listen(parallel)
+      self._asubmit(code, 'text')
+
+      rsep  = rowsep.encode()
+      conns = [None] * parallel
+      datas = [b''] * parallel
+      parts = [None] * parallel
+      try:
+         for i in range(parallel):
+            if wait > 0 and sel.select([sock],[],[],wait)[0] == []:
+               raise TimeoutError
+
+            conn = sock.accept()[0]
+            hdr  = b''
+            while rsep not in hdr:
+               data = conn.recv(4096)
+               if not len(data):
+                  break
+               hdr += data
+            hdr = hdr.partition(rsep)
+            k   = int(hdr[0].decode())
+
+            conns[k] = conn
+            datas[k] = hdr[2]
+
+         threads = []
+         for k in range(parallel):
+            t = threading.Thread(target=self._sd2df_part, args=(conns[k], datas[k], k, parallel, prows, varlist,
+                                 vartype, varcat, rowsep, colsep, parts))
+            t.start()
+            threads.append(t)
+         for t in threads:
+            t.join()
+
+         for k in range(parallel):
+            if isinstance(parts[k], BaseException):
+               raise parts[k]
+      except:
+         print("sasdata2dataframe was interupted. Trying to return the saslog instead of a data frame.")
+         for conn in conns:
+            if conn:
+               conn.close()
+         sock.close()
+         ll = self.submit("", 'text')
+         return ll['LOG']
+
+      for conn in conns:
+         conn.shutdown(socks.SHUT_RDWR)
+         conn.close()
+      sock.close()
+
+      ll = self.submit("", 'text')
+
+      df = pd.concat(parts).sort_index()
+      df.reset_index(drop=True, inplace=True)
+      return df
+
+   def _sd2df_part(self, conn, datar: bytes, k: int, parallel: int, prows: int, varlist: list, vartype: list,
+                   varcat: list, rowsep: str, colsep: str, parts: list):
+      """
+      Thread target for _sd2df_parallel; reads and decodes one partition into parts[k], indexed by the row's
+      position in the whole table. Any exception is put in parts[k] instead.
+      """
+      try:
+         r = []
+         while True:
+            data  = datar.rpartition(rowsep.encode())
+            datap = data[0]+data[1]
+            datar = data[2]
+
+            datap = datap.decode(self.sascfg.encoding, errors='replace')
+            for i in datap.split(sep=rowsep):
+               if i != '':
+                  r.append(tuple(i.split(sep=colsep)))
+
+            data = conn.recv(65536)
+            if len(data):
+               datar += data
+            else:
+               break
+
+         tdf       = self._sd2df_tdf(r, varlist, vartype, varcat)
+         i         = np.arange(len(tdf))
+         tdf.index = ((i // prows) * parallel + k) * prows + i % prows
+         parts[k]  = tdf
+      except BaseException as e:
+         parts[k]  = e
+
+   def sasdata2dataframe_iter(self, table: str, libref: str ='', dsopts: dict = None, chunksize: int = 100000,
+                              rowsep: str = '\x01', colsep: str = '\x02', wait: int=10, **kwargs):
+      """
+      This method is a generator that exports the SAS Data Set, yielding Pandas Data Frames of up to chunksize rows
+      as the data is streamed over. Only one chunk is held at a time. Closing the generator before it's exhausted
+      closes the socket, which ends the SAS data step streaming the data.
+      table     - the name of the SAS Data Set you want to export to Pandas Data Frames
+      libref    - the libref for the SAS Data Set.
+      dsopts    - data set options for the input SAS Data Set
+      chunksize - the number of rows in each Data Frame; the last one may have fewer
+      rowsep    - the row seperator character to use; defaults to '\x01'
+      colsep    - the column seperator character to use; defaults to '\x02'
+      port      - port to use for socket. Defaults to 0 which uses a random available ephemeral port,
+                  or, when SAS is on this host (no ssh), a FIFO instead of a socket
+      wait      - seconds to wait for socket connection from SAS; catches hang if an error in SAS. 0 = no timeout
+      """
+      dsopts = dsopts if dsopts is not None else {}
+      port   = kwargs.get('port', 0)
+
+      if port==0 and self.sascfg.tunnel:
+         # we are using a tunnel; default to that port
+         port = self.sascfg.tunnel
+
+      if libref:
+         tabname = libref+".'"+table.strip()+"'n "
+      else:
+         tabname = "'"+table.strip()+"'n "
+
+      varlist, vartype, varlen, varcat, nobs = self._sb._sd2df_meta(tabname, dsopts)
+
+      sock = self._sd2df_socket(port)
+      if sock is None:
+         return
+      sock, host = sock
+      port       = sock.getsockname()[1]
+
+      code, rsep = self._sd2df_code(tabname, dsopts, varlist, vartype, varcat, sock, host, port, rowsep, colsep)
+
+      sock.listen(1)
+      self._asubmit(code, 'text')
+
+      if wait > 0 and not self._sockwait(sock, wait):
+         print("error occured in SAS during sasdata2dataframe_iter. No data returned. Check the SAS log for errors.")
+         sock.close()
+         self.submit("", 'text')
+         return
+
+      r       = []
+      datar   = b''
+      done    = False
       newsock = (0,0)
       try:
          newsock = sock.accept()
          while True:
-            data = newsock[0].recv(4096)
+            data = newsock[0].recv(65536)
 
             if len(data):
                datar += data
@@ -1691,25 +2066,117 @@ Will use HTML5 for this SASsession.""")
                if i != '':
                   r.append(tuple(i.split(sep=colsep)))
 
-            if len(r) > trows:
-               tdf = pd.DataFrame.from_records(r, columns=varlist)
+            while len(r) >= chunksize:
+               tdf = self._sd2df_tdf(r[:chunksize], varlist, vartype, varcat)
+               del r[:chunksize]
+               yield tdf
+
+         if len(r) > 0:
+            tdf = self._sd2df_tdf(r, varlist, vartype, varcat)
+            r   = []
+            yield tdf
+         done = True
+      finally:
+         # if we didn't get to the end, closing the socket on SAS ends the data step
+         if newsock[0]:
+            if done:
+               newsock[0].shutdown(socks.SHUT_RDWR)
+            newsock[0].close()
+         sock.close()
+         self.submit("", 'text')
 
-               for i in range(nvars):
-                  if vartype[i] == 'N':
-                     if varcat[i] not in self._sb.sas_date_fmts + self._sb.sas_time_fmts + self._sb.sas_datetime_fmts:
-                        if tdf.dtypes[tdf.columns[i]].kind not in ('f','u','i','b','B','c','?'):
-                           tdf[varlist[i]] = pd.to_numeric(tdf[varlist[i]], errors='coerce')
-                     else:
-                        if tdf.dtypes[tdf.columns[i]].kind not in ('M'):
-                           tdf[varlist[i]] = pd.to_datetime(tdf[varlist[i]], errors='coerce')
-                  else:
-                     tdf[varlist[i]].replace(' ', np.NaN, True)
+   def sasdata2dataframeBINARY(self, table: str, libref: str ='', dsopts: dict = None, wait: int=10, **kwargs) -> '<Pandas Data Frame object>':
+      """
+      This method exports the SAS Data Set to a Pandas Data Frame, returning the Data Frame object.
+      Numeric variables are transferred as raw RB8. doubles and character variables as fixed width $CHARw.
+      fields, which are decoded with numpy.frombuffer instead of being formatted and parsed as text.
+      table   - the name of the SAS Data Set you want to export to a Pandas Data Frame
+      libref  - the libref for the SAS Data Set.
+      dsopts  - data set options for the input SAS Data Set
+      port    - port to use for socket. Defaults to 0 which uses a random available ephemeral port,
+                or, when SAS is on this host (no ssh), a FIFO instead of a socket
+      wait    - seconds to wait for socket connection from SAS; catches hang if an error in SAS. 0 = no timeout
+      trows   - number of records to decode at a time; defaults to 100000
+      """
+      dsopts = dsopts if dsopts is not None else {}
 
-               if df is not None:
-                  df = df.append(tdf, ignore_index=True)
-               else:
-                  df = tdf
-               r = []
+      if self._sb.m5dsbug:
+         print("method=BINARY can't be used when m5dsbug is set. Using method=MEMORY instead.")
+         return self.sasdata2dataframe(table, libref, dsopts, wait=wait, **kwargs)
+
+      port =  kwargs.get('port', 0)
+
+      if port==0 and self.sascfg.tunnel:
+         # we are using a tunnel; default to that port
+         port = self.sascfg.tunnel
+
+      if libref:
+         tabname = libref+".'"+table.strip()+"'n "
+      else:
+         tabname = "'"+table.strip()+"'n "
+
+      varlist, vartype, varlen, varcat, nobs = self._sb._sd2df_meta(tabname, dsopts)
+      nvars = len(varlist)
+
+      kinds = sd_kinds(self._sb, vartype, varcat)
+
+      sock = self._sd2df_socket(port)
+      if sock is None:
+         return None
+      sock, host = sock
+      port       = sock.getsockname()[1]
+
+      code  = self._sockfile(sock, host, port, "lrecl=1 recfm=f encoding=binary")
+      code += "data _null_; file sock;\n"
+      code += "if _n_ = 1 then do; _tombo = 1; put _tombo RB8.; end;\n"
+      code += "set "+tabname+self._sb._dsopts(dsopts)+";\nput "
+      for i in range(nvars):
+         if vartype[i] == 'N':
+            code += "'"+varlist[i]+"'n RB8. "
+         else:
+            code += "'"+varlist[i]+"'n $CHAR"+str(varlen[i])+". "
+         if i % 10 == 0:
+            code +='\n'
+      code += ";\nrun;"
+
+      sock.listen(1)
+      self._asubmit(code, 'text')
+
+      dfs   = []
+      dtype = None
+      datar = bytearray()
+      trows = kwargs.get('trows', None)
+      if not trows:
+         trows = 100000
+
+      if wait > 0 and not self._sockwait(sock, wait):
+         print("error occured in SAS during sasdata2dataframe. Trying to return the saslog instead of a data frame.")
+         sock.close()
+         ll = self.submit("", 'text')
+         return ll['LOG']
+
+      newsock = (0,0)
+      try:
+         newsock = sock.accept()
+         while True:
+            data = newsock[0].recv(65536)
+
+            if len(data):
+               datar += data
+            else:
+               break
+
+            if dtype is None:
+               if len(datar) < 8:
+                  continue
+               dtype = binary_dtype(vartype, varlen, binary_byteorder(bytes(datar[:8])))
+               del datar[:8]
+               blksz = dtype.itemsize * trows
+
+            if len(datar) >= blksz:
+               end = len(datar) - len(datar) % dtype.itemsize
+               dfs.append(binary2df(bytes(datar[:end]), dtype, varlist, kinds, self.sascfg.encoding, self._sb.SAS_EPOCH))
+               del datar[:end]
       except:
          print("sasdata2dataframe was interupted. Trying to return the saslog instead of a data frame.")
          if newsock[0]:
@@ -1724,26 +2191,15 @@ Will use HTML5 for this SASsession.""")
       sock.close()
 
       ll = self.submit("", 'text')
-      if len(r) > 0 or df is None:
-         tdf = pd.DataFrame.from_records(r, columns=varlist)
 
-         for i in range(nvars):
-            if vartype[i] == 'N':
-               if varcat[i] not in self._sb.sas_date_fmts + self._sb.sas_time_fmts + self._sb.sas_datetime_fmts:
-                  if tdf.dtypes[tdf.columns[i]].kind not in ('f','u','i','b','B','c','?'):
-                     tdf[varlist[i]] = pd.to_numeric(tdf[varlist[i]], errors='coerce')
-               else:
-                  if tdf.dtypes[tdf.columns[i]].kind not in ('M'):
-                     tdf[varlist[i]] = pd.to_datetime(tdf[varlist[i]], errors='coerce')
-            else:
-               tdf[varlist[i]].replace(' ', np.NaN, True)
+      if dtype is None:
+         dtype = binary_dtype(vartype, varlen)
+      if len(datar) > 0 or len(dfs) == 0:
+         dfs.append(binary2df(bytes(datar), dtype, varlist, kinds, self.sascfg.encoding, self._sb.SAS_EPOCH))
 
-         if df is not None:
-            df = df.append(tdf, ignore_index=True)
-         else:
-            df = tdf
-
-      return df
+      if len(dfs) == 1:
+         return dfs[0]
+      return pd.concat(dfs, ignore_index=True)
 
    def sasdata2dataframeCSV(self, table: str, libref: str ='', dsopts: dict = None, tempfile: str=None, 
                             tempkeep: bool=False, wait: int=10, **kwargs) -> '<Pandas Data Frame object>':
@@ -0,0 +1,45 @@
+#
+# Copyright SAS Institute
+#
+#  Licensed under the Apache License, Version 2.0 (the License);
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#
+import importlib
+import importlib.util
+
+class LazyModule:
+   '''
+   Stands in for a module, like pandas, that is slow to import and isn't needed by everything saspy does. The module
+   isn't imported until one of its attributes is first used, so 'import saspy' doesn't pay for it up front. After
+   that, its attributes are copied here, so using them costs the same as using the module itself.
+   If the module isn't installed, using it raises the ImportError importing it would have.
+   name - the name of the module to import
+   '''
+   def __init__(self, name: str):
+      self.__dict__['_lazyname'] = name
+
+   def __repr__(self):
+      return "<lazy module '"+self._lazyname+"'>"
+
+   def __getattr__(self, attr):
+      mod = importlib.import_module(self._lazyname)
+      self.__dict__.update(mod.__dict__)
+      return getattr(mod, attr)
+
+def available(name: str) -> bool:
+   '''
+   Return whether the module is installed, without importing it
+   '''
+   try:
+      return importlib.util.find_spec(name) is not None
+   except (ImportError, ValueError):
+      return False
@@ -0,0 +1,456 @@
+#
+# Copyright SAS Institute
+#
+#  Licensed under the Apache License, Version 2.0 (the License);
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#
+import re
+
+_quoted = re.compile(r"""'(?:[^']|'')*'n?|"(?:[^"]|"")*"n?""", re.IGNORECASE)
+_ident  = re.compile(r"[A-Za-z_][A-Za-z0-9_]*")
+
+def _names(expr: str) -> set:
+   '''
+   The upper cased names an expression may refer to. Function names and keywords come along too; that's fine for
+   what they're used for, deciding what a filter depends on and which columns need to be read.
+   '''
+   names = set()
+   for lit in _quoted.findall(expr):
+      if lit[-1] in 'nN':
+         names.add(lit[1:-2].replace(lit[0]*2, lit[0]).upper())
+   names.update(n.upper() for n in _ident.findall(_quoted.sub(' ', expr)))
+   return names
+
+_whereops = {'AND', 'OR', 'NOT', 'IN', 'IS', 'MISSING', 'NULL', 'BETWEEN', 'LIKE', 'CONTAINS', 'SAME', 'EQ', 'NE',
+              'GT', 'LT', 'GE', 'LE', 'EQT', 'NET', 'GTT', 'LTT', 'GET', 'LET'}
+_call      = re.compile(r"([A-Za-z_][A-Za-z0-9_]*)\s*\(")
+
+def _refs(expr: str) -> set:
+   '''
+   The upper cased column names a where expression refers to; _names() without the operators and function names
+   '''
+   funcs = {f.upper() for f in _call.findall(_quoted.sub(' ', expr))}
+   return _names(expr) - _whereops - funcs
+
+def _varlist(vars) -> list:
+   if isinstance(vars, str):
+      return vars.split()
+   return list(vars)
+
+class SASdataPlan:
+   '''
+   A lazy query plan over a SASdata object, gotten from SASdata.lazy(). Each method records a step and returns a
+   new plan; nothing is submitted to SAS until the plan is collected with collect(), to_df() or head(). Then all
+   of the steps are compiled into a single DATA step that reads the table once:
+
+   - where() filters on columns of the table are applied as the rows are read, as a where= option, no matter
+     where they are in the plan; filters on columns the plan computes become subsetting IFs after the assignments
+   - add_vars(), constant impute() values and partition() flags are statements in that one DATA step
+   - keep() and drop() are pushed down, so only the columns the plan needs are read
+   - sort() is always done last, on the output of the DATA step
+
+   sd   = sas.sasdata('cars', 'sashelp')
+   plan = sd.lazy().where('msrp > 30000').add_vars({'ratio': 'horsepower / weight'}).keep('make model ratio')
+   df   = plan.sort('descending ratio').to_df()
+
+   explain() returns the SAS code collecting the plan would submit.
+   '''
+   def __init__(self, data: 'SASdata', steps: tuple = ()):
+      self.data  = data
+      self.sas   = data.sas
+      self.steps = steps
+
+   def __repr__(self):
+      x  = "Plan over %s.%s\n" % (self.data.libref, self.data.table)
+      for step in self.steps:
+         x += "   %s %s\n" % (step[0], str(step[1:]) if len(step) > 2 else str(step[1]))
+      return x
+
+   def _add(self, *step) -> 'SASdataPlan':
+      return SASdataPlan(self.data, self.steps + (step,))
+
+   def where(self, expr: str) -> 'SASdataPlan':
+      '''
+      Keep only the rows for which the SAS expression is true
+
+      :param expr: a SAS where expression, like 'msrp < 20000 and make = "Ford"'
+      :return: a new plan
+      '''
+      return self._add('where', expr)
+
+   def keep(self, vars) -> 'SASdataPlan':
+      '''
+      Keep only these columns in the result
+
+      :param vars: a space delimited string or a list of variable names
+      :return: a new plan
+      '''
+      return self._add('keep', _varlist(vars))
+
+   def drop(self, vars) -> 'SASdataPlan':
+      '''
+      Drop these columns from the result
+
+      :param vars: a space delimited string or a list of variable names
+      :return: a new plan
+      '''
+      return self._add('drop', _varlist(vars))
+
+   def add_vars(self, vars: dict) -> 'SASdataPlan':
+      '''
+      Add (or replace) columns computed from SAS expressions, as in SASdata.add_vars()
+
+      :param vars: dict of {'varname': 'SAS expression'}
+      :return: a new plan
+      '''
+      return self._add('assign', tuple(vars.items()))
+
+   def sort(self, by: str) -> 'SASdataPlan':
+      '''
+      Sort the result. The sort is done after everything else in the plan, whatever order it's called in.
+
+      :param by: the BY list, like 'make descending msrp'
+      :return: a new plan
+      '''
+      return self._add('sort', by)
+
+   def impute(self, vars: dict, replace: bool = False, prefix: str = 'imp_') -> 'SASdataPlan':
+      '''
+      Impute missing values, like SASdata.impute(). The 'value' key takes a list of (var, value) tuples; a str value
+      is a character value and anything else numeric. Any other key is an SQL summary function, like mean, median,
+      min or max, or is midrange, mode or random, and takes a list of numeric variables. The statistics are computed
+      over the rows as they are at this point in the plan.
+
+      :param vars: a dictionary in the form of {'impute type': [var1, var2]}
+      :param replace: when True, the imputed values go in new variables named prefix+var instead
+      :param prefix: the prefix for the new variables when replace is True
+      :return: a new plan
+      '''
+      for t in vars.get('value', []):
+         if not isinstance(t, tuple):
+            print("The elements in the 'value' key must be tuples")
+            return None
+      return self._add('impute', tuple((k, tuple(v)) for k, v in vars.items()), replace, prefix)
+
+   def partition(self, fraction: float = .7, seed: int = 9878, var: str = '_PartInd_') -> 'SASdataPlan':
+      '''
+      Flag each row for training or validation. Each row gets 1 in var with probability fraction, else 0, using the
+      seeded random number stream. Unlike SASdata.partition() this is a simple random split in the same DATA step
+      as the rest of the plan, so the split is near fraction, not exactly it, and there is no stratification or kfold.
+
+      :param fraction: the fraction of rows to flag with 1
+      :param seed: the random seed
+      :param var: the name of the flag variable
+      :return: a new plan
+      '''
+      return self._add('partition', float(fraction), int(seed), var)
+
+   def _source(self) -> str:
+      return self.data.libref + ".'" + self.data.table + "'n"
+
+   def _stepcode(self, step, names: dict) -> str:
+      '''
+      The DATA step statements for an assign, impute or partition step
+      '''
+      code = ''
+      if step[0] == 'assign':
+         for var, expr in step[1]:
+            code += "   %s = %s;\n" % (var, expr)
+
+      elif step[0] == 'partition':
+         code += "   if _n_ = 1 then call streaminit(%d);\n" % step[2]
+         code += "   %s = (rand('uniform') < %s);\n" % (step[3], repr(step[1]))
+
+      elif step[0] == 'impute':
+         replace, prefix = step[2], step[3]
+         for key, values in step[1]:
+            for v in values:
+               if key.lower() == 'value':
+                  var, val = v[0], (('"' + v[1].replace('"', '""') + '"') if isinstance(v[1], str) else str(v[1]))
+               else:
+                  var, val = v, names[(key.lower(), v.upper())]
+               if replace:
+                  code += "   %s%s = %s; if missing(%s) then %s%s = %s;\n" % (prefix, var, var, var, prefix, var, val)
+               else:
+                  code += "   if missing(%s) then %s = %s;\n" % (var, var, val)
+      return code
+
+   def _sets(self, step) -> set:
+      '''
+      The upper cased names of the variables a step assigns
+      '''
+      if step[0] == 'assign':
+         return {var.upper() for var, expr in step[1]}
+      if step[0] == 'partition':
+         return {step[3].upper()}
+      if step[0] == 'impute':
+         out = set()
+         for key, values in step[1]:
+            for v in values:
+               var = v[0] if key.lower() == 'value' else v
+               out.add(((step[3] if step[2] else '') + var).upper())
+         return out
+      return set()
+
+   def _uses(self, step) -> set:
+      '''
+      The upper cased names a step refers to
+      '''
+      if step[0] == 'where':
+         return _names(step[1])
+      if step[0] == 'assign':
+         out = set()
+         for var, expr in step[1]:
+            out |= _names(expr)
+         return out
+      if step[0] == 'sort':
+         return _names(step[1]) - {'DESCENDING'}
+      if step[0] == 'impute':
+         out = set()
+         for key, values in step[1]:
+            for v in values:
+               out.add((v[0] if key.lower() == 'value' else v).upper())
+         return out
+      return set()
+
+   def _compile(self, out: str, view: bool, tag: str, sort: bool = True) -> tuple:
+      '''
+      Compile the plan into SAS code that creates out, as a table or a view.
+
+      :return: (code, [temporary views the code creates])
+      '''
+      pre       = ''
+      temps     = []
+      pushed    = []
+      body      = ''
+      computed  = set()
+      uses      = set()
+      keep      = None
+      drop      = []
+      by        = None
+      stats     = {}
+
+      for i, step in enumerate(self.steps):
+         kind = step[0]
+         uses |= self._uses(step)
+
+         if kind == 'where':
+            if _names(step[1]) & computed:
+               body += "   if %s;\n" % step[1]
+            else:
+               pushed.append(step[1])
+
+         elif kind == 'keep':
+            cols = [c for c in step[1] if c.upper() not in {d.upper() for d in drop}]
+            if keep is not None:
+               cols = [c for c in cols if c.upper() in {k.upper() for k in keep}]
+            keep = cols
+
+         elif kind == 'drop':
+            drop += step[1]
+            if keep is not None:
+               keep = [k for k in keep if k.upper() not in {d.upper() for d in step[1]}]
+
+         elif kind == 'sort':
+            by = step[1]
+
+         else:
+            if kind == 'impute':
+               # statistics come from a pass over the rows as they are at this point in the plan
+               sel   = []
+               modes = []
+               for key, values in step[1]:
+                  k = key.lower()
+                  if k == 'value':
+                     continue
+                  for v in values:
+                     mv = "_sp%s_%d" % (tag, len(stats))
+                     if k == 'midrange':
+                        sel.append(("(max(%s) + min(%s)) / 2" % (v, v), mv))
+                        stats[(k, v.upper())] = "&" + mv + "."
+                     elif k == 'random':
+                        sel += [("max(%s)" % v, mv + "x"), ("min(%s)" % v, mv + "n")]
+                        stats[(k, v.upper())] = "(&%sx. - &%sn.) * rand('uniform') + &%sn." % (mv, mv, mv)
+                     elif k == 'mode':
+                        # not an SQL function; the most frequent value, the lowest of any ties, like SASdata.impute()
+                        modes.append((v, mv))
+                        stats[(k, v.upper())] = "&" + mv + "."
+                     else:
+                        sel.append(("%s(%s)" % (k, v), mv))
+                        stats[(k, v.upper())] = "&" + mv + "."
+               if sel or modes:
+                  prefix    = SASdataPlan(self.data, self.steps[:i])
+                  pview     = "work._sp%s_%d" % (tag, i)
+                  pc, pt    = prefix._compile(pview, True, "%s_%d" % (tag, i), sort=False)
+                  pre      += pc
+                  temps    += pt + [pview]
+               if sel:
+                  pre      += "proc sql noprint;\n   select " + ", ".join(s[0] for s in sel) + "\n"
+                  pre      += "   into " + ", ".join(":" + s[1] + " trimmed" for s in sel) + "\n"
+                  pre      += "   from %s;\nquit;\n" % pview
+               for v, mv in modes:
+                  pre      += "%%let %s=.;\n" % mv
+                  pre      += "proc sql noprint outobs=1;\n"
+                  pre      += "   select %s, count(*) as _spfreq into :%s trimmed, :%sf from %s\n" % (v, mv, mv, pview)
+                  pre      += "   where %s is not missing group by %s order by _spfreq desc, %s;\nquit;\n" % (v, v, v)
+
+            body     += self._stepcode(step, stats)
+            computed |= self._sets(step)
+
+      # only read the columns the plan needs; the ones that are in the table are looked up as this code runs
+      base  = dict(self.data.dsopts)
+      if pushed:
+         w = base.get('where', [])
+         if isinstance(w, str):
+            w = [w] if w.strip() else []
+         w = list(w) + pushed
+         base['where'] = w if len(w) == 1 else ['(' + x + ')' for x in w]
+      setopts = self.sas._dsopts(base)
+      # a plan that only keeps computed columns doesn't need any particular columns from the table, and the
+      # keep= is left off if none of the ones it does need turn out to be in the table
+      need = {k.upper() for k in keep} | uses if keep is not None else set()
+      if need - computed and 'keep' not in base and 'drop' not in base:
+         mv   = "_sp%s_k" % tag
+         pre += "%%let %s=;\n" % mv
+         pre += "proc sql noprint;\n   select name into :%s separated by ' ' from dictionary.columns\n" % mv
+         pre += "   where libname = '%s' and upcase(memname) = '%s'\n" % (self.data.libref.upper(), self.data.table.upper().replace("'", "''"))
+         pre += "      and upcase(name) in (%s);\nquit;\n" % ", ".join("'" + n.replace("'", "''") + "'" for n in sorted(need))
+         pre += "data _null_;\n   length k $32767;\n   k = symget('%s');\n" % mv
+         if setopts.startswith('('):
+            pre    += "   if k ne '' then call symputx('%s', 'keep=' || k);\nrun;\n" % mv
+            setopts = "(&%s. " % mv + setopts[1:]
+         else:
+            pre    += "   if k ne '' then call symputx('%s', '(keep=' || trim(k) || ')');\nrun;\n" % mv
+            setopts = "&%s." % mv + setopts
+      elif drop and keep is None and 'keep' not in base and 'drop' not in base:
+         unused = [d for d in drop if d.upper() not in uses and d.upper() not in computed]
+         if unused:
+            opts    = "drop=%s " % " ".join(unused)
+            drop    = [d for d in drop if d not in unused]
+            setopts = "(" + opts + setopts[1:] if setopts.startswith('(') else "(" + opts + ")" + setopts
+
+      dsout = out
+      if by and sort:
+         dsout = "work._sp%s_s" % tag
+      code  = "data %s" % dsout + (" / view=%s" % dsout if view or (by and sort) else "") + ";\n"
+      code += "   set %s %s;\n" % (self._source(), setopts)
+      code += body
+      if keep is not None:
+         code += "   keep %s;\n" % " ".join(keep)
+      elif drop:
+         code += "   drop %s;\n" % " ".join(drop)
+      code += "run;\n"
+
+      if by and sort:
+         temps.append(dsout)
+         if view:
+            cols, desc = [], False
+            for tok in by.split():
+               if tok.upper() == 'DESCENDING':
+                  desc = True
+                  continue
+               cols.append(tok + (" desc" if desc else ""))
+               desc = False
+            code += "proc sql;\n   create view %s as select * from %s order by %s;\nquit;\n" % (out, dsout, ", ".join(cols))
+         else:
+            code += "proc sort data=%s out=%s;\n   by %s;\nrun;\n" % (dsout, out, by)
+
+      return pre + code, temps
+
+   def _target(self, out) -> tuple:
+      if out is None:
+         return 'WORK', '_plan' + self.sas._objcnt()
+      if isinstance(out, str):
+         fn = out.partition('.')
+         if fn[1] == '.':
+            return fn[0], fn[2].strip()
+         return '', fn[0].strip()
+      return out.libref, out.table
+
+   def explain(self, out: object = None, view: bool = False) -> str:
+      '''
+      Return the SAS code that collect() would submit for this plan
+
+      :param out: the same as for collect()
+      :param view: the same as for collect()
+      :return: str
+      '''
+      libref, table = self._target(out)
+      name = (libref + "." if libref else "") + "'" + table + "'n"
+      return self._compile(name, view, self.sas._objcnt())[0]
+
+   def collect(self, out: object = None, view: bool = False, results: str = '') -> 'SASdata':
+      '''
+      Run the plan and return a SASdata object for its output
+
+      :param out: 'libref.table', 'table' or a SASdata object to write to; the default is a new WORK table
+      :param view: create a DATA step view instead of a table, so the plan runs each time it is read
+      :param results: the results format for the returned SASdata; the plan's SASdata's is the default
+      :return: SASdata object
+      '''
+      return self._collect(out, view, results)[0]
+
+   def _collect(self, out, view, results='') -> tuple:
+      libref, table = self._target(out)
+      name          = (libref + "." if libref else "") + "'" + table + "'n"
+      code, temps   = self._compile(name, view, self.sas._objcnt())
+
+      if not view and temps:
+         code += "proc datasets lib=work nolist nowarn;\n   delete %s / memtype=view;\nquit;\n" % " ".join(t.partition('.')[2] for t in temps)
+
+      if self.sas.nosub:
+         print(code)
+         return None, []
+
+      ll = self.sas._io.submit(code, "text")
+      if 'ERROR' in ll['LOG']:
+         print("The plan failed to run. The SAS log was:\n" + ll['LOG'])
+         return None, []
+      sd = self.sas.sasdata(table, libref, results=results if results else self.data.results)
+      return sd, (temps if view else [])
+
+   def _drop(self, sd: 'SASdata', temps: list):
+      views = [sd.libref + ".'" + sd.table + "'n"] + temps
+      self.sas._io.submit("proc sql;\n" + "".join("   drop view %s;\n" % v for v in reversed(views)) + "quit;\n", "text")
+
+   def to_df(self, method: str = 'MEMORY', **kwargs) -> 'pandas.DataFrame':
+      '''
+      Run the plan and return its result as a pandas DataFrame. The plan is read through a view, so its output is
+      never written to a table on the SAS side.
+
+      :param method: the same as for SASdata.to_df()
+      :param kwargs: passed on to SASdata.to_df()
+      :return: Pandas data frame
+      '''
+      sd, temps = self._collect(None, True)
+      if sd is None:
+         return None
+      try:
+         return sd.to_df(method=method, **kwargs)
+      finally:
+         self._drop(sd, temps)
+
+   def head(self, obs: int = 5):
+      '''
+      Run the plan through a view and display the first obs rows of its result. Only as many rows as are needed are
+      read from the table, unless the plan sorts.
+
+      :param obs: the number of rows to show
+      :return: the same as SASdata.head()
+      '''
+      sd, temps = self._collect(None, True)
+      if sd is None:
+         return None
+      try:
+         return sd.head(obs)
+      finally:
+         self._drop(sd, temps)
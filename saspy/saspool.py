@@ -0,0 +1,211 @@
+#
+# Copyright SAS Institute
+#
+#  Licensed under the Apache License, Version 2.0 (the License);
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#
+import threading
+from contextlib import contextmanager
+
+from saspy.sasbase import SASsession
+from saspy.saswait import Backoff
+
+class SASsessionPool:
+   '''
+   A pool of SAS sessions, all for the same configuration definition, that are started ahead of time so getting one
+   doesn't wait on SAS to start up. A background thread keeps size idle sessions ready; get() hands one out, already
+   connected and configured, and put() resets it and gives it back. Since it's built on SASsession, it works the
+   same for any access method: STDIO, SSH, IOM, COM or HTTP.
+
+   size   - number of idle sessions to keep started
+   kwargs - the same parameters you would pass to SASsession(), cfgname= and so on; all of the pooled sessions use them
+
+   pool = saspy.SASsessionPool(size=2, cfgname='winiomlinux')
+   with pool.session() as sas:
+      sas.submit(...)
+   pool.close()
+
+   When a session is given back, the WORK library is emptied, the SAS system options are restored to what they were
+   once the session had started, titles and footnotes are cleared, and batch, results and teach_me_SAS are set back.
+   Librefs, filerefs and macro variables the code created are not reset. A session that can't be reset, or whose SAS
+   process has gone away, is ended and a new one is started in its place. If sessions fail to start, the pool keeps
+   trying, waiting longer between tries, up to a minute; get() waits through that, up to its timeout if one is given.
+   session() raises a RuntimeError if it can't get a session, rather than running the block without one.
+   '''
+   def __init__(self, size: int = 2, **kwargs):
+      self.size      = max(int(size), 1)
+      self.kwargs    = kwargs
+      self._idle     = []
+      self._closed   = False
+      self._failed   = False
+      self._cond     = threading.Condition()
+      self._thread   = threading.Thread(target=self._refill, name='saspy-sessionpool', daemon=True)
+      self._thread.start()
+
+   def __repr__(self):
+      with self._cond:
+         x  = "SAS Config name       = %s\n" % self.kwargs.get('cfgname', '')
+         x += "Pool size             = %d\n" % self.size
+         x += "Idle sessions         = %d\n" % len(self._idle)
+         x += "Closed                = %s\n" % str(self._closed)
+      return x
+
+   def __enter__(self):
+      return self
+
+   def __exit__(self, exc_type, exc_value, traceback):
+      self.close()
+
+   def _start(self):
+      try:
+         sas = SASsession(**self.kwargs)
+      except Exception as e:
+         print("Failed to start a SAS session for the pool. Exception was: "+str(e))
+         return None
+
+      if sas._io is None or not sas.SASpid:
+         print("Failed to start a SAS session for the pool.")
+         return None
+
+      # save the options as they are now, somewhere that emptying WORK won't remove
+      code  = "data _null_; rc = dcreate('_saspool', pathname('work')); run;\n"
+      code += "libname _sppool '"+sas.workpath+"_saspool';\n"
+      code += "proc optsave out=_sppool.options; run;\n"
+      ll = sas._io.submit(code, 'text')
+      if 'ERROR' in ll['LOG']:
+         print("Failed to save the SAS options for the pool. The SAS log was:\n"+ll['LOG'])
+         sas._endsas()
+         return None
+
+      sas._poolstate = (sas.batch, sas.results, sas.nosub)
+      return sas
+
+   def _refill(self):
+      retry = Backoff(start=1.0, maximum=60.0, jitter=0.25)
+      while True:
+         with self._cond:
+            while not self._closed and len(self._idle) >= self.size:
+               self._cond.wait()
+            if self._closed:
+               return
+
+         sas = self._start()
+
+         with self._cond:
+            if sas is None:
+               # get() reports it while sessions won't start; keep trying, waiting longer each time, in case
+               # it's something that clears up, like the network or a license server
+               self._failed = True
+               self._cond.notify_all()
+               self._cond.wait(retry.next())
+               continue
+            retry.reset()
+            self._failed = False
+            if self._closed:
+               break
+            self._idle.append(sas)
+            self._cond.notify_all()
+
+      sas._endsas()
+
+   def _reset(self, sas) -> bool:
+      if sas._io is None or not sas.SASpid:
+         return False
+
+      code  = "proc optload data=_sppool.options; run;\n"
+      code += "title; footnote;\n"
+      code += "proc datasets lib=work kill nolist; quit;\n"
+      try:
+         ll = sas._io.submit(code, 'text')
+      except Exception:
+         return False
+
+      if 'ERROR' in ll['LOG']:
+         return False
+
+      sas.batch, sas.results, sas.nosub = sas._poolstate
+      sas._lastlog = ''
+      return True
+
+   def get(self, timeout: float = None) -> 'SASsession':
+      '''
+      Get a session from the pool, waiting for one to be started if none are idle.
+
+      :param timeout: the most seconds to wait for a session, while the pool retries any that fail to start; None, the
+                      default, waits as long as it takes
+      :return: a SASsession, or None if none became available within timeout or the pool is closed
+      '''
+      with self._cond:
+         self._cond.wait_for(lambda: self._idle or self._closed, timeout)
+         if self._closed:
+            print("This SASsessionPool has been closed.")
+            return None
+         if self._idle:
+            sas = self._idle.pop(0)
+            self._cond.notify_all()
+            return sas
+         if self._failed:
+            print("SAS sessions for this pool are failing to start; it keeps retrying. See the messages above for why.")
+         else:
+            print("No SAS session became available within "+str(timeout)+" seconds.")
+         return None
+
+   def put(self, sas: 'SASsession'):
+      '''
+      Give a session gotten from get() back to the pool. It is reset first, and ended instead if it can't be reset,
+      or if the pool is already full or closed.
+
+      :param sas: the SASsession to give back
+      '''
+      if sas is None:
+         return
+
+      ok = self._reset(sas)
+      with self._cond:
+         if ok and not self._closed and len(self._idle) < self.size:
+            self._idle.append(sas)
+            self._cond.notify_all()
+            return
+         self._cond.notify_all()
+
+      if sas.SASpid:
+         sas._endsas()
+
+   @contextmanager
+   def session(self, timeout: float = None):
+      '''
+      Context manager that gets a session from the pool and gives it back when the block ends.
+
+      :param timeout: the most seconds to wait for a session; see get()
+      :raises RuntimeError: if no session became available within timeout, or the pool is closed
+      '''
+      sas = self.get(timeout)
+      if sas is None:
+         raise RuntimeError("No SAS session could be gotten from the SASsessionPool; see the message above for why.")
+      try:
+         yield sas
+      finally:
+         self.put(sas)
+
+   def close(self):
+      '''
+      Stop refilling the pool and end all of the idle sessions. Sessions that are checked out are ended when they
+      are given back with put().
+      '''
+      with self._cond:
+         self._closed = True
+         idle         = self._idle
+         self._idle   = []
+         self._cond.notify_all()
+
+      for sas in idle:
+         sas._endsas()
@@ -13,12 +13,10 @@
 #  See the License for the specific language governing permissions and
 #  limitations under the License.
 #
-try:
-   from pygments.formatters import HtmlFormatter
-   from pygments import highlight
-   from saspy.SASLogLexer import SASLogStyle, SASLogLexer
-except:
-   pass
+from saspy.saslazy import available
+
+# pygments is only imported to color a LOG
+_pygments = available('pygments')
 
 class SASresults(object):
     """Return results from a SAS Model object"""
@@ -42,13 +40,7 @@ class SASresults(object):
         self.nosub = nosub
         self._log  = log
 
-        try:
-           if SASLogLexer:
-              self.nopyg = False
-           else:
-              self.nopyg = True
-        except:
-           self.nopyg = True
+        self.nopyg = not _pygments
 
     def __dir__(self) -> list:
         """Overload dir method to return the attributes"""
@@ -90,6 +82,10 @@ class SASresults(object):
            return data
 
     def _colorLog(self,log:str)-> str:
+        from pygments.formatters import HtmlFormatter
+        from pygments import highlight
+        from saspy.SASLogLexer import SASLogStyle, SASLogLexer
+
         color_log = highlight(log, SASLogLexer(), HtmlFormatter(full=True, style=SASLogStyle, lineseparator="<br>"))
         return color_log
 
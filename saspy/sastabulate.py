@@ -1,15 +1,15 @@
 import logging
 from typing import TYPE_CHECKING
 
-try:
-    import pandas as pd
-except ImportError:
-    pass
+from saspy.saslazy import LazyModule
+
+pd = LazyModule('pandas')
 
 from collections import ChainMap
 import saspy as sp
 
 from saspy.sasresults import SASresults
+from saspy.sasproccommons import SASProcCommons
 
 
 class TabulationItem:
@@ -279,7 +279,7 @@ class Tabulate:
         # but we can at least use it to check valid options in the canonical saspy way
         required_options = {'cls', 'var', 'table'}
         allowed_options = {'cls', 'var', 'table', 'where'}
-        verifiedKwargs = sp.sasproccommons.SASProcCommons._stmt_check(self, required_options, allowed_options,
+        verifiedKwargs = SASProcCommons._stmt_check(self, required_options, allowed_options,
                                                                       proc_kwargs)
 
         if (_output_type == 'Pandas'):
@@ -0,0 +1,118 @@
+#
+# Copyright SAS Institute
+#
+#  Licensed under the Apache License, Version 2.0 (the License);
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#
+import random
+import threading
+from time import sleep
+
+class WaitStats:
+   '''
+   Running totals of the polling waits for a SASsession, shared by all of its Backoff objects.
+   polls   - number of times a loop slept waiting on SAS
+   slept   - total seconds slept
+   events  - number of times something showed up after a loop had slept
+   latency - total seconds of latency the waits added; for each event, the last wait before it, which is
+             the most it could have been late by
+   maxlat  - the largest of those
+   '''
+   def __init__(self):
+      self._lock = threading.Lock()
+      self.clear()
+
+   def __repr__(self):
+      return str(self.stats())
+
+   def clear(self):
+      with self._lock:
+         self.polls   = 0
+         self.slept   = 0.0
+         self.events  = 0
+         self.latency = 0.0
+         self.maxlat  = 0.0
+
+   def stats(self) -> dict:
+      '''
+      Return the totals as a dict, along with the average added latency per event
+      '''
+      with self._lock:
+         return {'polls'   : self.polls,
+                 'slept'   : self.slept,
+                 'events'  : self.events,
+                 'latency' : self.latency,
+                 'avglat'  : self.latency / self.events if self.events else 0.0,
+                 'maxlat'  : self.maxlat}
+
+   def _slept(self, secs: float):
+      with self._lock:
+         self.polls += 1
+         self.slept += secs
+
+   def _event(self, lat: float):
+      with self._lock:
+         self.events  += 1
+         self.latency += lat
+         if lat > self.maxlat:
+            self.maxlat = lat
+
+class Backoff:
+   '''
+   Exponential backoff with jitter for the loops that poll, waiting on SAS. The first wait is short, so
+   quick replies aren't held up by a fixed sleep, and each wait after that is longer, up to maximum, so
+   long running steps aren't polled needlessly. Call reset() whenever the loop gets something, and
+   sleep() when it doesn't.
+   start   - first wait, in seconds
+   maximum - longest wait, in seconds
+   factor  - how much longer each wait is than the last
+   jitter  - fraction of each wait that is random, so concurrent pollers don't line up
+   stats   - WaitStats to record the waits and the latency they added in
+   '''
+   def __init__(self, start: float = 0.005, maximum: float = 0.5, factor: float = 2.0, jitter: float = 0.5,
+                stats: WaitStats = None):
+      self.start   = min(start, maximum)
+      self.maximum = maximum
+      self.factor  = factor
+      self.jitter  = jitter
+      self.stats   = stats
+      self.reset()
+
+   def reset(self):
+      '''
+      Something showed up; start over with the shortest wait
+      '''
+      if getattr(self, 'last', 0.0) and self.stats is not None:
+         self.stats._event(self.last)
+      self.cur  = self.start
+      self.last = 0.0
+
+   def next(self) -> float:
+      '''
+      Return how long to wait this time, and lengthen the next wait
+      '''
+      wait     = self.cur * (1.0 - self.jitter * random.random())
+      self.cur = min(self.cur * self.factor, self.maximum)
+      return wait
+
+   def sleep(self, limit: float = None) -> float:
+      '''
+      Wait, no longer than limit seconds if specified, and return the time waited
+      '''
+      wait = self.next()
+      if limit is not None and wait > limit:
+         wait = max(limit, 0.0)
+      self.last = wait
+      if self.stats is not None:
+         self.stats._slept(wait)
+      sleep(wait)
+      return wait
@@ -0,0 +1,53 @@
+import subprocess
+import sys
+import unittest
+
+
+def _run(code):
+    return subprocess.run([sys.executable, '-c', code], stdout=subprocess.PIPE, check=True,
+                          universal_newlines=True).stdout
+
+
+def _imported(code):
+    # the modules -X importtime reports as imported by code, in order; it lists each one once, the first time
+    err = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], stderr=subprocess.PIPE, check=True,
+                         universal_newlines=True).stderr
+    return [l.rpartition('|')[2].strip() for l in err.splitlines()
+            if l.startswith('import time:') and not l.rstrip().endswith('imported package')]
+
+
+class TestImport(unittest.TestCase):
+    # modules saspy only needs once a session is used; none should be imported by 'import saspy'
+    LAZY = ['pandas', 'numpy', 'IPython', 'pygments',
+            'saspy.sasiostdio', 'saspy.sasioiom', 'saspy.sasiohttp', 'saspy.sasiocom',
+            'saspy.sasstat', 'saspy.sasets', 'saspy.sasml', 'saspy.sasqc', 'saspy.sasutil', 'saspy.sasViyaML',
+            'saspy.sastabulate', 'saspy.sasresults', 'saspy.sasproccommons']
+
+    def test_import_is_lazy(self):
+        """
+        Test importing saspy doesn't import the IO modules, the analytic products, pandas or IPython
+        """
+        out = _run("import sys, saspy; print([m for m in "+repr(self.LAZY)+" if m in sys.modules])")
+        self.assertEqual(out.strip(), '[]')
+
+    # module count budgets for 'import saspy', instead of timing it, which is too noisy to test
+    SASPY_MODULES = 12
+    ALL_MODULES   = 160
+
+    def test_import_budget(self):
+        """
+        Test importing saspy stays within a budget of saspy modules, and of modules overall
+        """
+        mods = _imported("import saspy")
+        own  = [m for m in mods if m == 'saspy' or m.startswith('saspy.')]
+        self.assertIn('saspy.sasbase', own)
+        self.assertLessEqual(len(own), self.SASPY_MODULES, own)
+        self.assertLessEqual(len(mods), self.ALL_MODULES, [m for m in mods if m not in own])
+
+    def test_lazy_names(self):
+        """
+        Test the names imported on first use are still there
+        """
+        out = _run("import saspy; print(saspy.Tabulate.__name__, saspy.SASresults.__name__, saspy.SASProcCommons.__name__)")
+        self.assertEqual(out.split(), ['Tabulate', 'SASresults', 'SASProcCommons'])
+
@@ -167,3 +167,114 @@ class TestPandasDataFrameIntegration(unittest.TestCase):
         self.assertFalse(os.path.isfile(tmpcsv))
 
         tmpdir.cleanup()
+
+    def test_pandas_df2sd_missing_values(self):
+        """
+        Test method dataframe2sasdata writes missing numeric and datetime
+        values as SAS missing values.
+        """
+        df = pd.DataFrame({'n': [1.5, None, 3.0],
+                           'c': ['a', None, 'c'],
+                           'd': pd.to_datetime(['2020-01-01', None, '2020-01-03'])})
+        td3 = self.sas.df2sd(df, 'td3', results='text')
+        df2 = td3.to_df()
+
+        self.assertEqual(df2.shape, (3, 3))
+        self.assertTrue(df2['n'].isna()[1])
+        self.assertTrue(df2['d'].isna()[1])
+
+    def test_pandas_df2sd_binary_values(self):
+        """
+        Test method dataframe2sasdata using `method=binary` creates the same
+        SAS data set as the default method, missing values included.
+        """
+        df = pd.DataFrame({'n': [1.5, None, 3.0],
+                           'c': ['a', None, 'c\nd'],
+                           'd': pd.to_datetime(['2020-01-01', None, '2020-01-03'])})
+        td1 = self.sas.df2sd(df, 'tdb1', results='text')
+        td2 = self.sas.df2sd(df, 'tdb2', results='text', method='binary')
+        self.assertIsNotNone(td2)
+
+        df1 = td1.to_df()
+        df2 = td2.to_df()
+        self.assertEqual(df1.shape, df2.shape)
+        self.assertTrue(df2['n'].isna()[1])
+        self.assertTrue(df2['d'].isna()[1])
+        self.assertEqual(df2['n'][2], 3.0)
+        self.assertEqual(df2['c'][2], 'c\nd')
+        self.assertEqual(df2['d'][2], pd.Timestamp('2020-01-03'))
+
+    def test_pandas_sd2df_binary_values(self):
+        """
+        Test method sasdata2dataframe using `method=binary` returns the same
+        pandas.DataFrame as the default method.
+        """
+        df  = self.test_data.to_df()
+        df2 = self.test_data.to_df(method='binary')
+
+        self.assertIsInstance(df2, pd.DataFrame)
+        self.assertEqual(df.shape, df2.shape)
+        self.assertTrue((df['d1'] == df2['d1']).all())
+
+    def test_pandas_sd2df_sas7bdat_values(self):
+        """
+        Test method sasdata2dataframe using `method=sas7bdat` returns the same
+        pandas.DataFrame as the default method, with dsopts applied.
+        """
+        df  = self.test_data.to_df()
+        df2 = self.test_data.to_df(method='sas7bdat')
+
+        self.assertIsInstance(df2, pd.DataFrame)
+        self.assertEqual(df.shape, df2.shape)
+        self.assertTrue((df['d1'] == df2['d1']).all())
+
+        df3 = self.sas.sd2df('cars', 'sashelp', dsopts={'where': 'msrp > 50000', 'keep': 'make msrp'},
+                             method='sas7bdat')
+        self.assertEqual(list(df3.columns), ['Make', 'MSRP'])
+        self.assertTrue((df3['MSRP'] > 50000).all())
+
+    def test_pandas_sd2df_iter_chunks(self):
+        """
+        Test method sd2df_iter yields pandas.DataFrames of chunksize rows that
+        add up to the whole table.
+        """
+        chunks = list(self.sas.sd2df_iter('cars', 'sashelp', chunksize=100))
+
+        self.assertTrue(all(isinstance(x, pd.DataFrame) for x in chunks))
+        self.assertEqual(len(chunks[0]), 100)
+        self.assertEqual(sum(len(x) for x in chunks), 428)
+
+    def test_pandas_sd2df_iter_close(self):
+        """
+        Test closing the sd2df_iter generator early leaves the session usable.
+        """
+        chunks = self.sas.sd2df_iter('cars', 'sashelp', chunksize=10)
+        df = next(chunks)
+        chunks.close()
+
+        self.assertEqual(len(df), 10)
+        self.assertTrue(self.sas.exist('cars', libref='sashelp'))
+
+    def test_pandas_sd2df_parallel_values(self):
+        """
+        Test method sasdata2dataframe using `parallel=` returns the rows in
+        the same order as a single stream.
+        """
+        df  = self.sas.sd2df('cars', 'sashelp')
+        df2 = self.sas.sd2df('cars', 'sashelp', parallel=3, prows=50)
+
+        self.assertEqual(df.shape, df2.shape)
+        self.assertTrue((df['Model'] == df2['Model']).all())
+
+    def test_pandas_sd2df_categorical_downcast(self):
+        """
+        Test method sasdata2dataframe using `categorical='auto'` and `downcast=`
+        makes low cardinality character columns Categorical and whole number
+        numerics nullable integers.
+        """
+        df = self.sas.sd2df('cars', 'sashelp', categorical='auto', downcast=True)
+
+        self.assertEqual(str(df['Origin'].dtype), 'category')
+        self.assertEqual(str(df['Model'].dtype), 'object')
+        self.assertEqual(str(df['Cylinders'].dtype), 'Int8')
+        self.assertEqual(str(df['MSRP'].dtype), 'Int32')
@@ -610,3 +610,83 @@ class TestSASdataObject(unittest.TestCase):
         res = tr.info()
 
         self.assertIsNone(res, msg="only works with Pandas")
+
+    def test_resultcache(self):
+        """
+        Test read-only methods are answered from the result cache until the table changes
+        """
+        sas = saspy.SASsession(results='pandas', resultcache=10)
+        try:
+            sas.submit("data work.rcache; set sashelp.class; run;")
+            cls = sas.sasdata("rcache", "work")
+
+            df1 = cls.head()
+            df2 = cls.head()
+            assert_frame_equal(df1, df2)
+            self.assertEqual(sas.resultcache.hits, 1)
+            self.assertEqual(cls.obs(), 19)
+
+            sas.submit("data work.rcache; set sashelp.class(obs=3); run;")
+            self.assertEqual(cls.obs(), 3)
+            self.assertEqual(len(cls.head()), 3)
+        finally:
+            sas._endsas()
+
+    def test_lazy_plan(self):
+        """
+        Test a lazy plan gives the same result as running its steps one at a time
+        """
+        cars = self.sas.sasdata('cars', libref='sashelp')
+        plan = cars.lazy().where('msrp > 30000').add_vars({'ratio': 'horsepower / weight'}) \
+                   .where('ratio > .05').keep('make model msrp ratio').sort('descending ratio make')
+
+        code = plan.explain()
+        self.assertEqual(code.count('set SASHELP'), 1)
+        self.assertIn('where=(msrp > 30000)', code)
+        self.assertIn('if ratio > .05;', code)
+
+        df = plan.to_df()
+        self.assertEqual(list(df.columns), ['Make', 'Model', 'MSRP', 'ratio'])
+        self.assertTrue((df['MSRP'] > 30000).all())
+        self.assertTrue((df['ratio'] > .05).all())
+        self.assertTrue(df['ratio'].is_monotonic_decreasing)
+
+        self.sas.submit("data work.plan1; set sashelp.cars; where msrp > 30000; ratio = horsepower / weight; "
+                        "if ratio > .05; keep make model msrp ratio; run;")
+        self.assertEqual(len(df), self.sas.sasdata('plan1').obs())
+
+        sd = plan.collect(out='work.plan2')
+        self.assertEqual(sd.obs(), len(df))
+
+    def test_lazy_plan_impute_mode(self):
+        """
+        Test a plan imputes the mode, the most frequent value, for missing values
+        """
+        cars = self.sas.sasdata('cars', libref='sashelp', results='pandas')
+        df   = cars.lazy().impute({'mode': ['cylinders']}).to_df()
+        mode = cars.to_df()['Cylinders'].mode()[0]
+
+        self.assertFalse(df['Cylinders'].isna().any())
+        self.assertEqual((df['Cylinders'] == mode).sum(), (cars.to_df()['Cylinders'].fillna(mode) == mode).sum())
+
+    def test_getitem(self):
+        """
+        Test column selection and row filters become keep= and where= data set options
+        """
+        cars = self.sas.sasdata('cars', libref='sashelp', results='pandas')
+
+        sd = cars[['make', 'msrp']]
+        self.assertEqual(sd.dsopts['keep'], ['make', 'msrp'])
+        self.assertEqual(list(sd.to_df().columns), ['Make', 'MSRP'])
+
+        sd = cars[(cars.col('msrp') > 30000) & (cars.col('make') == 'Audi')]
+        df = sd.to_df()
+        self.assertTrue((df['MSRP'] > 30000).all())
+        self.assertEqual(set(df['Make']), {'Audi'})
+
+        df = sd[['model']].to_df()
+        self.assertEqual(list(df.columns), ['Model'])
+        self.assertEqual(len(df), sd.obs())
+
+        self.assertFalse(hasattr(cars, 'msrp'))
+        self.assertEqual(str(cars.col('type') == 'SUV'), "type = 'SUV'")
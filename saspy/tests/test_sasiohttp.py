@@ -0,0 +1,314 @@
+import http.server
+import json
+import threading
+import types
+import unittest
+
+from saspy.sasiohttp import HTTPpool, SASjobHTTP, SASsessionHTTP, wait_jobs, FIRST_COMPLETED
+from saspy.saswait import Backoff, WaitStats
+
+
+class _Handler(http.server.BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    polls = {}
+    pages = []
+    puts  = []
+
+    def do_GET(self):
+        body = b'saspy'
+        if self.path.startswith('/log?'):
+            # a 25 line LOG, paged like the Compute Service does
+            qs    = dict(p.split('=') for p in self.path.split('?')[1].split('&'))
+            start = int(qs['start'])
+            limit = int(qs['limit'])
+            self.pages.append((start, limit))
+            items = [{'line': 'line '+str(i)} for i in range(start, min(start+limit, 25))]
+            body  = json.dumps({'count': 25, 'items': items}).encode()
+        if self.path.startswith('/jobs/'):
+            # /jobs/<name>/<polls until completed>/state
+            job, n = self.path.split('?')[0].split('/')[2:4]
+            self.polls[job] = self.polls.get(job, 0) + 1
+            body = b'completed' if self.polls[job] > int(n) else b'running'
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_PUT(self):
+        self.puts.append(self.path)
+        self.send_response(200)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+class TestHTTPpool(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), _Handler)
+        cls.thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.thread.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        self.pool = HTTPpool('127.0.0.1', self.server.server_address[1], https=False, size=2)
+
+    def tearDown(self):
+        self.pool.close()
+
+    def _get(self, conn):
+        conn.request('GET', '/')
+        return conn.getresponse().read()
+
+    def test_httppool_reuses_connection(self):
+        """
+        Test a connection given back to the pool is handed out again, on the same socket
+        """
+        conn = self.pool.getconn()
+        sock = conn.sock
+        self.assertEqual(self._get(conn), b'saspy')
+        self.pool.putconn(conn)
+
+        conn = self.pool.getconn()
+        self.assertIs(conn.sock, sock)
+        self.assertEqual(self._get(conn), b'saspy')
+        self.pool.putconn(conn)
+
+    def test_httppool_reconnects_dropped(self):
+        """
+        Test a pooled connection the server closed is replaced instead of failing the request
+        """
+        conn = self.pool.getconn()
+        self.assertEqual(self._get(conn), b'saspy')
+        self.pool.putconn(conn)
+
+        conn.conn.sock.close()
+        conn.conn.sock = None
+
+        conn = self.pool.getconn()
+        self.assertEqual(self._get(conn), b'saspy')
+        self.pool.putconn(conn)
+
+    def test_httppool_unread_response_not_reused(self):
+        """
+        Test a connection with an unread response is closed, not pooled
+        """
+        conn = self.pool.getconn()
+        conn.request('GET', '/')
+        conn.getresponse()
+        self.pool.putconn(conn)
+        self.assertEqual(len(self.pool._idle), 0)
+
+    def test_httppool_threads(self):
+        """
+        Test the pool can be shared across threads, keeping no more than size idle connections
+        """
+        errors = []
+
+        def worker():
+            try:
+                for i in range(20):
+                    conn = self.pool.getconn()
+                    self.assertEqual(self._get(conn), b'saspy')
+                    self.pool.putconn(conn)
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=worker) for i in range(6)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(errors, [])
+        self.assertLessEqual(len(self.pool._idle), 2)
+
+
+class _Session:
+    _joburi    = SASsessionHTTP._joburi
+    _jobstate  = SASsessionHTTP._jobstate
+    _getlines  = SASsessionHTTP._getlines
+
+    def __init__(self, pool):
+        self.sascfg = types.SimpleNamespace(HTTPpool=pool, _token='', encoding='utf-8', long_poll=0)
+        self.stats  = WaitStats()
+        self._sb    = types.SimpleNamespace(sascfg=types.SimpleNamespace(
+                          backoff=lambda maximum=None: Backoff(0.005, 0.1, stats=self.stats)))
+
+    def _jobresults(self, jobid, ods):
+        return dict(LOG='log for '+jobid['id'], LST='')
+
+
+class TestSASjobHTTP(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), _Handler)
+        cls.thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.thread.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        self.pool    = HTTPpool('127.0.0.1', self.server.server_address[1], https=False)
+        self.session = _Session(self.pool)
+
+    def tearDown(self):
+        self.pool.close()
+
+    def _job(self, name, polls, links=()):
+        jobid = {'id': name, 'state': 'pending',
+                 'links': [{'method': 'GET', 'rel': 'state', 'uri': '/jobs/'+name+'/'+str(polls)+'/state'}] + list(links)}
+        return SASjobHTTP(self.session, jobid, False)
+
+    def test_sasjobhttp_cancel(self):
+        """
+        Test cancel() uses the job's own cancel link, and doesn't cancel anything without one
+        """
+        uri = '/cancel/mine/state?value=canceled'
+        job = self._job('cancel', 1000, [{'method': 'PUT', 'rel': 'cancel', 'uri': uri}])
+        self.assertTrue(job.cancel())
+        self.assertEqual(_Handler.puts, [uri])
+
+        job = self._job('nolink', 1000)
+        self.assertFalse(job.cancel())
+        self.assertEqual(_Handler.puts, [uri])
+
+    def test_sasjobhttp_result(self):
+        """
+        Test result() waits for the job and returns its LOG
+        """
+        job = self._job('result', 2)
+        self.assertFalse(job.done())
+        self.assertEqual(job.result()['LOG'], 'log for result')
+        self.assertEqual(job.state, 'completed')
+
+    def test_sasjobhttp_wait_timeout(self):
+        """
+        Test wait() gives up after the timeout while the job is still running
+        """
+        job = self._job('timeout', 1000)
+        self.assertFalse(job.wait(0.2))
+        self.assertIsNone(job.result(0))
+
+    def test_sasjobhttp_done_callback(self):
+        """
+        Test done callbacks run once the job finishes, and right away once it has
+        """
+        job   = self._job('callback', 1)
+        fired = threading.Event()
+        job.add_done_callback(lambda j: fired.set())
+        self.assertTrue(fired.wait(5))
+
+        seen = []
+        job.add_done_callback(seen.append)
+        self.assertEqual(seen, [job])
+
+    def test_sasjobhttp_wait_jobs(self):
+        """
+        Test wait_jobs() on several handles, for the first and for all of them
+        """
+        fast = self._job('fast', 0)
+        slow = self._job('slow', 3)
+
+        done, todo = wait_jobs([slow, fast], return_when=FIRST_COMPLETED)
+        self.assertEqual(done, [fast])
+        self.assertEqual(todo, [slow])
+
+        done, todo = wait_jobs([slow, fast])
+        self.assertEqual(len(done), 2)
+        self.assertEqual(todo, [])
+
+    def test_sasjobhttp_wait_stats(self):
+        """
+        Test waiting on a job backs off and records the latency it added
+        """
+        job = self._job('stats', 4)
+        self.assertTrue(job.wait(5))
+        stats = self.session.stats.stats()
+        self.assertGreaterEqual(stats['polls'], 4)
+        self.assertEqual(stats['events'], 1)
+        self.assertLessEqual(stats['maxlat'], 0.1)
+
+    def test_sasjobhttp_long_poll_ignored(self):
+        """
+        Test waiting still backs off between polls when the server comes right back from a long poll
+        """
+        self.session.sascfg.long_poll = 10
+        job = self._job('ignored', 4)
+        self.assertTrue(job.wait(5))
+        self.assertGreaterEqual(self.session.stats.stats()['polls'], 3)
+
+
+class TestBackoff(unittest.TestCase):
+    def test_backoff_grows_to_maximum(self):
+        """
+        Test the waits grow from start to maximum, and start over after reset()
+        """
+        poll  = Backoff(0.01, 0.08, jitter=0)
+        waits = [poll.next() for i in range(6)]
+        self.assertEqual(waits, [0.01, 0.02, 0.04, 0.08, 0.08, 0.08])
+        poll.reset()
+        self.assertEqual(poll.next(), 0.01)
+
+    def test_backoff_jitter_and_limit(self):
+        """
+        Test jitter keeps each wait within its bound, and sleep() never waits past limit
+        """
+        poll = Backoff(0.02, 0.02, jitter=0.5)
+        for i in range(20):
+            self.assertTrue(0.01 <= poll.next() <= 0.02)
+        self.assertEqual(poll.sleep(0), 0)
+
+
+class TestGetLines(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), _Handler)
+        cls.thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.thread.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        self.pool    = HTTPpool('127.0.0.1', self.server.server_address[1], https=False)
+        self.session = _Session(self.pool)
+        _Handler.pages.clear()
+
+    def tearDown(self):
+        self.pool.close()
+
+    def test_getlines_pages_to_count(self):
+        """
+        Test the LOG is read in bounded pages, stopping at the line count without an extra request
+        """
+        pages = []
+        lines, end = self.session._getlines('/log', 0, pages.append, pagesize=10)
+        self.assertEqual(lines, ['line '+str(i) for i in range(25)])
+        self.assertEqual(end, 25)
+        self.assertEqual(_Handler.pages, [(0, 10), (10, 10), (20, 5)])
+        self.assertEqual([len(p) for p in pages], [10, 10, 5])
+
+    def test_getlines_from_offset(self):
+        """
+        Test only the lines past start are read
+        """
+        lines, end = self.session._getlines('/log', 20, pagesize=10)
+        self.assertEqual(lines, ['line '+str(i) for i in range(20, 25)])
+        self.assertEqual(end, 25)
+
+        lines, end = self.session._getlines('/log', end, pagesize=10)
+        self.assertEqual(lines, [])
+        self.assertEqual(end, 25)
@@ -0,0 +1,266 @@
+import fcntl
+import os
+import socket
+import subprocess
+import threading
+import types
+import unittest
+import zlib
+
+import numpy as np
+import pandas as pd
+
+from saspy.sasdfio import binary2df, binary_dtype, df2binary_columns, rows2df, stream2df
+from saspy.sasiostdio import SASsessionSTDIO, _FifoChannel
+
+
+@unittest.skipUnless(hasattr(os, 'mkfifo'), 'FIFOs are not supported on this platform')
+class TestFifoChannel(unittest.TestCase):
+    def test_read(self):
+        """
+        Test reading what the other end writes to the FIFO, until it closes it
+        """
+        chan = _FifoChannel('r')
+        proc = subprocess.Popen(['sh', '-c', 'head -c 200000 /dev/zero > ' + chan.path])
+        self.assertTrue(chan.wait(10))
+
+        conn, path = chan.accept()
+        data = b''
+        while True:
+            buf = conn.recv(65536)
+            if not buf:
+                break
+            data += buf
+        conn.close()
+        chan.close()
+        proc.wait()
+
+        self.assertEqual(len(data), 200000)
+        self.assertFalse(os.path.exists(path))
+
+    def test_write(self):
+        """
+        Test writing to the FIFO for the other end to read
+        """
+        chan = _FifoChannel('w')
+        proc = subprocess.Popen(['sh', '-c', 'wc -c < ' + chan.path], stdout=subprocess.PIPE)
+
+        conn, path = chan.accept()
+        conn.send(b'x' * 100000)
+        conn.close()
+        chan.close()
+
+        self.assertEqual(int(proc.communicate()[0]), 100000)
+
+    def test_close_unopened(self):
+        """
+        Test closing a FIFO the other end never opened doesn't leave the opening thread hung
+        """
+        for mode in ('r', 'w'):
+            chan = _FifoChannel(mode)
+            self.assertFalse(chan.wait(0.1))
+            chan.close()
+            self.assertFalse(chan.thread.is_alive())
+
+    def test_sockfile(self):
+        """
+        Test the filename statement for a FIFO is a plain file, with recfm=S changed to recfm=N
+        """
+        chan = _FifoChannel('r')
+        code = SASsessionSTDIO._sockfile(None, chan, None, 0, 'recfm=S encoding=binary')
+        chan.close()
+
+        self.assertEqual(code, "filename sock '" + chan.path + "' recfm=N encoding=binary;\n")
+
+
+class TestLogDrain(unittest.TestCase):
+    def test_logdrain(self):
+        """
+        Test the LOG is read into _log while it's being written, so the writer never blocks on a full pipe,
+        and characters split across reads are decoded whole
+        """
+        r, w = os.pipe()
+        io = SASsessionSTDIO.__new__(SASsessionSTDIO)
+        io.sascfg = types.SimpleNamespace(encoding='utf-8')
+        io.stderr = os.fdopen(r, 'rb')
+        io._log   = ''
+        io.pid    = None
+        io._sb    = types.SimpleNamespace(SASpid=None)
+        fcntl.fcntl(io.stderr, fcntl.F_SETFL, os.O_NONBLOCK)
+
+        text    = 'NOTE: caf\u00e9 \u2713\n' * 20000
+        drained = io._logdrain()
+        with os.fdopen(w, 'wb') as f:
+            # far more than a pipe holds; this blocks for good if nothing is reading
+            f.write(text.encode('utf-8'))
+        drained()
+        io.stderr.close()
+
+        self.assertEqual(io._log, text)
+
+
+class TestStream2df(unittest.TestCase):
+    def _stream(self, data: bytes, rowsep: str = '\x01', **kwargs):
+        a, b = socket.socketpair()
+
+        def send():
+            a.sendall(data)
+            a.close()
+
+        t = threading.Thread(target=send)
+        t.start()
+        df = stream2df(b, rowsep, '\x02', ['N', 'C'], ['N', 'C'], 'utf-8', **kwargs)
+        t.join()
+        b.close()
+        return df
+
+    def test_blocks_in_order(self):
+        """
+        Test rows split across many small blocks and decoded by several workers come back whole and in order
+        """
+        rows = ''.join(str(i) + '\x02caf\u00e9 ' + str(i) + '\x01' for i in range(50000))
+        df   = self._stream(rows.encode('utf-8'), workers=3, qdepth=2, bufsize=65536)
+
+        self.assertEqual(list(df['N']), list(range(50000)))
+        self.assertEqual(df['C'][49999], 'caf\u00e9 49999')
+
+    def test_multichar_rowsep_long_row(self):
+        """
+        Test a multi character row separator (m5dsbug) with a row bigger than the buffer
+        """
+        rows = '1\x02a\x02\x01\n2\x02' + 'x' * 200000 + '\x02\x01\n3\x02c\x02\x01\n'
+        df   = self._stream(rows.encode(), rowsep='\x02\x01\n', bufsize=65536)
+
+        self.assertEqual(list(df['N']), [1, 2, 3])
+        self.assertEqual(len(df['C'][1]), 200000)
+        self.assertEqual(df['C'][2], 'c')
+
+    def test_compressed(self):
+        """
+        Test a gzipped stream is decompressed, and a missing character value is missing
+        """
+        rows = ''.join(str(i) + '\x02 \x01' for i in range(1000))
+        co   = zlib.compressobj(wbits=16 + zlib.MAX_WBITS)
+        df   = self._stream(co.compress(rows.encode()) + co.flush(), dco=zlib.decompressobj(16 + zlib.MAX_WBITS))
+
+        self.assertEqual(len(df), 1000)
+        self.assertTrue(df['C'].isna().all())
+
+    def test_categorical_downcast(self):
+        """
+        Test categories are merged across blocks, 'auto' leaves a high cardinality column alone, and downcast
+        makes whole numbers a nullable integer
+        """
+        rows = ''.join(str(i % 100) + '\x02' + ('ab'[i % 2] if i % 7 else ' ') + '\x01' for i in range(20000))
+        df   = self._stream(rows.encode(), bufsize=65536, categorical='auto', downcast=True)
+
+        self.assertEqual(str(df['N'].dtype), 'Int8')
+        self.assertEqual(str(df['C'].dtype), 'category')
+        self.assertEqual(sorted(df['C'].cat.categories), ['a', 'b'])
+        self.assertEqual(df['C'].isna().sum(), len(range(0, 20000, 7)))
+
+        rows = ''.join('0.5\x02v' + str(i) + '\x01' for i in range(100))
+        df   = self._stream(rows.encode(), categorical='auto', downcast=True)
+
+        self.assertEqual(str(df['N'].dtype), 'float32')
+        self.assertEqual(df['C'].dtype, object)
+
+    def test_nullable(self):
+        """
+        Test dtype_backend='numpy_nullable' and a named categorical column
+        """
+        df = self._stream('1.1\x02x\x01.\x02 \x01'.encode(), categorical=['c'], dtype_backend='numpy_nullable')
+
+        self.assertEqual(str(df['N'].dtype), 'Float64')
+        self.assertTrue(df['N'][1] is pd.NA)
+        self.assertEqual(str(df['C'].dtype), 'category')
+
+    def test_empty(self):
+        """
+        Test no rows gives an empty Data Frame with the columns
+        """
+        df = self._stream(b'')
+        self.assertEqual(list(df.columns), ['N', 'C'])
+        self.assertEqual(len(df), 0)
+
+
+class TestRows2df(unittest.TestCase):
+    def test_rows2df(self):
+        """
+        Test the values can hold newlines, quotes and commas, and numeric, special and date missings are missing
+        """
+        block = '1.5\x02a\nb,"c\x022020-01-31\x01.\x02 \x02.\x01A\x02x\x02\x01'.encode()
+        df    = rows2df(block, '\x01', '\x02', ['N', 'C', 'D'], ['N', 'C', 'D'], 'utf-8')
+
+        self.assertEqual(str(df['N'].dtype), 'float64')
+        self.assertEqual(df['N'][0], 1.5)
+        self.assertTrue(df['N'][1:].isna().all())
+        self.assertEqual(df['C'][0], 'a\nb,"c')
+        self.assertTrue(df['C'][1] != df['C'][1])
+        self.assertEqual(str(df['D'][0].date()), '2020-01-31')
+        self.assertTrue(df['D'][1:].isna().all())
+
+    def test_one_column_blanks(self):
+        """
+        Test a one column table keeps the rows whose value is empty or missing
+        """
+        df = rows2df('a\x01\x01 \x01b\x01'.encode(), '\x01', '\x02', ['C'], ['C'], 'utf-8')
+        self.assertEqual(len(df), 4)
+        self.assertEqual(df['C'].isna().sum(), 2)
+
+        df = rows2df('1\x01\x01.\x012\x01'.encode(), '\x01', '\x02', ['N'], ['N'], 'utf-8')
+        self.assertEqual(len(df), 4)
+        self.assertEqual(df['N'].isna().sum(), 2)
+
+    def test_multichar_rowsep(self):
+        """
+        Test a row separator the C parser can't split on is still decoded
+        """
+        block = '1\x02a\x02\x01\n2\x02b\x02\x01\n'.encode()
+        df    = rows2df(block, '\x02\x01\n', '\x02', ['N', 'C'], ['N', 'C'], 'utf-8')
+
+        self.assertEqual(list(df['N']), [1, 2])
+        self.assertEqual(list(df['C']), ['a', 'b'])
+
+        df = rows2df('a\x02\x01\n\x02\x01\n \x02\x01\nb\x02\x01\n'.encode(), '\x02\x01\n', '\x02', ['C'], ['C'], 'utf-8')
+        self.assertEqual(len(df), 4)
+        self.assertEqual(df['C'].isna().sum(), 2)
+        self.assertEqual(df['C'][3], 'b')
+
+
+class TestDf2binaryColumns(unittest.TestCase):
+    def test_no_rows(self):
+        """
+        Test a Data Frame with no rows converts, character columns included
+        """
+        df   = pd.DataFrame({'C': pd.Series([], dtype=object), 'N': pd.Series([], dtype='float64')})
+        cols = df2binary_columns(df, ['C', 'N'], 'utf-8')
+
+        self.assertEqual(len(cols[0]), 0)
+        self.assertEqual(len(cols[1]), 0)
+
+    def test_categorical_missing(self):
+        """
+        Test a Categorical column with missing values converts, the missing values as blanks
+        """
+        df   = pd.DataFrame({'C': pd.Series(['ab', None, 'c'], dtype='category')})
+        cols = df2binary_columns(df, ['C'], 'utf-8')
+
+        self.assertEqual(list(cols[0]), [b'ab', b'  ', b'c '])
+
+
+class TestBinary2df(unittest.TestCase):
+    def test_times_today(self):
+        """
+        Test a time decodes as today at that time, as the MEMORY method gives, and a date from the SAS epoch
+        """
+        dtype = binary_dtype(['N', 'N'], [8, 8])
+        rec   = np.array([(3723.5, 1.0)], dtype=dtype)
+        df    = binary2df(rec.tobytes(), dtype, ['T', 'D'], ['T', 'D'], 'utf-8', '1960-01-01')
+
+        self.assertEqual(df['T'][0], pd.Timestamp.today().normalize() + pd.Timedelta(seconds=3723.5))
+        self.assertEqual(df['D'][0], pd.Timestamp('1960-01-02'))
+
+
+if __name__ == '__main__':
+    unittest.main()
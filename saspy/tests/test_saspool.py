@@ -0,0 +1,82 @@
+import types
+import unittest
+import saspy
+from saspy.saspool import SASsessionPool
+
+
+class TestSASsessionPool(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.pool = saspy.SASsessionPool(size=1)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.pool.close()
+
+    def test_saspool_get_put(self):
+        """
+        Test a session from the pool is started and usable, and is handed out again once given back
+        """
+        sas = self.pool.get()
+        self.assertIsInstance(sas, saspy.SASsession)
+        self.assertTrue(sas.SASpid)
+        pid = sas.SASpid
+        self.pool.put(sas)
+
+        with self.pool.session() as sas:
+            self.assertEqual(sas.SASpid, pid)
+
+    def test_saspool_reset(self):
+        """
+        Test a session given back has an empty WORK library and its options restored
+        """
+        with self.pool.session() as sas:
+            sas.submit("data work.pooltest; x=1; run; options obs=5;")
+            self.assertTrue(sas.exist('pooltest', 'work'))
+            sas.set_batch(True)
+
+        with self.pool.session() as sas:
+            self.assertFalse(sas.exist('pooltest', 'work'))
+            self.assertFalse(sas.batch)
+            ll = sas.submit("%put OBS=%sysfunc(getoption(obs));", 'text')
+            self.assertNotIn('OBS=5\n', ll['LOG'])
+
+
+class _FlakyPool(SASsessionPool):
+    """
+    A pool whose sessions are stand-ins; the first one fails to start
+    """
+    def _start(self):
+        self.starts = getattr(self, 'starts', 0) + 1
+        if self.starts == 1:
+            return None
+        return types.SimpleNamespace(_endsas=lambda: None)
+
+
+class TestSASsessionPoolRetry(unittest.TestCase):
+    def test_saspool_retries_failed_start(self):
+        """
+        Test the pool keeps trying to start sessions after one fails to
+        """
+        pool = _FlakyPool(size=1)
+        try:
+            self.assertIsNotNone(pool.get(timeout=10))
+            self.assertFalse(pool._failed)
+        finally:
+            pool.close()
+
+    def test_saspool_session_without_one(self):
+        """
+        Test session() raises instead of running the block without a session, and get() without a timeout waits
+        through a failed start
+        """
+        pool = _FlakyPool(size=1)
+        try:
+            sas = pool.get()
+            self.assertIsNotNone(sas)
+        finally:
+            pool.close()
+
+        with self.assertRaises(RuntimeError):
+            with pool.session():
+                pass
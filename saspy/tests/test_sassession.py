@@ -93,6 +93,25 @@ class TestSASsessionObject(unittest.TestCase):
 
         self.assertTrue(os.path.exists(local_file_2))
 
+    def test_sassession_upload_download_compress(self):
+        """
+        Test upload and download with compress=True round trip a file unchanged
+        """
+        local_file_1 = os.path.join(self.tempdir.name, 'simple_gz.csv')
+        local_file_2 = os.path.join(self.tempdir.name, 'simple_gz_2.csv')
+        remote_file = self.sas.workpath + 'simple_gz.csv'
+
+        with open(local_file_1, 'w') as f:
+            f.write("""A,B,C,D\n1,2,3,4\n5,6,7,8\n""" * 1000)
+
+        ll = self.sas.upload(local_file_1, remote_file, compress=True)
+        self.assertTrue(ll['Success'])
+        ll = self.sas.download(local_file_2, remote_file, compress=True)
+        self.assertTrue(ll['Success'])
+
+        with open(local_file_1, 'rb') as f1, open(local_file_2, 'rb') as f2:
+            self.assertEqual(f1.read(), f2.read())
+
     def test_sassession_datasets_work(self):
         """
         Test method datasets can identify that the WORK library exists
@@ -156,3 +175,20 @@ class TestSASsessionObject(unittest.TestCase):
         util = self.sas.sasutil()
 
         self.assertIsInstance(util, saspy.sasutil.SASutil, msg="util = self.sas.sasutil() failed")
+
+    def test_sassession_sd2df_metacache(self):
+        """
+        Test sd2df caches the table's metadata, and notices when the table is replaced.
+        """
+        self.sas.submit("data work.metacache; x=1; y='a'; run;")
+        df = self.sas.sd2df('metacache', 'work')
+        self.assertEqual(list(df.columns), ['x', 'y'])
+        self.assertEqual(len([k for k in self.sas._metacache if 'metacache' in k]), 1)
+
+        df = self.sas.sd2df('metacache', 'work')
+        self.assertEqual(list(df.columns), ['x', 'y'])
+
+        self.sas.submit("data work.metacache; x=1; y='a'; z=today(); format z date9.; run;")
+        df = self.sas.sd2df('metacache', 'work')
+        self.assertEqual(list(df.columns), ['x', 'y', 'z'])
+        self.assertEqual(str(df.dtypes['z'])[:10], 'datetime64')